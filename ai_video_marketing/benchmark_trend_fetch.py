@@ -0,0 +1,165 @@
+"""
+Benchmark lấy dữ liệu trend: throughput và độ trễ đuôi của TrendAnalyzer
+với server giả lập cục bộ (không gọi API thật)
+
+Ví dụ:
+    python benchmark_trend_fetch.py --concurrency 1 4 8 16 --latency 0.05 --error-rate 0.02
+    python benchmark_trend_fetch.py --fixtures data/fixtures/youtube.json --server-rate 20
+    python benchmark_trend_fetch.py --record data/fixtures/youtube.json --keywords cooking tips
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import numpy as np
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from trend_analysis.trend_analyzer import TrendAnalyzer
+from trend_analysis.stub_server import StubPlatformServer, record_youtube_fixtures
+from configs.config import TREND_CONFIG
+
+# Retries and mock fallbacks are counted in the results table instead of logged
+logging.getLogger().setLevel(logging.CRITICAL)
+
+async def _run_keywords(analyzer: TrendAnalyzer, keywords, per_keyword: int):
+    """Lấy mọi từ khóa đồng thời, đo độ trễ từng từ khóa"""
+    async def timed(keyword):
+        started = time.perf_counter()
+        videos = await analyzer.search_trending_keywords_async([keyword], per_keyword)
+        return time.perf_counter() - started, videos
+    
+    return await asyncio.gather(*(timed(keyword) for keyword in keywords))
+
+def run_benchmark(server: StubPlatformServer, args, concurrency: int) -> dict:
+    """Một lượt benchmark với số request đồng thời cho trước"""
+    config = dict(
+        TREND_CONFIG,
+        platforms=["youtube"],  # TikTok is mock data only, nothing to fetch
+        youtube_api_key="stub-key",
+        api_base_urls=server.base_urls,
+        max_concurrent_requests=concurrency,
+        max_retries=args.max_retries,
+        rate_limits={"youtube": {"rate": args.client_rate, "burst": args.client_burst}} if args.client_rate else {},
+        response_cache={"enabled": False},
+        warehouse={"enabled": False}
+    )
+    analyzer = TrendAnalyzer(config)
+    server.reset_stats()
+    
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(_run_keywords(analyzer, args.keywords, args.max_results))
+    finally:
+        analyzer.client.close()
+    elapsed = time.perf_counter() - started
+    
+    latencies = np.array([latency for latency, _ in results])
+    youtube = [video for _, videos in results for video in videos]
+    # Any error in _search_youtube falls back to mock data, count it instead of hiding it
+    fallbacks = sum("v=mock" in video.url for video in youtube)
+    stats = dict(server.stats)
+    
+    return {
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "keywords": len(args.keywords),
+        "videos": len(youtube) - fallbacks,
+        "mock_fallbacks": fallbacks,
+        "requests": stats["requests"],
+        "requests_per_second": stats["requests"] / elapsed,
+        "videos_per_second": (len(youtube) - fallbacks) / elapsed,
+        "rate_limited": stats["rate_limited"],
+        "errors": stats["errors"],
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95)),
+        "p99": float(np.percentile(latencies, 99)),
+        "max": float(latencies.max())
+    }
+
+def print_results(results):
+    """In bảng kết quả"""
+    header = (f"{'conc':>5} {'time s':>8} {'req':>6} {'req/s':>8} {'videos/s':>9} "
+              f"{'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'429':>5} {'503':>5} {'mock':>5}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['concurrency']:>5} {r['seconds']:>8.2f} {r['requests']:>6} {r['requests_per_second']:>8.1f} "
+              f"{r['videos_per_second']:>9.1f} {r['p50']:>7.3f} {r['p95']:>7.3f} {r['p99']:>7.3f} "
+              f"{r['rate_limited']:>5} {r['errors']:>5} {r['mock_fallbacks']:>5}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark trend fetching against a local stub server")
+    parser.add_argument("--keywords", nargs="+",
+                       default=[f"keyword{i}" for i in range(20)],
+                       help="Keywords to fetch")
+    parser.add_argument("--max-results", type=int, default=100,
+                       help="Videos per keyword")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16],
+                       help="max_concurrent_requests values to compare")
+    parser.add_argument("--latency", type=float, default=0.05,
+                       help="Server latency per response (s)")
+    parser.add_argument("--latency-tail", type=float, default=0.02,
+                       help="Mean of extra exponential latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                       help="Fraction of responses that are 503")
+    parser.add_argument("--server-rate", type=float,
+                       help="Server-side rate limit (req/s), answered with 429")
+    parser.add_argument("--server-burst", type=float,
+                       help="Server-side burst size")
+    parser.add_argument("--client-rate", type=float,
+                       help="Client token bucket rate (req/s), default: unlimited")
+    parser.add_argument("--client-burst", type=float,
+                       help="Client token bucket burst")
+    parser.add_argument("--max-retries", type=int, default=TREND_CONFIG.get("max_retries", 3),
+                       help="Retries on 429/503")
+    parser.add_argument("--fixtures", type=str,
+                       help="Replay recorded fixtures (JSON) instead of generated data")
+    parser.add_argument("--record", type=str,
+                       help="Record live YouTube responses for --keywords into this fixture file and exit")
+    parser.add_argument("--api-key", type=str, default=os.environ.get("YOUTUBE_API_KEY"),
+                       help="YouTube API key for --record (default: $YOUTUBE_API_KEY)")
+    parser.add_argument("--seed", type=int, default=0,
+                       help="Seed for simulated latency and errors")
+    parser.add_argument("--json", type=str,
+                       help="Also write results to this JSON file")
+    
+    args = parser.parse_args()
+    
+    if args.record:
+        if not args.api_key:
+            parser.error("--record needs --api-key or YOUTUBE_API_KEY")
+        path = record_youtube_fixtures(args.keywords, args.api_key, Path(args.record), args.max_results)
+        print(f"Fixtures saved to: {path}")
+        return
+    
+    results = []
+    for concurrency in args.concurrency:
+        # A fresh server per run so rate limit state does not carry over
+        server = StubPlatformServer(
+            fixtures=args.fixtures,
+            latency=args.latency,
+            latency_tail=args.latency_tail,
+            error_rate=args.error_rate,
+            rate_limit=args.server_rate,
+            burst=args.server_burst,
+            results_per_keyword=args.max_results,
+            seed=args.seed
+        )
+        with server:
+            results.append(run_benchmark(server, args, concurrency))
+    
+    print_results(results)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to: {args.json}")
+
+if __name__ == "__main__":
+    main()
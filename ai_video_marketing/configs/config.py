@@ -56,8 +56,28 @@ VIDEO_CONFIG = {
     "fps": 30,
     "codec": "libx264",
     "bitrate": "5000k",
+    "preset": "medium",
     "audio_codec": "aac",
-    "audio_bitrate": "128k"
+    "audio_bitrate": "128k",
+    "music_volume": 0.3,
+    "music_fade": 0.5,  # seconds
+    "batch_workers": min(4, os.cpu_count() or 1),  # parallel render processes in batch mode
+    "edit_workers": None,  # VideoEditor batch processes, None = cores / (encoder threads x platforms)
+    "encoder_threads": None,  # ffmpeg threads per platform encoder, None = ffmpeg default
+    "cache_dir": str(DATA_DIR / "cache"),  # section segments and other render caches
+    "image_selection_seed": 0,
+    "image_layer_cache_size": 32,  # processed 1080p layers kept in memory (LRU)
+    # Proof renders for creative review (same timing and layout, cheaper encode)
+    "proof_resolution": (640, 360),
+    "proof_fps": 15,
+    "proof_bitrate": "800k",
+    "fused_effects": True,  # single-pass grading kernel in VideoEditor
+    "keyframe_interval": 2.0,  # seconds; fixed GOP, plus a keyframe at every section start
+    # Subject-aware reframing for vertical/square exports
+    "smart_crop": True,
+    "smart_crop_sample_fps": 2.0,
+    "transition_duration": 0.3,  # crossfade between clips, seconds
+    "short_clip_branding_seconds": 3.0  # overlay head re-encoded on short clips
 }
 
 # Trend Analysis Settings
@@ -66,7 +86,46 @@ TREND_CONFIG = {
     "max_videos_per_keyword": 50,
     "analysis_timeframe": "7d",
     "min_views": 10000,
-    "min_likes": 1000
+    "min_likes": 1000,
+    # API fetch layer: pooled connections, bounded concurrency, per-platform token buckets
+    "api_base_urls": {"youtube": "https://www.googleapis.com/youtube/v3"},
+    "max_concurrent_requests": 8,
+    "rate_limits": {
+        "youtube": {"rate": 5.0, "burst": 10},  # requests/second
+        "tiktok": {"rate": 2.0, "burst": 4}
+    },
+    "request_timeout": 10,  # seconds
+    "max_retries": 3,  # on 429/503, honouring Retry-After
+    # Persistent API response cache, shared by runs and batch configs
+    "response_cache": {
+        "enabled": True,
+        "backend": "sqlite",  # "sqlite" or "file"
+        "path": str(DATA_DIR / "cache" / "trend_responses.sqlite"),
+        "ttl": 3600,  # seconds
+        "endpoint_ttl": {"search": 6 * 3600, "videos": 3600}
+    },
+    # Historical snapshots, Parquet partitioned by platform and date
+    "warehouse": {
+        "enabled": True,
+        "path": str(DATA_DIR / "trend_warehouse")
+    },
+    # Rolling-window aggregates for live dashboards (TrendAnalyzer.create_stream)
+    "stream": {
+        "window_seconds": 3600,
+        "buckets": 12,  # expiry granularity: window_seconds / buckets
+        "top_tags": 20,
+        "sketch_width": 2048,  # count-min sketch for tag counts
+        "sketch_depth": 4
+    },
+    # Top-tag counting: "exact", or bounded-memory "space_saving" / "count_min"
+    "tag_counting": {
+        "backend": "exact",
+        "epsilon": 0.001,  # max count error as a fraction of all tags
+        "delta": 0.001  # count_min only: probability of exceeding epsilon
+    },
+    # TrendAnalyzer.analyze_sharded: "platform" or "keyword" shards, None = one process per core
+    "analysis_shard_by": "platform",
+    "analysis_workers": None
 }
 
 # Content Analysis Settings
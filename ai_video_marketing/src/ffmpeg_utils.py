@@ -0,0 +1,324 @@
+"""
+FFmpeg Utils - Cắt/ghép video bằng stream copy, dùng chung cho VideoProducer và VideoEditor
+"""
+import re
+import json
+import bisect
+import subprocess
+import tempfile
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from moviepy.config import get_setting
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds to seek before a keyframe when cutting with stream copy
+KEYFRAME_SEEK_MARGIN = 0.25
+
+def run_ffmpeg(args: List[str]) -> None:
+    """Chạy ffmpeg với tham số cho trước, raise IOError nếu thất bại"""
+    cmd = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error"] + args
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    
+    if result.returncode != 0:
+        raise IOError(
+            f"ffmpeg failed ({result.returncode}): {result.stderr.decode(errors='ignore')}"
+        )
+
+def probe_keyframes(video_path: Path) -> List[float]:
+    """
+    Lấy thời điểm các keyframe của video
+    
+    Chỉ decode keyframe (-skip_frame nokey) nên nhanh hơn nhiều so với
+    đọc toàn bộ video.
+    
+    Args:
+        video_path: File video
+    
+    Returns:
+        List[float]: Thời điểm keyframe (giây), tăng dần
+    """
+    cmd = [get_setting("FFMPEG_BINARY"), "-hide_banner", "-nostats",
+           "-skip_frame", "nokey", "-i", str(video_path),
+           "-map", "0:v:0", "-vf", "showinfo", "-f", "null", "-"]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    
+    if result.returncode != 0:
+        raise IOError(
+            f"ffmpeg failed ({result.returncode}): {result.stderr.decode(errors='ignore')}"
+        )
+    
+    times = re.findall(r"pts_time:\s*([\d.]+)", result.stderr.decode(errors='ignore'))
+    return sorted(float(t) for t in times)
+
+def load_keyframe_index(video_path: Path) -> Optional[Dict[str, Any]]:
+    """Đọc sidecar <video>.keyframes.json do VideoProducer ghi (None nếu không có)"""
+    index_path = Path(video_path).with_suffix('.keyframes.json')
+    if not index_path.exists():
+        return None
+    
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable keyframe index {index_path}: {e}")
+        return None
+
+def keyframe_before(keyframes: List[float], t: float) -> float:
+    """Keyframe gần nhất không sau thời điểm t"""
+    idx = bisect.bisect_right(keyframes, t + 1e-3) - 1
+    return keyframes[idx] if idx >= 0 else 0.0
+
+def keyframe_after(keyframes: List[float], t: float) -> Optional[float]:
+    """Keyframe đầu tiên không trước thời điểm t (None nếu không có)"""
+    idx = bisect.bisect_left(keyframes, t - 1e-3)
+    return keyframes[idx] if idx < len(keyframes) else None
+
+def has_audio_stream(video_path: Path) -> bool:
+    """Video có track audio hay không (đọc phần header ffmpeg in ra)"""
+    cmd = [get_setting("FFMPEG_BINARY"), "-hide_banner", "-i", str(video_path)]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return re.search(r"Stream #\d+:\d+.*: Audio:", result.stderr.decode(errors='ignore')) is not None
+
+def probe_stream_starts(video_path: Path) -> Dict[str, float]:
+    """
+    PTS nhỏ nhất (giây) của từng loại stream, để kiểm tra audio/video thẳng hàng
+    
+    Chỉ đọc packet (-c copy, muxer framemd5), không decode.
+    
+    Returns:
+        Dict[str, float]: {'video': ..., 'audio': ...} cho các stream có trong file
+    """
+    cmd = [get_setting("FFMPEG_BINARY"), "-hide_banner", "-loglevel", "error",
+           "-i", str(video_path), "-map", "0", "-c", "copy", "-f", "framemd5", "-"]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    
+    if result.returncode != 0:
+        raise IOError(
+            f"ffmpeg failed ({result.returncode}): {result.stderr.decode(errors='ignore')}"
+        )
+    
+    time_bases: Dict[int, float] = {}
+    media_types: Dict[int, str] = {}
+    starts: Dict[str, float] = {}
+    for line in result.stdout.decode(errors='ignore').splitlines():
+        header = re.match(r"#(tb|media_type) (\d+): (\S+)", line)
+        if header:
+            kind, index, value = header.groups()
+            if kind == 'tb':
+                num, den = value.split('/')
+                time_bases[int(index)] = int(num) / int(den)
+            else:
+                media_types[int(index)] = value
+            continue
+        if not line or line.startswith('#'):
+            continue
+        
+        # stream_index, dts, pts, duration, size, hash
+        fields = [field.strip() for field in line.split(',')]
+        index = int(fields[0])
+        pts = int(fields[2]) * time_bases[index]
+        media_type = media_types.get(index, str(index))
+        starts[media_type] = min(starts.get(media_type, pts), pts)
+    
+    return starts
+
+def _parameter_sets(video_path: Path, codec: str) -> List[str]:
+    """SPS/PPS (và VPS với HEVC) của frame đầu tiên, dạng hex"""
+    bsf, fmt, types = {
+        'h264': ("h264_mp4toannexb", "h264", lambda nal: nal[0] & 0x1f in (7, 8)),
+        'hevc': ("hevc_mp4toannexb", "hevc", lambda nal: (nal[0] >> 1) & 0x3f in (32, 33, 34))
+    }[codec]
+    cmd = [get_setting("FFMPEG_BINARY"), "-hide_banner", "-loglevel", "error",
+           "-i", str(video_path), "-map", "0:v:0", "-c", "copy", "-frames:v", "1",
+           "-bsf:v", bsf, "-f", fmt, "-"]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    
+    if result.returncode != 0:
+        raise IOError(
+            f"ffmpeg failed ({result.returncode}): {result.stderr.decode(errors='ignore')}"
+        )
+    
+    nals = (nal.rstrip(b"\x00") for nal in result.stdout.split(b"\x00\x00\x01"))
+    return [nal.hex() for nal in nals if nal and types(nal)]
+
+def stream_signature(video_path: Path) -> List[str]:
+    """
+    Các thuộc tính stream phải giống nhau để ghép bằng concat demuxer + stream copy
+    
+    Gồm codec/profile, pix_fmt, độ phân giải, fps, timebase, sample rate,
+    channel layout (từ header ffmpeg in ra, bỏ bitrate) và SPS/PPS của
+    H.264/HEVC. Chỉ đọc header và packet video đầu tiên, không decode.
+    
+    Returns:
+        List[str]: Mô tả từng stream theo thứ tự trong file
+    """
+    cmd = [get_setting("FFMPEG_BINARY"), "-hide_banner", "-i", str(video_path)]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    
+    signature = []
+    for kind, params in re.findall(r"Stream #\d+:\d+\S*: (Video|Audio): (.*)",
+                                   result.stderr.decode(errors='ignore')):
+        params = re.sub(r",\s*\d+ kb/s|\s*\((default|attached pic)\)", "", params).strip()
+        signature.append(f"{kind}: {params}")
+        
+        codec = params.split()[0].rstrip(',')
+        if kind == 'Video' and codec in ('h264', 'hevc'):
+            signature.extend(_parameter_sets(video_path, codec))
+    
+    if not signature:
+        raise IOError(f"No video/audio streams found in {video_path}")
+    return signature
+
+def streams_match(segment_paths: List[Path]) -> bool:
+    """Các segment có ghép được bằng stream copy hay không"""
+    signatures = [stream_signature(path) for path in segment_paths]
+    return all(signature == signatures[0] for signature in signatures[1:])
+
+def cut_segments(input_path: Path,
+                 cuts: List[Tuple[float, float, Path, bool]],
+                 fps: Optional[float] = None) -> List[Path]:
+    """
+    Cắt nhiều đoạn từ một video bằng stream copy trong một lần demux
+    
+    Mỗi đoạn là một output của cùng một lệnh ffmpeg, nên file nguồn chỉ
+    được đọc một lần. Thời điểm bắt đầu nên nằm trên keyframe.
+    
+    Video được seek sớm hơn keyframe một chút (KEYFRAME_SEEK_MARGIN), nên
+    audio không thể nằm chung output đó: nó sẽ bắt đầu trước frame đầu
+    tiên. Audio được cắt thành output riêng bắt đầu đúng tại start rồi mux
+    lại với video (stream copy), nên hai track cùng bắt đầu tại 0.
+    
+    Args:
+        input_path: Video nguồn
+        cuts: Danh sách (start, end, output_path, with_audio)
+        fps: Khi điểm kết thúc cũng là keyframe, giới hạn đúng số frame của
+            đoạn (với B-frame, -t đơn thuần thừa vài frame sau điểm cắt)
+    
+    Returns:
+        List[Path]: Đường dẫn các đoạn đã cắt
+    """
+    if not cuts:
+        return []
+    
+    with_audio = any(cut[3] for cut in cuts) and has_audio_stream(input_path)
+    
+    args = ["-i", str(input_path)]
+    muxes: List[Tuple[Path, Path, Path]] = []
+    for start, end, output_path, clip_audio in cuts:
+        output_path = Path(output_path)
+        video_path = output_path
+        if clip_audio and with_audio:
+            video_path = output_path.with_name(f".{output_path.stem}.video{output_path.suffix}")
+            audio_path = output_path.with_name(f".{output_path.stem}.audio.m4a")
+            muxes.append((video_path, audio_path, output_path))
+            
+            # Audio packets are all sync points, so it is cut exactly at start
+            args += ["-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-map", "0:a:0",
+                     "-c", "copy", "-avoid_negative_ts", "make_zero", str(audio_path)]
+        
+        # Seek a little before the keyframe: with B-frames its DTS precedes its
+        # PTS, and stream copy would otherwise skip ahead to the next keyframe
+        seek = start - KEYFRAME_SEEK_MARGIN
+        if seek > 0:
+            args += ["-ss", f"{seek:.3f}"]
+        args += ["-t", f"{end - max(seek, 0):.3f}", "-map", "0:v:0"]
+        if fps:
+            # Closed GOPs: the first N packets in decode order are exactly the span
+            args += ["-frames:v", str(int(round((end - start) * fps)))]
+        args += ["-c", "copy", "-avoid_negative_ts", "make_zero", str(video_path)]
+    
+    run_ffmpeg(args)
+    
+    try:
+        for video_path, audio_path, output_path in muxes:
+            run_ffmpeg(["-i", str(video_path), "-i", str(audio_path),
+                        "-map", "0:v", "-map", "1:a", "-c", "copy", str(output_path)])
+    finally:
+        for video_path, audio_path, _ in muxes:
+            video_path.unlink(missing_ok=True)
+            audio_path.unlink(missing_ok=True)
+    
+    return [output_path for _, _, output_path, _ in cuts]
+
+def concat_segments(segment_paths: List[Path],
+                    output_path: Path,
+                    audio_path: Optional[Path] = None) -> Path:
+    """
+    Ghép các segment đã encode bằng stream copy (không encode lại)
+    
+    Args:
+        segment_paths: Danh sách segment cùng codec/độ phân giải/fps
+        output_path: File video đầu ra
+        audio_path: File chứa track audio để mux kèm (tùy chọn)
+    
+    Returns:
+        Path: Đường dẫn video đã ghép
+    """
+    if not segment_paths:
+        raise ValueError("No segments to concatenate")
+    
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as f:
+        for segment_path in segment_paths:
+            escaped = str(Path(segment_path).resolve()).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+        list_path = Path(f.name)
+    
+    try:
+        args = ["-f", "concat", "-safe", "0", "-i", str(list_path)]
+        if audio_path:
+            args += ["-i", str(audio_path), "-map", "0:v", "-map", "1:a?", "-shortest"]
+        args += ["-c", "copy", str(output_path)]
+        
+        run_ffmpeg(args)
+    finally:
+        list_path.unlink(missing_ok=True)
+    
+    return output_path
+
+def concat_reencode(segment_paths: List[Path],
+                    output_path: Path,
+                    size: Tuple[int, int],
+                    fps: float,
+                    encode_args: List[str],
+                    with_audio: bool = True) -> Path:
+    """
+    Ghép các segment bằng filter concat và encode lại
+    
+    Dùng khi các segment không khớp thông số (streams_match trả False):
+    mỗi đoạn được đưa về cùng kích thước/fps, audio được concat tự chuyển
+    về cùng sample rate và channel layout.
+    
+    Args:
+        segment_paths: Danh sách segment
+        output_path: File video đầu ra
+        size: Kích thước đầu ra (width, height)
+        fps: Frame rate đầu ra
+        encode_args: Tham số encode (-c:v, -preset, -b:v, -c:a...)
+        with_audio: Mọi segment đều có audio và đầu ra cần audio
+    
+    Returns:
+        Path: Đường dẫn video đã ghép
+    """
+    if not segment_paths:
+        raise ValueError("No segments to concatenate")
+    
+    width, height = size
+    args, filters, streams = [], [], []
+    for i, segment_path in enumerate(segment_paths):
+        args += ["-i", str(segment_path)]
+        filters.append(f"[{i}:v]scale={width}:{height},setsar=1,fps={fps}[v{i}]")
+        streams.append(f"[v{i}]" + (f"[{i}:a]" if with_audio else ""))
+    
+    outputs = "[v][a]" if with_audio else "[v]"
+    filters.append(f"{''.join(streams)}concat=n={len(segment_paths)}:v=1:a={int(with_audio)}{outputs}")
+    args += ["-filter_complex", ";".join(filters), "-map", "[v]"]
+    if with_audio:
+        args += ["-map", "[a]"]
+    
+    run_ffmpeg(args + encode_args + [str(output_path)])
+    return output_path
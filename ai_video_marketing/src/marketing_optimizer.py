@@ -241,6 +241,14 @@ class MarketingOptimizer:
         try:
             import moviepy.editor as mp
             
+            output_path = Path(video_path).parent / f"optimized_{platform_config.platform}_{Path(video_path).name}"
+            
+            # Duration-only changes don't need decoding: cut/loop the encoded streams
+            if recommendations["duration_optimization"] and not recommendations["resolution_optimization"]:
+                return self._retime_with_stream_copy(
+                    video_path, output_path, recommendations["duration_optimization"]
+                )
+            
             # Load video
             video = mp.VideoFileClip(video_path)
             
@@ -264,7 +272,6 @@ class MarketingOptimizer:
                 optimized_video = optimized_video.resize(resolution_rec["optimal"])
             
             # Save optimized video
-            output_path = Path(video_path).parent / f"optimized_{platform_config.platform}_{Path(video_path).name}"
             optimized_video.write_videofile(
                 str(output_path),
                 fps=30,
@@ -282,6 +289,23 @@ class MarketingOptimizer:
             logger.error(f"Error creating optimized video: {e}")
             return video_path  # Return original if optimization fails
     
+    def _retime_with_stream_copy(self,
+                                 video_path: str,
+                                 output_path: Path,
+                                 duration_rec: Dict[str, Any]) -> str:
+        """Trim hoặc lặp video tới thời lượng tối ưu bằng stream copy (không encode lại)"""
+        from ffmpeg_utils import run_ffmpeg
+        
+        args = []
+        if duration_rec["action"] == "extend":
+            # Loop the input indefinitely, -t bounds the output
+            args += ["-stream_loop", "-1"]
+        args += ["-i", video_path, "-t", f"{duration_rec['optimal']:.3f}",
+                 "-map", "0", "-c", "copy", str(output_path)]
+        
+        run_ffmpeg(args)
+        return str(output_path)
+    
     def _calculate_optimization_score(self,
                                     video_analysis: Dict[str, Any],
                                     platform_config: PlatformOptimization) -> float:
@@ -4,5 +4,8 @@ Phân tích xu hướng video từ các platform
 """
 
 from .trend_analyzer import TrendAnalyzer, VideoData
+from .video_table import VideoTable
+from .stream import TrendStream
+from .aggregates import TrendAggregate
 
-__all__ = ['TrendAnalyzer', 'VideoData']
+__all__ = ['TrendAnalyzer', 'VideoData', 'VideoTable', 'TrendStream', 'TrendAggregate']
@@ -0,0 +1,243 @@
+"""
+Aggregates - Tổng hợp trend gộp được, dùng cho phân tích tuần tự và phân tán
+"""
+import heapq
+import logging
+import numpy as np
+import pandas as pd
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from .video_table import VideoTable
+from .sketches import create_tag_summary
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SHORT_VIDEO_SECONDS = 30
+LONG_VIDEO_SECONDS = 120
+HIGH_ENGAGEMENT_RATE = 0.05
+DURATION_BINS = 5
+TOP_VIDEOS = 5
+TOP_TAGS = 20
+
+def duration_bin_edges(durations: np.ndarray) -> np.ndarray:
+    """Biên của DURATION_BINS khoảng thời lượng, giống pd.cut(bins=5) trên toàn bộ dữ liệu"""
+    # pd.cut derives its edges from the min and max only
+    bounds = np.array([durations.min(), durations.max()], dtype=np.float64)
+    return pd.cut(bounds, bins=DURATION_BINS, retbins=True)[1]
+
+class TrendAggregate:
+    """
+    Tổng hợp gộp được của một nhóm video
+    
+    Tổng số nguyên, bộ đếm, top video theo (views, vị trí) và bộ đếm tags
+    (Counter hoặc sketch gộp được) gộp chính xác. Platform và tag mang theo
+    vị trí xuất hiện đầu tiên trong toàn bộ dữ liệu, nên khi ngang số đếm
+    chúng giữ thứ tự gặp đầu tiên như bản tuần tự gốc (value_counts, dict).
+    Tổng engagement rate là tổng float, nên kết quả gộp từ nhiều shard chỉ
+    lệch bản một shard ở mức sai số làm tròn.
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self.views = 0
+        self.likes = 0
+        self.comments = 0
+        self.duration = 0
+        self.platforms: Counter = Counter()
+        self.platform_first: Dict[str, int] = {}
+        self.duration_buckets: Counter = Counter()
+        self.bin_edges: Optional[np.ndarray] = None
+        self.bin_counts = np.zeros(DURATION_BINS, dtype=np.int64)
+        self.bin_views = np.zeros(DURATION_BINS, dtype=np.int64)
+        self.rate_sum = 0.0
+        self.rate_count = 0
+        self.high_engagement = 0
+        self.platform_rates: Dict[str, Tuple[float, int]] = {}  # platform -> (sum, count)
+        self.top_videos: List[Tuple[int, int, str, int]] = []  # (views, -position, title, likes)
+        self.tags: Any = Counter()
+        self.tag_first: Dict[str, Tuple[int, int]] = {}  # tag -> (position, index in row)
+    
+    @classmethod
+    def from_table(cls,
+                   table: VideoTable,
+                   positions: np.ndarray,
+                   bin_edges: np.ndarray,
+                   tag_config: Optional[Dict[str, Any]] = None) -> 'TrendAggregate':
+        """
+        Tổng hợp một shard
+        
+        Args:
+            table: Các video của shard
+            positions: Vị trí của từng dòng trong toàn bộ dữ liệu (để xếp
+                hạng ngang bằng giống bản tuần tự)
+            bin_edges: Biên khoảng thời lượng tính trên toàn bộ dữ liệu
+            tag_config: TREND_CONFIG["tag_counting"]
+        
+        Returns:
+            TrendAggregate: Tổng hợp của shard
+        """
+        aggregate = cls()
+        aggregate.bin_edges = bin_edges
+        aggregate.tags = create_tag_summary(tag_config) or Counter()
+        if not len(table):
+            return aggregate
+        
+        views = table.column('views')
+        likes = table.column('likes')
+        comments = table.column('comments')
+        duration = table.column('duration')
+        platforms = table.column('platform')
+        
+        aggregate.count = len(table)
+        aggregate.views = int(views.sum())
+        aggregate.likes = int(likes.sum())
+        aggregate.comments = int(comments.sum())
+        aggregate.duration = int(duration.sum())
+        aggregate.platforms = Counter(platforms.tolist())
+        for platform, position in zip(platforms.tolist(), positions.tolist()):
+            if platform not in aggregate.platform_first or position < aggregate.platform_first[platform]:
+                aggregate.platform_first[platform] = position
+        
+        # Duration patterns
+        aggregate.duration_buckets = Counter({
+            'short_videos': int((duration <= SHORT_VIDEO_SECONDS).sum()),
+            'medium_videos': int(((duration > SHORT_VIDEO_SECONDS) & (duration <= LONG_VIDEO_SECONDS)).sum()),
+            'long_videos': int((duration > LONG_VIDEO_SECONDS).sum())
+        })
+        codes = pd.cut(duration, bins=bin_edges).codes
+        in_range = codes >= 0
+        aggregate.bin_counts = np.bincount(codes[in_range], minlength=DURATION_BINS).astype(np.int64)
+        aggregate.bin_views = np.zeros(DURATION_BINS, dtype=np.int64)
+        np.add.at(aggregate.bin_views, codes[in_range], views[in_range])
+        
+        # Engagement patterns (0/0 is undefined and skipped, like pandas mean)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = (likes + comments) / views
+        defined = ~np.isnan(rates)
+        aggregate.rate_sum = float(rates[defined].sum())
+        aggregate.rate_count = int(defined.sum())
+        aggregate.high_engagement = int((rates[defined] > HIGH_ENGAGEMENT_RATE).sum())
+        for platform in aggregate.platforms:
+            mask = defined & (platforms == platform)
+            aggregate.platform_rates[platform] = (float(rates[mask].sum()), int(mask.sum()))
+        
+        # Shard-local top videos, ties broken by global position
+        top = np.lexsort((positions, -views))[:TOP_VIDEOS]
+        titles = table.column('title')
+        aggregate.top_videos = [(int(views[i]), -int(positions[i]), titles[i], int(likes[i])) for i in top]
+        
+        aggregate.tags.update(table.tag_values)
+        if isinstance(aggregate.tags, Counter):
+            # First occurrence of every tag as (row position, index within the row)
+            offsets = table.tag_offsets
+            rows = np.repeat(positions, np.diff(offsets)).tolist()
+            within = (np.arange(offsets[-1]) - np.repeat(offsets[:-1], np.diff(offsets))).tolist()
+            for tag, key in zip(table.tag_values, zip(rows, within)):
+                if tag not in aggregate.tag_first or key < aggregate.tag_first[tag]:
+                    aggregate.tag_first[tag] = key
+        return aggregate
+    
+    def merge(self, other: 'TrendAggregate') -> 'TrendAggregate':
+        """Tổng hợp mới của cả hai nhóm video"""
+        merged = TrendAggregate()
+        merged.count = self.count + other.count
+        merged.views = self.views + other.views
+        merged.likes = self.likes + other.likes
+        merged.comments = self.comments + other.comments
+        merged.duration = self.duration + other.duration
+        merged.platforms = self.platforms + other.platforms
+        merged.platform_first = _merge_first(self.platform_first, other.platform_first)
+        merged.duration_buckets = self.duration_buckets + other.duration_buckets
+        merged.bin_edges = self.bin_edges if self.bin_edges is not None else other.bin_edges
+        merged.bin_counts = self.bin_counts + other.bin_counts
+        merged.bin_views = self.bin_views + other.bin_views
+        merged.rate_sum = self.rate_sum + other.rate_sum
+        merged.rate_count = self.rate_count + other.rate_count
+        merged.high_engagement = self.high_engagement + other.high_engagement
+        for platform in set(self.platform_rates) | set(other.platform_rates):
+            total, count = self.platform_rates.get(platform, (0.0, 0))
+            other_total, other_count = other.platform_rates.get(platform, (0.0, 0))
+            merged.platform_rates[platform] = (total + other_total, count + other_count)
+        merged.top_videos = heapq.nlargest(TOP_VIDEOS, self.top_videos + other.top_videos)
+        
+        if isinstance(self.tags, Counter):
+            merged.tags = self.tags + other.tags
+            merged.tag_first = _merge_first(self.tag_first, other.tag_first)
+        else:
+            merged.tags = self.tags.merge(other.tags)
+        return merged
+    
+    def _optimal_duration(self) -> Optional[pd.Interval]:
+        """Khoảng thời lượng có views trung bình cao nhất"""
+        observed = self.bin_counts > 0
+        if not observed.any():
+            return None
+        means = np.full(DURATION_BINS, -np.inf)
+        means[observed] = self.bin_views[observed] / self.bin_counts[observed]
+        # Same (rounded) interval labels as pd.cut gives on the full column
+        labels = pd.cut(np.array([], dtype=np.float64), bins=self.bin_edges).categories
+        return labels[int(np.argmax(means))]
+    
+    def _common_tags(self) -> Dict[str, int]:
+        """TOP_TAGS tags phổ biến, ngang số đếm thì theo thứ tự gặp đầu tiên"""
+        if isinstance(self.tags, Counter):
+            ranked = sorted(self.tags.items(), key=lambda pair: (-pair[1], self.tag_first[pair[0]]))
+            return dict(ranked[:TOP_TAGS])
+        return dict(self.tags.top(TOP_TAGS))
+    
+    def to_analysis(self) -> Dict[str, Any]:
+        """Kết quả phân tích theo định dạng của analyze_trending_patterns"""
+        if not self.count:
+            return {}
+        
+        return {
+            'total_videos': self.count,
+            'platform_distribution': dict(sorted(
+                self.platforms.items(), key=lambda pair: (-pair[1], self.platform_first[pair[0]])
+            )),
+            'avg_views': self.views / self.count,
+            'avg_likes': self.likes / self.count,
+            'avg_comments': self.comments / self.count,
+            'avg_duration': self.duration / self.count,
+            'top_performing_videos': [
+                {'title': title, 'views': views, 'likes': likes}
+                for views, _, title, likes in sorted(self.top_videos, reverse=True)
+            ],
+            'common_tags': self._common_tags(),
+            'duration_analysis': {
+                'short_videos': self.duration_buckets['short_videos'],
+                'medium_videos': self.duration_buckets['medium_videos'],
+                'long_videos': self.duration_buckets['long_videos'],
+                'optimal_duration': self._optimal_duration()
+            },
+            'engagement_analysis': {
+                'avg_engagement_rate': _mean(self.rate_sum, self.rate_count),
+                'high_engagement_videos': self.high_engagement,
+                'platform_engagement': {
+                    platform: _mean(*self.platform_rates[platform])
+                    for platform in sorted(self.platform_rates)
+                }
+            }
+        }
+
+def _merge_first(first: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """Gộp vị trí xuất hiện đầu tiên của hai shard"""
+    merged = dict(first)
+    for key, position in other.items():
+        if key not in merged or position < merged[key]:
+            merged[key] = position
+    return merged
+
+def _mean(total: float, count: int) -> float:
+    """Trung bình như pandas mean: NaN khi không có giá trị"""
+    return total / count if count else float('nan')
+
+def aggregate_shard(table: VideoTable,
+                    positions: np.ndarray,
+                    bin_edges: np.ndarray,
+                    tag_config: Optional[Dict[str, Any]] = None) -> TrendAggregate:
+    """Hàm chạy trong process con: tổng hợp một shard"""
+    return TrendAggregate.from_table(table, positions, bin_edges, tag_config)
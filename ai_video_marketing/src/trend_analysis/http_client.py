@@ -0,0 +1,204 @@
+"""
+HTTP Client - Gọi API bất đồng bộ với connection pool và giới hạn tốc độ theo platform
+"""
+import time
+import asyncio
+import logging
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional
+
+from .response_cache import ResponseCache
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Token bucket cho asyncio: tối đa `rate` request/giây, cho phép burst `capacity`
+    
+    Request chỉ chờ đúng phần token còn thiếu thay vì sleep cố định. Số
+    token sống qua các event loop (mỗi lần gọi asyncio.run), chỉ lock được
+    tạo lại cho loop mới, nên giới hạn áp cho cả client chứ không riêng
+    từng lượt gọi.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Số token nạp lại mỗi giây
+            capacity: Số token tối đa (mặc định bằng rate, tối thiểu 1)
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        # Created lazily inside the running event loop
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop = None
+    
+    def _refill(self):
+        """Nạp token theo thời gian đã trôi qua"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def _bind_loop(self):
+        """Tạo lock cho event loop hiện tại, giữ nguyên số token"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+    
+    async def acquire(self, tokens: float = 1.0):
+        """Chờ tới khi có đủ token rồi lấy ra"""
+        self._bind_loop()
+        # The lock keeps waiters in FIFO order
+        async with self._lock:
+            self._refill()
+            if self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+
+class AsyncHTTPClient:
+    """
+    Client HTTP cho asyncio dùng chung một requests.Session có connection pool
+    
+    Request chạy trên thread pool cùng kích thước với pool kết nối, số request
+    đồng thời bị giới hạn bằng semaphore, và mỗi platform có token bucket
+    riêng. Response 429/503 được thử lại theo Retry-After. Nếu có cache,
+    response JSON còn hạn được dùng lại mà không gọi API.
+    """
+    
+    def __init__(self,
+                 max_concurrency: int = 8,
+                 rate_limits: Optional[Dict[str, Dict[str, float]]] = None,
+                 timeout: float = 10.0,
+                 max_retries: int = 3,
+                 headers: Optional[Dict[str, str]] = None,
+                 cache: Optional[ResponseCache] = None):
+        """
+        Args:
+            max_concurrency: Số request đồng thời tối đa (cũng là kích thước pool)
+            rate_limits: {platform: {"rate": req/s, "burst": n}}
+            timeout: Timeout mỗi request (giây)
+            max_retries: Số lần thử lại khi bị giới hạn tốc độ
+            headers: Header mặc định cho mọi request
+            cache: Cache response JSON (tùy chọn)
+        """
+        self.max_concurrency = max_concurrency
+        self.rate_limits = rate_limits or {}
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.cache = cache
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+        
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix='trend-http')
+        # Created lazily inside the running event loop; buckets outlive loops
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._loop = None
+    
+    def _bind_loop(self):
+        """Tạo semaphore cho event loop hiện tại (token bucket giữ nguyên)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+    
+    def _bucket(self, platform: str) -> Optional[TokenBucket]:
+        """Token bucket của platform (None nếu không giới hạn)"""
+        if platform not in self._buckets:
+            limit = self.rate_limits.get(platform)
+            self._buckets[platform] = (
+                TokenBucket(limit['rate'], limit.get('burst')) if limit else None
+            )
+        return self._buckets[platform]
+    
+    def _retry_delay(self, response: requests.Response, attempt: int) -> float:
+        """Thời gian chờ trước khi thử lại: Retry-After hoặc backoff lũy thừa"""
+        retry_after = response.headers.get('Retry-After')
+        try:
+            return max(float(retry_after), 0.0)
+        except (TypeError, ValueError):
+            return 0.5 * (2 ** attempt)
+    
+    async def request(self,
+                      platform: str,
+                      url: str,
+                      params: Optional[Dict[str, Any]] = None,
+                      headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        Gửi GET request có giới hạn tốc độ theo platform
+        
+        Args:
+            platform: Tên platform (chọn token bucket)
+            url: URL endpoint
+            params: Query params
+            headers: Header bổ sung
+        
+        Returns:
+            requests.Response: Response cuối cùng (đã thử lại nếu bị 429/503)
+        """
+        self._bind_loop()
+        loop = asyncio.get_running_loop()
+        bucket = self._bucket(platform)
+        
+        for attempt in range(self.max_retries + 1):
+            if bucket:
+                await bucket.acquire()
+            
+            async with self._semaphore:
+                response = await loop.run_in_executor(
+                    self._executor,
+                    lambda: self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                )
+            
+            if response.status_code not in (429, 503) or attempt == self.max_retries:
+                return response
+            
+            delay = self._retry_delay(response, attempt)
+            logger.warning(f"{platform} returned {response.status_code}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        
+        return response
+    
+    async def get_json(self,
+                       platform: str,
+                       url: str,
+                       params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """GET và parse JSON (qua cache nếu có), raise HTTPError nếu response lỗi"""
+        entry = self.cache.lookup(url, params) if self.cache else None
+        if entry and entry["fresh"]:
+            return entry["body"]
+        
+        # Stale entries are revalidated instead of refetched
+        headers = self.cache.conditional_headers(entry) if self.cache else None
+        response = await self.request(platform, url, params, headers=headers)
+        
+        if response.status_code == 304 and entry:
+            self.cache.refresh(url, params, entry)
+            return entry["body"]
+        
+        response.raise_for_status()
+        body = response.json()
+        if self.cache:
+            self.cache.store(url, params, body,
+                             etag=response.headers.get('ETag'),
+                             last_modified=response.headers.get('Last-Modified'))
+        return body
+    
+    def close(self):
+        """Đóng session và thread pool"""
+        self._executor.shutdown(wait=False)
+        self.session.close()
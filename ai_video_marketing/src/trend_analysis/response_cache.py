@@ -0,0 +1,193 @@
+"""
+Response Cache - Cache response API (JSON) có TTL, lưu bằng SQLite hoặc file
+"""
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Params that don't change the response (credentials) are left out of the key
+IGNORED_PARAMS = ("key", "access_token")
+
+class _SQLiteBackend:
+    """Lưu entry trong một bảng SQLite (an toàn khi nhiều tiến trình dùng chung)"""
+    
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, entry TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT entry FROM responses WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def set(self, key: str, entry: Dict[str, Any]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, entry, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(entry, ensure_ascii=False), entry["fetched_at"])
+            )
+    
+    def purge(self, older_than: float):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE stored_at < ?", (older_than,))
+    
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+class _FileBackend:
+    """Mỗi entry là một file JSON, ghi ra file tạm rồi đổi tên"""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+    
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._file(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def set(self, key: str, entry: Dict[str, Any]):
+        target = self._file(key)
+        temp = target.with_name(f"{target.stem}.{threading.get_ident()}.tmp")
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        temp.replace(target)
+    
+    def purge(self, older_than: float):
+        for path in self.path.glob("*.json"):
+            if path.stat().st_mtime < older_than:
+                path.unlink(missing_ok=True)
+    
+    def clear(self):
+        for path in self.path.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+class ResponseCache:
+    """
+    Cache response JSON theo endpoint và params đã chuẩn hóa
+    
+    Entry còn hạn (trong TTL) được trả thẳng, không gọi API. Entry hết hạn
+    nhưng có ETag/Last-Modified được dùng để revalidate có điều kiện: nếu
+    server trả 304 thì body cũ được dùng lại và gia hạn TTL.
+    """
+    
+    def __init__(self,
+                 path: Path,
+                 backend: str = "sqlite",
+                 ttl: float = 3600,
+                 endpoint_ttl: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            path: File SQLite hoặc thư mục (backend file)
+            backend: "sqlite" hoặc "file"
+            ttl: Thời gian sống mặc định của entry (giây)
+            endpoint_ttl: TTL riêng theo tên endpoint cuối URL, vd. {"search": 21600}
+        """
+        path = Path(path)
+        if backend == "sqlite":
+            self.backend = _SQLiteBackend(path)
+        elif backend == "file":
+            self.backend = _FileBackend(path)
+        else:
+            raise ValueError(f"Unknown cache backend: {backend}")
+        
+        self.ttl = ttl
+        self.endpoint_ttl = endpoint_ttl or {}
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0}
+    
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Khóa cache: URL + params đã sắp xếp, bỏ các params chứa credential"""
+        normalized = sorted(
+            (str(name), str(value)) for name, value in (params or {}).items()
+            if name not in IGNORED_PARAMS and value is not None
+        )
+        raw = json.dumps([url.rstrip('/'), normalized], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def ttl_for(self, url: str) -> float:
+        """TTL của endpoint (theo đoạn cuối của URL)"""
+        return self.endpoint_ttl.get(url.rstrip('/').rsplit('/', 1)[-1], self.ttl)
+    
+    def lookup(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Tìm entry trong cache
+        
+        Args:
+            url: URL endpoint
+            params: Query params
+        
+        Returns:
+            Optional[Dict]: Entry {body, etag, last_modified, fetched_at, fresh}
+                hoặc None nếu chưa có
+        """
+        entry = self.backend.get(self.make_key(url, params))
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        
+        entry["fresh"] = time.time() - entry["fetched_at"] < self.ttl_for(url)
+        if entry["fresh"]:
+            self.stats["hits"] += 1
+        return entry
+    
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Header If-None-Match/If-Modified-Since để revalidate entry hết hạn"""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+    
+    def store(self,
+              url: str,
+              params: Optional[Dict[str, Any]],
+              body: Any,
+              etag: Optional[str] = None,
+              last_modified: Optional[str] = None):
+        """Lưu response thành công vào cache"""
+        self.backend.set(self.make_key(url, params), {
+            "url": url,
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time()
+        })
+    
+    def refresh(self, url: str, params: Optional[Dict[str, Any]], entry: Dict[str, Any]):
+        """Gia hạn entry sau khi server xác nhận không đổi (304)"""
+        self.stats["revalidated"] += 1
+        self.store(url, params, entry["body"], entry.get("etag"), entry.get("last_modified"))
+    
+    def purge(self, max_age: Optional[float] = None):
+        """Xóa entry cũ hơn max_age giây (mặc định: TTL lớn nhất)"""
+        max_age = max_age or max([self.ttl] + list(self.endpoint_ttl.values()))
+        self.backend.purge(time.time() - max_age)
+    
+    def clear(self):
+        """Xóa toàn bộ cache"""
+        self.backend.clear()
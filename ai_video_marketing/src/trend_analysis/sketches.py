@@ -0,0 +1,371 @@
+"""
+Sketches - Cấu trúc dữ liệu xấp xỉ, bộ nhớ cố định để đếm tần suất tags
+"""
+import math
+import heapq
+import hashlib
+import logging
+import numpy as np
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=65536)
+def _hash_indexes(item: str, width: int, depth: int) -> Tuple[int, ...]:
+    """Vị trí của item trên từng hàng (double hashing từ một digest blake2b)"""
+    digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return tuple((h1 + i * h2) % width for i in range(depth))
+
+class CountMinSketch:
+    """
+    Count-min sketch: đếm tần suất xấp xỉ trong bảng depth x width cố định
+    
+    Ước lượng không bao giờ thấp hơn số đếm thật. Hash dựa trên blake2b nên
+    ổn định giữa các tiến trình (khác hash() của Python).
+    """
+    
+    def __init__(self, width: int = 2048, depth: int = 4):
+        """
+        Args:
+            width: Số cột mỗi hàng (lớn hơn = sai số nhỏ hơn)
+            depth: Số hàng/hàm hash (lớn hơn = xác suất sai nhỏ hơn)
+        """
+        self.width = int(width)
+        self.depth = int(depth)
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total = 0
+        # Row views: scalar updates on them are cheaper than fancy indexing
+        self._row_views = list(self.table)
+    
+    @classmethod
+    def from_error(cls, epsilon: float, delta: float = 0.001) -> 'CountMinSketch':
+        """
+        Tạo sketch theo cận sai số
+        
+        Args:
+            epsilon: Sai số cộng thêm tối đa, tính theo tỉ lệ tổng số đếm
+            delta: Xác suất vượt cận sai số
+        
+        Returns:
+            CountMinSketch: Sketch với width = e/epsilon, depth = ln(1/delta)
+        """
+        return cls(width=math.ceil(math.e / epsilon), depth=math.ceil(math.log(1 / delta)))
+    
+    def add(self, item: str, count: int = 1) -> int:
+        """Cộng count cho item, trả về ước lượng mới của item"""
+        estimate = None
+        for row, index in zip(self._row_views, _hash_indexes(item, self.width, self.depth)):
+            row[index] += count
+            value = row[index]
+            estimate = value if estimate is None or value < estimate else estimate
+        self.total += count
+        return int(estimate)
+    
+    def estimate(self, item: str) -> int:
+        """Ước lượng số lần xuất hiện của item"""
+        return int(min(row[index] for row, index in
+                       zip(self._row_views, _hash_indexes(item, self.width, self.depth))))
+    
+    def subtract(self, other: 'CountMinSketch'):
+        """Trừ một sketch cùng kích thước (vd. khi bucket rời khỏi cửa sổ)"""
+        self._check_compatible(other)
+        self.table -= other.table
+        self.total -= other.total
+    
+    def merge(self, other: 'CountMinSketch') -> 'CountMinSketch':
+        """Sketch mới đếm cả hai luồng (vd. hai shard hoặc hai ngày)"""
+        self._check_compatible(other)
+        merged = CountMinSketch(self.width, self.depth)
+        merged.table += self.table + other.table
+        merged.total = self.total + other.total
+        return merged
+    
+    def _check_compatible(self, other: 'CountMinSketch'):
+        """Hai sketch phải cùng width/depth mới cộng trừ được"""
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Count-min sketches must have the same width and depth")
+    
+    def clear(self):
+        """Đưa sketch về rỗng"""
+        self.table[:] = 0
+        self.total = 0
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Row views would be pickled as independent copies of the table rows
+        state = self.__dict__.copy()
+        del state['_row_views']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._row_views = list(self.table)
+
+class TopKTracker:
+    """
+    Theo dõi k phần tử phổ biến nhất dựa trên ước lượng của count-min sketch
+    
+    Giữ một tập ứng viên giới hạn trong min-heap (xóa lười). Phần tử mới chỉ
+    vào tập ứng viên khi ước lượng của nó vượt ứng viên nhỏ nhất.
+    """
+    
+    def __init__(self, sketch: CountMinSketch, k: int = 20, capacity: Optional[int] = None):
+        """
+        Args:
+            sketch: Sketch dùng để ước lượng tần suất
+            k: Số phần tử trả về
+            capacity: Số ứng viên giữ lại (mặc định 4k)
+        """
+        self.sketch = sketch
+        self.k = k
+        self.capacity = capacity or 4 * k
+        self._estimates: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+    
+    def offer(self, item: str, estimate: int):
+        """Cập nhật ước lượng của item (O(log capacity))"""
+        if item in self._estimates:
+            self._estimates[item] = estimate
+            heapq.heappush(self._heap, (estimate, item))
+            self._compact()
+            return
+        
+        if len(self._estimates) >= self.capacity:
+            smallest = self._peek_min()
+            if smallest is None or estimate <= smallest[0]:
+                return
+            heapq.heappop(self._heap)
+            del self._estimates[smallest[1]]
+        
+        self._estimates[item] = estimate
+        heapq.heappush(self._heap, (estimate, item))
+    
+    def _peek_min(self) -> Optional[Tuple[int, str]]:
+        """Ứng viên nhỏ nhất, bỏ qua các entry cũ trong heap"""
+        while self._heap:
+            estimate, item = self._heap[0]
+            if self._estimates.get(item) == estimate:
+                return estimate, item
+            heapq.heappop(self._heap)
+        return None
+    
+    def _compact(self):
+        """Dựng lại heap khi có quá nhiều entry cũ"""
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(estimate, item) for item, estimate in self._estimates.items()]
+            heapq.heapify(self._heap)
+    
+    def refresh(self):
+        """Ước lượng lại mọi ứng viên từ sketch (sau khi sketch bị trừ bớt)"""
+        self._estimates = {item: self.sketch.estimate(item) for item in self._estimates}
+        self._estimates = {item: estimate for item, estimate in self._estimates.items() if estimate > 0}
+        self._heap = [(estimate, item) for item, estimate in self._estimates.items()]
+        heapq.heapify(self._heap)
+    
+    def candidates(self) -> List[str]:
+        """Các ứng viên đang được theo dõi"""
+        return list(self._estimates)
+    
+    def top(self, k: Optional[int] = None) -> List[Tuple[str, int]]:
+        """k ứng viên có ước lượng lớn nhất, giảm dần"""
+        k = k or self.k
+        return sorted(self._estimates.items(), key=lambda pair: (-pair[1], pair[0]))[:k]
+
+class CountMinHeavyHitters:
+    """
+    Heavy hitters bằng count-min sketch kèm heap ứng viên, gộp được
+    
+    Bộ nhớ cố định theo (epsilon, delta, k). Hai bản cùng tham số gộp được
+    bằng cách cộng bảng sketch và ước lượng lại hợp các ứng viên.
+    """
+    
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.001, k: int = 20):
+        """
+        Args:
+            epsilon: Sai số tối đa của số đếm, theo tỉ lệ tổng số tags
+            delta: Xác suất vượt cận sai số
+            k: Số phần tử phổ biến cần trả về
+        """
+        self.epsilon = epsilon
+        self.delta = delta
+        self.k = k
+        self.sketch = CountMinSketch.from_error(epsilon, delta)
+        self.tracker = TopKTracker(self.sketch, k=k)
+    
+    @property
+    def total(self) -> int:
+        return self.sketch.total
+    
+    def add(self, item: str, count: int = 1):
+        """Đếm một phần tử"""
+        self.tracker.offer(item, self.sketch.add(item, count))
+    
+    def update(self, items: Iterable[str]):
+        """Đếm nhiều phần tử"""
+        for item in items:
+            self.add(item)
+    
+    def estimate(self, item: str) -> int:
+        """Ước lượng (không thấp hơn số đếm thật)"""
+        return self.sketch.estimate(item)
+    
+    def top(self, k: Optional[int] = None) -> List[Tuple[str, int]]:
+        """k phần tử phổ biến nhất với số đếm ước lượng"""
+        return self.tracker.top(k)
+    
+    def merge(self, other: 'CountMinHeavyHitters') -> 'CountMinHeavyHitters':
+        """Bản mới tóm tắt cả hai luồng"""
+        merged = CountMinHeavyHitters(self.epsilon, self.delta, self.k)
+        merged.sketch = self.sketch.merge(other.sketch)
+        merged.tracker = TopKTracker(merged.sketch, k=self.k)
+        for item in set(self.tracker.candidates()) | set(other.tracker.candidates()):
+            merged.tracker.offer(item, merged.sketch.estimate(item))
+        return merged
+
+class SpaceSaving:
+    """
+    Heavy hitters theo thuật toán Space-Saving, gộp được
+    
+    Giữ tối đa `capacity` bộ đếm. Số đếm của mỗi phần tử là cận trên, lệch
+    không quá total / capacity (= epsilon * total khi capacity = 1/epsilon);
+    mọi phần tử xuất hiện nhiều hơn mức đó chắc chắn nằm trong tóm tắt.
+    """
+    
+    def __init__(self, capacity: Optional[int] = None, epsilon: Optional[float] = None):
+        """
+        Args:
+            capacity: Số bộ đếm tối đa
+            epsilon: Cận sai số theo tỉ lệ tổng (dùng khi không có capacity)
+        """
+        if capacity is None:
+            capacity = math.ceil(1 / (epsilon or 0.001))
+        self.capacity = int(capacity)
+        self.total = 0
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+    
+    def _peek_min(self) -> Tuple[int, str]:
+        """Bộ đếm nhỏ nhất (bỏ qua entry cũ trong heap)"""
+        while True:
+            count, item = self._heap[0]
+            if self._counts.get(item) == count:
+                return count, item
+            heapq.heappop(self._heap)
+    
+    def add(self, item: str, count: int = 1):
+        """Đếm một phần tử (O(log capacity))"""
+        self.total += count
+        
+        if item in self._counts:
+            self._counts[item] += count
+        elif len(self._counts) < self.capacity:
+            self._counts[item] = count
+            self._errors[item] = 0
+        else:
+            # Replace the smallest counter, inheriting its count as error
+            smallest, evicted = self._peek_min()
+            heapq.heappop(self._heap)
+            del self._counts[evicted], self._errors[evicted]
+            self._counts[item] = smallest + count
+            self._errors[item] = smallest
+        
+        heapq.heappush(self._heap, (self._counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, i) for i, c in self._counts.items()]
+            heapq.heapify(self._heap)
+    
+    def update(self, items: Iterable[str]):
+        """Đếm nhiều phần tử"""
+        for item in items:
+            self.add(item)
+    
+    def _floor(self) -> int:
+        """Số đếm tối đa của một phần tử không có trong tóm tắt"""
+        return min(self._counts.values()) if len(self._counts) >= self.capacity else 0
+    
+    def estimate(self, item: str) -> int:
+        """Cận trên số lần xuất hiện của item"""
+        return self._counts.get(item, self._floor())
+    
+    def guaranteed(self, item: str) -> int:
+        """Cận dưới số lần xuất hiện của item"""
+        return self._counts.get(item, 0) - self._errors.get(item, 0)
+    
+    def top(self, k: int = 20) -> List[Tuple[str, int]]:
+        """k phần tử phổ biến nhất với số đếm (cận trên)"""
+        return sorted(self._counts.items(), key=lambda pair: (-pair[1], pair[0]))[:k]
+    
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """
+        Bản mới tóm tắt cả hai luồng (vd. hai shard hoặc hai ngày)
+        
+        Phần tử thiếu ở một bên được tính với số đếm tối đa có thể có ở bên
+        đó, rồi giữ lại `capacity` bộ đếm lớn nhất, nên cận sai số vẫn là
+        (total1 + total2) / capacity.
+        """
+        merged = SpaceSaving(capacity=max(self.capacity, other.capacity))
+        merged.total = self.total + other.total
+        floor_self, floor_other = self._floor(), other._floor()
+        
+        combined = []
+        for item in set(self._counts) | set(other._counts):
+            count = self._counts.get(item, floor_self) + other._counts.get(item, floor_other)
+            error = self._errors.get(item, floor_self) + other._errors.get(item, floor_other)
+            combined.append((count, error, item))
+        
+        for count, error, item in heapq.nlargest(merged.capacity, combined,
+                                                 key=lambda entry: (entry[0], entry[2])):
+            merged._counts[item] = count
+            merged._errors[item] = error
+        merged._heap = [(c, i) for i, c in merged._counts.items()]
+        heapq.heapify(merged._heap)
+        return merged
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dạng JSON để lưu tóm tắt theo ngày/shard"""
+        return {
+            'capacity': self.capacity,
+            'total': self.total,
+            'counters': [[item, count, self._errors[item]] for item, count in self._counts.items()]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SpaceSaving':
+        """Khôi phục tóm tắt từ to_dict()"""
+        summary = cls(capacity=data['capacity'])
+        summary.total = data['total']
+        for item, count, error in data['counters']:
+            summary._counts[item] = count
+            summary._errors[item] = error
+        summary._heap = [(c, i) for i, c in summary._counts.items()]
+        heapq.heapify(summary._heap)
+        return summary
+
+def create_tag_summary(tag_config: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+    """
+    Tạo bộ đếm tags xấp xỉ, bộ nhớ cố định, theo TREND_CONFIG["tag_counting"]
+    
+    Args:
+        tag_config: {"backend": "exact" | "space_saving" | "count_min",
+            "epsilon": ..., "delta": ...}
+    
+    Returns:
+        Optional: SpaceSaving ("space_saving"), CountMinHeavyHitters
+            ("count_min"), hoặc None khi dùng đếm chính xác ("exact")
+    """
+    tag_config = tag_config or {}
+    backend = tag_config.get("backend", "exact")
+    epsilon = tag_config.get("epsilon", 0.001)
+    
+    if backend == "exact":
+        return None
+    if backend == "space_saving":
+        return SpaceSaving(epsilon=epsilon)
+    if backend == "count_min":
+        return CountMinHeavyHitters(epsilon=epsilon, delta=tag_config.get("delta", 0.001), k=20)
+    raise ValueError(f"Unknown tag counting backend: {backend}")
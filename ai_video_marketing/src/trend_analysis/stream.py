@@ -0,0 +1,235 @@
+"""
+Trend Stream - Thống kê trend theo cửa sổ trượt, cập nhật tăng dần từng video
+"""
+import time
+import logging
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Iterable, Optional
+
+from .sketches import CountMinSketch, TopKTracker
+from .aggregates import SHORT_VIDEO_SECONDS, LONG_VIDEO_SECONDS, HIGH_ENGAGEMENT_RATE
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class _WindowAggregate:
+    """Các tổng cộng được của một nhóm video (một bucket hoặc cả cửa sổ)"""
+    
+    def __init__(self, sketch_width: int, sketch_depth: int):
+        self.count = 0
+        self.views = 0
+        self.likes = 0
+        self.comments = 0
+        self.duration = 0
+        self.platforms: Counter = Counter()
+        self.duration_buckets: Counter = Counter()
+        # Engagement rate is undefined for videos without views
+        self.rated = 0
+        self.rate_sum = 0.0
+        self.high_engagement = 0
+        self.platform_rated: Counter = Counter()
+        self.platform_rate_sum: Counter = Counter()
+        self.tags = CountMinSketch(sketch_width, sketch_depth)
+    
+    def add(self, video: Any):
+        """Cộng một video vào tổng (tags được đếm riêng)"""
+        self.count += 1
+        self.views += video.views
+        self.likes += video.likes
+        self.comments += video.comments
+        self.duration += video.duration
+        self.platforms[video.platform] += 1
+        
+        if video.duration <= SHORT_VIDEO_SECONDS:
+            self.duration_buckets['short_videos'] += 1
+        elif video.duration <= LONG_VIDEO_SECONDS:
+            self.duration_buckets['medium_videos'] += 1
+        else:
+            self.duration_buckets['long_videos'] += 1
+        
+        if video.views:
+            rate = (video.likes + video.comments) / video.views
+            self.rated += 1
+            self.rate_sum += rate
+            self.high_engagement += rate > HIGH_ENGAGEMENT_RATE
+            self.platform_rated[video.platform] += 1
+            self.platform_rate_sum[video.platform] += rate
+    
+    def subtract(self, other: '_WindowAggregate'):
+        """Trừ tổng của một bucket đã rời khỏi cửa sổ (trừ tổng rate float, xem resum_rates)"""
+        self.count -= other.count
+        self.views -= other.views
+        self.likes -= other.likes
+        self.comments -= other.comments
+        self.duration -= other.duration
+        self.platforms.subtract(other.platforms)
+        self.duration_buckets.subtract(other.duration_buckets)
+        self.rated -= other.rated
+        self.high_engagement -= other.high_engagement
+        self.platform_rated.subtract(other.platform_rated)
+        self.tags.subtract(other.tags)
+    
+    def resum_rates(self, buckets: Iterable['_WindowAggregate']):
+        """
+        Tính lại tổng engagement rate từ các bucket còn trong cửa sổ
+        
+        Trừ dần tổng float để lại sai số tích lũy trên stream chạy lâu (trung
+        bình khác 0 hoặc âm cho cửa sổ/platform rỗng). Số bucket ít, nên cộng
+        lại từ đầu mỗi khi có bucket hết hạn.
+        """
+        self.rate_sum = 0.0
+        self.platform_rate_sum = Counter()
+        for bucket in buckets:
+            self.rate_sum += bucket.rate_sum
+            self.platform_rate_sum.update(bucket.platform_rate_sum)
+
+class TrendStream:
+    """
+    Thống kê trend trên cửa sổ thời gian trượt, nhận từng video một
+    
+    Cửa sổ được chia thành các bucket thời gian bằng nhau. Mỗi video được
+    cộng vào bucket của nó và vào tổng của cả cửa sổ (O(1), tags qua
+    count-min sketch), nên snapshot() chỉ đọc các tổng có sẵn. Khi một bucket
+    hết hạn, tổng của nó được trừ khỏi cửa sổ một lần.
+    """
+    
+    def __init__(self,
+                 window_seconds: float = 3600,
+                 buckets: int = 12,
+                 top_tags: int = 20,
+                 sketch_width: int = 2048,
+                 sketch_depth: int = 4):
+        """
+        Args:
+            window_seconds: Độ dài cửa sổ (giây)
+            buckets: Số bucket chia cửa sổ (độ mịn khi hết hạn)
+            top_tags: Số tags phổ biến trả về
+            sketch_width: Width của count-min sketch cho tags
+            sketch_depth: Depth của count-min sketch cho tags
+        """
+        self.window_seconds = window_seconds
+        self.num_buckets = buckets
+        self.bucket_seconds = window_seconds / buckets
+        self.sketch_width = sketch_width
+        self.sketch_depth = sketch_depth
+        
+        self.top_tags = top_tags
+        
+        self._buckets: Deque = deque()  # (bucket index, aggregate), oldest first
+        self._latest = 0.0  # newest timestamp seen
+        self._reset_totals()
+    
+    def _reset_totals(self):
+        """Tổng rỗng cho cả cửa sổ"""
+        self._totals = _WindowAggregate(self.sketch_width, self.sketch_depth)
+        self._top_tags = TopKTracker(self._totals.tags, k=self.top_tags)
+    
+    def _bucket_for(self, index: int) -> _WindowAggregate:
+        """Bucket ứng với chỉ số thời gian (tạo mới nếu là bucket mới nhất)"""
+        if not self._buckets or index > self._buckets[-1][0]:
+            aggregate = _WindowAggregate(self.sketch_width, self.sketch_depth)
+            self._buckets.append((index, aggregate))
+            return aggregate
+        
+        # Late record: find its bucket among the few kept in the window
+        for bucket_index, aggregate in reversed(self._buckets):
+            if bucket_index == index:
+                return aggregate
+            if bucket_index < index:
+                break
+        
+        aggregate = _WindowAggregate(self.sketch_width, self.sketch_depth)
+        buckets = sorted(list(self._buckets) + [(index, aggregate)], key=lambda pair: pair[0])
+        self._buckets = deque(buckets)
+        return aggregate
+    
+    def _oldest_index(self, now: float) -> int:
+        """Chỉ số bucket cũ nhất còn nằm trong cửa sổ tại thời điểm now"""
+        return int(now // self.bucket_seconds) - self.num_buckets + 1
+    
+    def _expire(self, now: float):
+        """Trừ các bucket đã nằm ngoài cửa sổ khỏi tổng"""
+        oldest = self._oldest_index(now)
+        expired = False
+        
+        while self._buckets and self._buckets[0][0] < oldest:
+            _, aggregate = self._buckets.popleft()
+            self._totals.subtract(aggregate)
+            expired = True
+        
+        if not self._buckets:
+            # Start from exact zeros instead of accumulated float residue
+            self._reset_totals()
+        elif expired:
+            self._totals.resum_rates(aggregate for _, aggregate in self._buckets)
+            self._top_tags.refresh()
+    
+    def push(self, video: Any, timestamp: Optional[float] = None):
+        """
+        Thêm một video vào cửa sổ
+        
+        Args:
+            video: VideoData (hoặc object có cùng thuộc tính)
+            timestamp: Thời điểm nhận video (epoch giây, mặc định: bây giờ)
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        self._latest = max(self._latest, timestamp)
+        self._expire(self._latest)
+        
+        index = int(timestamp // self.bucket_seconds)
+        if index < self._oldest_index(self._latest):
+            return  # Older than the whole window
+        
+        bucket = self._bucket_for(index)
+        bucket.add(video)
+        self._totals.add(video)
+        
+        for tag in video.tags or []:
+            bucket.tags.add(tag)
+            self._top_tags.offer(tag, self._totals.tags.add(tag))
+    
+    def extend(self, videos: Iterable[Any], timestamp: Optional[float] = None):
+        """Thêm nhiều video cùng thời điểm"""
+        for video in videos:
+            self.push(video, timestamp)
+    
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Trạng thái hiện tại của cửa sổ (không tính lại từ đầu)
+        
+        Args:
+            now: Thời điểm truy vấn (epoch giây, mặc định: bây giờ), các
+                bucket cũ hơn cửa sổ được loại trước khi đọc
+        
+        Returns:
+            Dict[str, Any]: Cùng các khóa với analyze_trending_patterns (trừ
+                các mục cần toàn bộ dữ liệu như top_performing_videos)
+        """
+        self._expire(time.time() if now is None else now)
+        totals = self._totals
+        if totals.count <= 0:
+            return {}
+        
+        count = totals.count
+        return {
+            'total_videos': count,
+            'platform_distribution': {platform: n for platform, n in totals.platforms.items() if n > 0},
+            'avg_views': totals.views / count,
+            'avg_likes': totals.likes / count,
+            'avg_comments': totals.comments / count,
+            'avg_duration': totals.duration / count,
+            'common_tags': dict(self._top_tags.top()),
+            'duration_analysis': {
+                name: max(totals.duration_buckets[name], 0)
+                for name in ('short_videos', 'medium_videos', 'long_videos')
+            },
+            'engagement_analysis': {
+                'avg_engagement_rate': totals.rate_sum / totals.rated if totals.rated > 0 else 0.0,
+                'high_engagement_videos': totals.high_engagement,
+                'platform_engagement': {
+                    platform: totals.platform_rate_sum[platform] / n
+                    for platform, n in totals.platform_rated.items() if n > 0
+                }
+            }
+        }
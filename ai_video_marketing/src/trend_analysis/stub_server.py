@@ -0,0 +1,316 @@
+"""
+Stub Server - Giả lập YouTube Data API cục bộ để benchmark việc lấy dữ liệu trend
+"""
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+import requests
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+YOUTUBE_PREFIX = "/youtube/v3"
+YOUTUBE_API_URL = "https://www.googleapis.com/youtube/v3"
+
+def _seed(value: str) -> int:
+    """Seed ổn định giữa các lần chạy (khác hash() của Python)"""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Xử lý request cho StubPlatformServer"""
+    
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    
+    def log_message(self, format: str, *args):
+        pass
+    
+    def do_GET(self):
+        self.server.stub.handle(self)
+    
+    def send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+class StubPlatformServer:
+    """
+    Server HTTP cục bộ thay cho YouTube Data API v3 (search + videos)
+    
+    Trả dữ liệu từ fixture đã ghi (record_youtube_fixtures) hoặc dữ liệu sinh
+    ổn định theo keyword/id, với độ trễ, tỉ lệ lỗi 503 và giới hạn tốc độ
+    (429 kèm Retry-After) cấu hình được. Dùng với
+    TREND_CONFIG["api_base_urls"] = server.base_urls.
+    
+    TikTok không có endpoint: TrendAnalyzer chưa gọi API TikTok (chỉ dùng
+    mock data).
+    """
+    
+    def __init__(self,
+                 fixtures: Optional[Any] = None,
+                 latency: float = 0.05,
+                 latency_tail: float = 0.0,
+                 error_rate: float = 0.0,
+                 rate_limit: Optional[float] = None,
+                 burst: Optional[float] = None,
+                 results_per_keyword: int = 200,
+                 seed: int = 0,
+                 host: str = "127.0.0.1",
+                 port: int = 0):
+        """
+        Args:
+            fixtures: Đường dẫn file fixture hoặc dict đã đọc (tùy chọn)
+            latency: Độ trễ cố định mỗi response (giây)
+            latency_tail: Trung bình phần trễ thêm phân phối mũ (tạo đuôi dài)
+            error_rate: Xác suất trả 503
+            rate_limit: Số request/giây tối đa (None = không giới hạn)
+            burst: Số request burst (mặc định bằng rate_limit)
+            results_per_keyword: Số video sinh cho mỗi keyword không có fixture
+            seed: Seed cho độ trễ/lỗi ngẫu nhiên
+            host: Địa chỉ lắng nghe
+            port: Cổng (0 = tự chọn)
+        """
+        if isinstance(fixtures, (str, Path)):
+            fixtures = load_fixtures(fixtures)
+        youtube = (fixtures or {}).get('youtube', {})
+        self._fixture_search: Dict[str, List[Dict]] = youtube.get('search', {})
+        self._fixture_videos: Dict[str, Dict] = youtube.get('videos', {})
+        
+        self.latency = latency
+        self.latency_tail = latency_tail
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = float(burst if burst is not None else max(rate_limit or 1, 1))
+        self.results_per_keyword = results_per_keyword
+        
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self.stats: Dict[str, int] = {'requests': 0, 'ok': 0, 'rate_limited': 0, 'errors': 0}
+        
+        self._httpd = ThreadingHTTPServer((host, port), _StubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_urls(self) -> Dict[str, str]:
+        """Giá trị cho TREND_CONFIG["api_base_urls"]"""
+        host, port = self._httpd.server_address[:2]
+        return {'youtube': f"http://{host}:{port}{YOUTUBE_PREFIX}"}
+    
+    def start(self) -> 'StubPlatformServer':
+        """Chạy server trên thread nền"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        name='trend-stub-server', daemon=True)
+        self._thread.start()
+        logger.info(f"Stub platform server listening on {self.base_urls['youtube']}")
+        return self
+    
+    def stop(self):
+        """Dừng server"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+    
+    def __enter__(self) -> 'StubPlatformServer':
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def reset_stats(self):
+        """Đặt lại bộ đếm request"""
+        with self._lock:
+            self.stats = {name: 0 for name in self.stats}
+    
+    def _admit(self) -> Optional[float]:
+        """Lấy một token rate limit; trả về số giây cần chờ nếu hết token"""
+        if not self.rate_limit:
+            return None
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate_limit)
+        self._updated_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return None
+        return (1 - self._tokens) / self.rate_limit
+    
+    def handle(self, request: _StubHandler):
+        """Trả lời một request: rate limit, lỗi giả lập, độ trễ rồi dữ liệu"""
+        with self._lock:
+            self.stats['requests'] += 1
+            retry_after = self._admit()
+            failed = retry_after is None and self._random.random() < self.error_rate
+            delay = self.latency
+            if self.latency_tail:
+                delay += self._random.expovariate(1 / self.latency_tail)
+            
+            if retry_after is not None:
+                self.stats['rate_limited'] += 1
+            elif failed:
+                self.stats['errors'] += 1
+        
+        if retry_after is not None:
+            request.send_json(429, {'error': {'code': 429, 'message': 'Rate limit exceeded'}},
+                              {'Retry-After': f"{retry_after:.3f}"})
+            return
+        
+        time.sleep(delay)
+        if failed:
+            request.send_json(503, {'error': {'code': 503, 'message': 'Backend error'}})
+            return
+        
+        url = urlparse(request.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        if url.path == f"{YOUTUBE_PREFIX}/search":
+            body = self._search(params)
+        elif url.path == f"{YOUTUBE_PREFIX}/videos":
+            body = self._videos(params)
+        else:
+            request.send_json(404, {'error': {'code': 404, 'message': 'Not found'}})
+            return
+        
+        with self._lock:
+            self.stats['ok'] += 1
+        request.send_json(200, body)
+    
+    def _search(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """search.list: một trang kết quả, pageToken là offset"""
+        keyword = params.get('q', '')
+        page_size = min(int(params.get('maxResults', 5)), 50)
+        offset = int(params.get('pageToken') or 0)
+        
+        if keyword in self._fixture_search:
+            items = self._fixture_search[keyword][offset:offset + page_size]
+            total = len(self._fixture_search[keyword])
+        else:
+            total = self.results_per_keyword
+            items = [self._search_item(keyword, i) for i in range(offset, min(offset + page_size, total))]
+        
+        body = {'kind': 'youtube#searchListResponse', 'items': items,
+                'pageInfo': {'totalResults': total, 'resultsPerPage': page_size}}
+        if offset + page_size < total:
+            body['nextPageToken'] = str(offset + page_size)
+        return body
+    
+    def _videos(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """videos.list: chi tiết theo danh sách id"""
+        ids = [video_id for video_id in params.get('id', '').split(',') if video_id]
+        items = [self._fixture_videos.get(video_id) or self._video_item(video_id) for video_id in ids[:50]]
+        return {'kind': 'youtube#videoListResponse', 'items': items}
+    
+    @staticmethod
+    def _search_item(keyword: str, index: int) -> Dict[str, Any]:
+        """Kết quả search sinh ổn định theo keyword và vị trí"""
+        video_id = f"stub{_seed(f'{keyword}:{index}') % 10 ** 11:011d}"
+        rng = random.Random(_seed(video_id))
+        published = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=rng.randint(0, 600000))
+        return {
+            'kind': 'youtube#searchResult',
+            'id': {'kind': 'youtube#video', 'videoId': video_id},
+            'snippet': {
+                'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'title': f"{keyword} video {index + 1}",
+                'description': f"Stub result {index + 1} for {keyword}",
+                'thumbnails': {'high': {'url': f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}},
+                'tags': [keyword, f"tag{rng.randint(0, 50)}", f"tag{rng.randint(0, 500)}"]
+            }
+        }
+    
+    @staticmethod
+    def _video_item(video_id: str) -> Dict[str, Any]:
+        """Chi tiết video sinh ổn định theo id"""
+        rng = random.Random(_seed(video_id))
+        views = rng.randint(1000, 5000000)
+        return {
+            'kind': 'youtube#video',
+            'id': video_id,
+            'statistics': {
+                'viewCount': str(views),
+                'likeCount': str(int(views * rng.uniform(0.01, 0.1))),
+                'commentCount': str(int(views * rng.uniform(0.001, 0.01)))
+            },
+            'contentDetails': {'duration': f"PT{rng.randint(0, 20)}M{rng.randint(1, 59)}S"}
+        }
+
+def load_fixtures(path: Path) -> Dict[str, Any]:
+    """Đọc file fixture JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def record_youtube_fixtures(keywords: List[str],
+                            api_key: str,
+                            path: Path,
+                            max_results: int = 50,
+                            base_url: str = YOUTUBE_API_URL) -> Path:
+    """
+    Ghi response thật của YouTube Data API thành fixture cho StubPlatformServer
+    
+    Args:
+        keywords: Các từ khóa cần ghi
+        api_key: YouTube API key (không được lưu vào fixture)
+        path: File fixture JSON
+        max_results: Số video tối đa mỗi từ khóa
+        base_url: URL gốc của API
+    
+    Returns:
+        Path: File fixture đã ghi
+    """
+    session = requests.Session()
+    search: Dict[str, List[Dict]] = {}
+    videos: Dict[str, Dict] = {}
+    
+    for keyword in keywords:
+        items: Dict[str, Dict] = {}
+        page_token = None
+        while len(items) < max_results:
+            params = {'part': 'snippet', 'q': keyword, 'type': 'video', 'order': 'relevance',
+                      'maxResults': min(50, max_results - len(items)), 'key': api_key}
+            if page_token:
+                params['pageToken'] = page_token
+            response = session.get(f"{base_url}/search", params=params, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            for item in data.get('items', []):
+                items.setdefault(item['id']['videoId'], item)
+            page_token = data.get('nextPageToken')
+            if not page_token or not data.get('items'):
+                break
+        search[keyword] = list(items.values())
+        
+        ids = list(items)
+        for i in range(0, len(ids), 50):
+            response = session.get(f"{base_url}/videos", timeout=10, params={
+                'part': 'statistics,contentDetails', 'id': ','.join(ids[i:i + 50]), 'key': api_key
+            })
+            response.raise_for_status()
+            for item in response.json().get('items', []):
+                videos[item['id']] = item
+        
+        logger.info(f"Recorded {len(items)} videos for keyword: {keyword}")
+    
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fixtures = {
+        'recorded_at': datetime.now(timezone.utc).isoformat(),
+        'youtube': {'search': search, 'videos': videos}
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(fixtures, f, ensure_ascii=False, indent=2)
+    return path
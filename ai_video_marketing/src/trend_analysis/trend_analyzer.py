@@ -1,21 +1,44 @@
 """
 Trend Analyzer - Tìm kiếm và phân tích xu hướng video
 """
-import requests
+import os
 import json
-import time
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Union
 import logging
 from pathlib import Path
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 import re
+from functools import reduce
+from concurrent.futures import ProcessPoolExecutor
+
+from .http_client import AsyncHTTPClient
+from .response_cache import ResponseCache
+from .video_table import VideoTable
+from .warehouse import TrendWarehouse
+from .stream import TrendStream
+from .sketches import SpaceSaving, CountMinHeavyHitters, create_tag_summary
+from .aggregates import TrendAggregate, aggregate_shard, duration_bin_edges
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# YouTube Data API limits per request
+YOUTUBE_PAGE_SIZE = 50
+YOUTUBE_MAX_IDS_PER_REQUEST = 50
+
+# Overridable with TREND_CONFIG["api_base_urls"], e.g. to point at a local stub server
+DEFAULT_API_BASE_URLS = {
+    "youtube": "https://www.googleapis.com/youtube/v3"
+}
+
+# ISO 8601 timestamps ending in a UTC offset (Z, +hh:mm or +hhmm)
+UTC_OFFSET_PATTERN = r'(?:Z|[+-]\d{2}:?\d{2})$'
+
 @dataclass
 class VideoData:
     """Data class for video information"""
@@ -30,17 +53,53 @@ class VideoData:
     thumbnail: str
     tags: List[str]
     platform: str
+    keyword: str = ""
 
 class TrendAnalyzer:
     """Phân tích xu hướng video từ các platform"""
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        
+        self.api_base_urls = {**DEFAULT_API_BASE_URLS, **config.get("api_base_urls", {})}
+        self.client = AsyncHTTPClient(
+            max_concurrency=config.get("max_concurrent_requests", 8),
+            rate_limits=config.get("rate_limits"),
+            timeout=config.get("request_timeout", 10),
+            max_retries=config.get("max_retries", 3),
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            },
+            cache=self._create_response_cache()
+        )
+        self.session = self.client.session
+        
+        warehouse_config = config.get("warehouse") or {}
+        self.warehouse = TrendWarehouse(warehouse_config["path"]) if warehouse_config.get("enabled") else None
+        # Live API results waiting to be written to the warehouse
+        self._pending_snapshots: List[VideoData] = []
+        
+    def _create_response_cache(self) -> Optional[ResponseCache]:
+        """Tạo cache response API theo TREND_CONFIG["response_cache"] (None nếu tắt)"""
+        cache_config = self.config.get("response_cache") or {}
+        if not cache_config.get("enabled", False):
+            return None
+        
+        return ResponseCache(
+            path=cache_config["path"],
+            backend=cache_config.get("backend", "sqlite"),
+            ttl=cache_config.get("ttl", 3600),
+            endpoint_ttl=cache_config.get("endpoint_ttl")
+        )
+    
+    def _published_after(self) -> str:
+        """Mốc publishedAfter theo analysis_timeframe, làm tròn về đầu ngày (UTC)"""
+        match = re.fullmatch(r'(\d+)d', str(self.config.get("analysis_timeframe", "7d")))
+        days = int(match.group(1)) if match else 7
+        
+        # Day granularity keeps the request (and its cache key) stable across runs
+        start = datetime.now(timezone.utc).date() - timedelta(days=days)
+        return f"{start.isoformat()}T00:00:00Z"
+    
     def search_trending_keywords(self, 
                                keywords: List[str],
                                max_results: int = 50) -> List[VideoData]:
@@ -54,28 +113,66 @@ class TrendAnalyzer:
         Returns:
             List[VideoData]: Danh sách video trending
         """
-        all_videos = []
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.search_trending_keywords_async(keywords, max_results))
+        raise RuntimeError("Event loop is running, await search_trending_keywords_async() instead")
+    
+    async def search_trending_keywords_async(self,
+                                             keywords: List[str],
+                                             max_results: int = 50) -> List[VideoData]:
+        """
+        Tìm kiếm đồng thời mọi từ khóa trên mọi platform
+        
+        Tốc độ gọi API được giới hạn bằng token bucket theo platform
+        (TREND_CONFIG["rate_limits"]) thay vì sleep cố định sau mỗi từ khóa.
         
+        Args:
+            keywords: Danh sách từ khóa
+            max_results: Số lượng video tối đa
+            
+        Returns:
+            List[VideoData]: Danh sách video trending
+        """
+        if not keywords:
+            return []
+        
+        per_keyword = max(1, max_results // len(keywords))
+        platforms = self.config.get("platforms", ["youtube", "tiktok"])
+        tasks = []
         for keyword in keywords:
             logger.info(f"Searching for keyword: {keyword}")
-            
-            # Search on different platforms
-            youtube_videos = self._search_youtube(keyword, max_results // len(keywords))
-            tiktok_videos = self._search_tiktok(keyword, max_results // len(keywords))
-            
-            all_videos.extend(youtube_videos)
-            all_videos.extend(tiktok_videos)
-            
-            # Rate limiting
-            time.sleep(1)
+            if "youtube" in platforms:
+                tasks.append(self._search_youtube(keyword, per_keyword))
+            if "tiktok" in platforms:
+                tasks.append(self._search_tiktok(keyword, per_keyword))
+        
+        all_videos = []
+        for videos in await asyncio.gather(*tasks):
+            all_videos.extend(videos)
         
-        # Sort by engagement score
-        all_videos.sort(key=lambda x: self._calculate_engagement_score(x), reverse=True)
+        self._flush_snapshots()
         
-        return all_videos[:max_results]
+        # Rank by engagement score, only the top max_results are sorted
+        top = self.rank_by_engagement(all_videos, top_k=max_results)
+        
+        return [all_videos[i] for i in top]
+    
+    def _flush_snapshots(self):
+        """Ghi các kết quả API vừa lấy vào warehouse (lỗi ghi không làm hỏng lượt tìm kiếm)"""
+        if self.warehouse is None or not self._pending_snapshots:
+            self._pending_snapshots = []
+            return
+        
+        snapshots, self._pending_snapshots = self._pending_snapshots, []
+        try:
+            self.warehouse.ingest(snapshots)
+        except (ImportError, OSError, ValueError) as e:
+            logger.error(f"Error writing trend warehouse: {e}")
     
-    def _search_youtube(self, keyword: str, max_results: int) -> List[VideoData]:
-        """Tìm kiếm video trên YouTube"""
+    async def _search_youtube(self, keyword: str, max_results: int) -> List[VideoData]:
+        """Tìm kiếm video trên YouTube (theo trang, tối đa max_results video)"""
         videos = []
         
         try:
@@ -86,41 +183,56 @@ class TrendAnalyzer:
                 return self._get_mock_youtube_data(keyword, max_results)
             
             # Search parameters
-            search_url = "https://www.googleapis.com/youtube/v3/search"
+            search_url = f"{self.api_base_urls['youtube']}/search"
             params = {
                 'part': 'snippet',
                 'q': keyword,
                 'type': 'video',
                 'order': 'relevance',
-                'maxResults': max_results,
-                'publishedAfter': (datetime.now() - timedelta(days=7)).isoformat() + 'Z',
+                'publishedAfter': self._published_after(),
                 'key': api_key
             }
             
-            response = self.session.get(search_url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
+            # Follow nextPageToken until enough unique videos are collected
+            items = {}
+            page_token = None
+            while len(items) < max_results:
+                page_params = dict(params, maxResults=min(YOUTUBE_PAGE_SIZE, max_results - len(items)))
+                if page_token:
+                    page_params['pageToken'] = page_token
+                
+                data = await self.client.get_json('youtube', search_url, page_params)
+                for item in data.get('items', []):
+                    items.setdefault(item['id']['videoId'], item)
+                
+                page_token = data.get('nextPageToken')
+                if not page_token or not data.get('items'):
+                    break
             
             # Get video details
-            video_ids = [item['id']['videoId'] for item in data['items']]
-            video_details = self._get_youtube_video_details(video_ids, api_key)
+            video_details = await self._get_youtube_video_details(list(items), api_key)
             
-            for item, details in zip(data['items'], video_details):
+            for video_id, item in list(items.items())[:max_results]:
+                details = video_details.get(video_id, {})
+                statistics = details.get('statistics', {})
                 video = VideoData(
                     title=item['snippet']['title'],
                     description=item['snippet']['description'],
-                    views=details.get('viewCount', 0),
-                    likes=details.get('likeCount', 0),
-                    comments=details.get('commentCount', 0),
-                    duration=self._parse_duration(details.get('duration', 'PT0S')),
+                    views=int(statistics.get('viewCount', 0)),
+                    likes=int(statistics.get('likeCount', 0)),
+                    comments=int(statistics.get('commentCount', 0)),
+                    duration=self._parse_duration(details.get('contentDetails', {}).get('duration', 'PT0S')),
                     upload_date=item['snippet']['publishedAt'],
-                    url=f"https://www.youtube.com/watch?v={item['id']['videoId']}",
+                    url=f"https://www.youtube.com/watch?v={video_id}",
                     thumbnail=item['snippet']['thumbnails']['high']['url'],
                     tags=item['snippet'].get('tags', []),
-                    platform='youtube'
+                    platform='youtube',
+                    keyword=keyword
                 )
                 videos.append(video)
+            
+            # Only live results are kept in the warehouse, never mock data
+            self._pending_snapshots.extend(videos)
                 
         except Exception as e:
             logger.error(f"Error searching YouTube: {e}")
@@ -129,7 +241,7 @@ class TrendAnalyzer:
         
         return videos
     
-    def _search_tiktok(self, keyword: str, max_results: int) -> List[VideoData]:
+    async def _search_tiktok(self, keyword: str, max_results: int) -> List[VideoData]:
         """Tìm kiếm video trên TikTok"""
         videos = []
         
@@ -144,24 +256,32 @@ class TrendAnalyzer:
         
         return videos
     
-    def _get_youtube_video_details(self, video_ids: List[str], api_key: str) -> List[Dict]:
-        """Lấy chi tiết video YouTube"""
-        try:
-            details_url = "https://www.googleapis.com/youtube/v3/videos"
+    async def _get_youtube_video_details(self, video_ids: List[str], api_key: str) -> Dict[str, Dict]:
+        """Lấy chi tiết video YouTube theo lô 50 id (gọi đồng thời), trả về dict theo id"""
+        details_url = f"{self.api_base_urls['youtube']}/videos"
+        chunks = [video_ids[i:i + YOUTUBE_MAX_IDS_PER_REQUEST]
+                  for i in range(0, len(video_ids), YOUTUBE_MAX_IDS_PER_REQUEST)]
+        
+        async def fetch(chunk: List[str]) -> List[Dict]:
             params = {
                 'part': 'statistics,contentDetails',
-                'id': ','.join(video_ids),
+                'id': ','.join(chunk),
                 'key': api_key
             }
-            
-            response = self.session.get(details_url, params=params)
-            response.raise_for_status()
-            
-            return response.json()['items']
-            
-        except Exception as e:
-            logger.error(f"Error getting YouTube video details: {e}")
-            return [{} for _ in video_ids]
+            try:
+                data = await self.client.get_json('youtube', details_url, params)
+                return data.get('items', [])
+            except Exception as e:
+                logger.error(f"Error getting YouTube video details: {e}")
+                return []
+        
+        # Merge by id: the API omits deleted/private videos from the response
+        details = {}
+        for items in await asyncio.gather(*(fetch(chunk) for chunk in chunks)):
+            for item in items:
+                details[item['id']] = item
+        
+        return details
     
     def _parse_duration(self, duration: str) -> int:
         """Parse ISO 8601 duration to seconds"""
@@ -194,6 +314,81 @@ class TrendAnalyzer:
         
         return engagement_rate * recency_factor * video.views
     
+    def calculate_engagement_scores(self, videos: Union[List[VideoData], VideoTable]) -> np.ndarray:
+        """
+        Tính điểm tương tác cho cả lô video (vector hóa)
+        
+        Cùng công thức với _calculate_engagement_score: engagement rate ×
+        hệ số mới × views, nhưng timestamp được parse một lần cho cả cột.
+        
+        Args:
+            videos: Danh sách video hoặc VideoTable
+            
+        Returns:
+            np.ndarray: Điểm của từng video theo thứ tự đầu vào
+        """
+        table = self._as_table(videos)
+        views = table.column('views').astype(np.float64)
+        interactions = table.column('likes') + table.column('comments')
+        
+        # Weight by recency (newer videos get higher score)
+        days_old = self._days_old(table.column('upload_date'))
+        recency_factor = np.maximum(0.1, 1 - days_old / 30)  # Decay over 30 days
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            engagement_rate = interactions / views
+            scores = engagement_rate * recency_factor * views
+        return np.where(views > 0, scores, 0.0)
+    
+    def _days_old(self, upload_dates: np.ndarray) -> np.ndarray:
+        """Số ngày (làm tròn xuống) kể từ upload, timestamp có và không có múi giờ"""
+        dates = np.asarray(pd.Series(upload_dates, dtype=object).fillna(''), dtype=str)
+        aware = self._has_utc_offset(dates)
+        days_old = np.full(len(dates), np.nan)
+        
+        # Aware timestamps are compared in UTC, naive ones against local time
+        for mask, now, utc in ((aware, pd.Timestamp.now(tz='UTC'), True),
+                               (~aware, pd.Timestamp.now(), False)):
+            if mask.any():
+                parsed = pd.to_datetime(dates[mask], format='ISO8601', utc=utc, errors='coerce')
+                days_old[mask] = np.floor((now - parsed).total_seconds().to_numpy() / 86400)
+        
+        # Unparseable dates get the minimum recency
+        return np.nan_to_num(days_old, nan=np.inf)
+    
+    def _has_utc_offset(self, dates: np.ndarray) -> np.ndarray:
+        """Timestamp ISO nào có múi giờ (Z, +hh:mm, +hhmm), như tzinfo của datetime.fromisoformat"""
+        return pd.Series(dates, dtype=object).str.contains(UTC_OFFSET_PATTERN, na=False).to_numpy(dtype=bool)
+    
+    def rank_by_engagement(self,
+                           videos: Union[List[VideoData], VideoTable],
+                           top_k: Optional[int] = None) -> np.ndarray:
+        """
+        Chỉ số video theo điểm tương tác giảm dần
+        
+        Args:
+            videos: Danh sách video hoặc VideoTable
+            top_k: Chỉ lấy k video điểm cao nhất (chọn bằng argpartition,
+                chỉ sắp xếp k phần tử đó)
+            
+        Returns:
+            np.ndarray: Chỉ số video, điểm cao nhất trước
+        """
+        scores = self.calculate_engagement_scores(videos)
+        candidates = np.arange(len(scores))
+        
+        if top_k is not None and top_k < len(scores):
+            if top_k <= 0:
+                return candidates[:0]
+            # argpartition picks arbitrarily among rows tied at the k-th score,
+            # so keep every row scoring at least that much and cut after sorting
+            kth_score = scores[np.argpartition(-scores, top_k - 1)[top_k - 1]]
+            candidates = np.flatnonzero(scores >= kth_score)
+        
+        # Ties keep input order, like the previous stable sort
+        order = np.lexsort((candidates, -scores[candidates]))
+        return candidates[order][:top_k]
+    
     def _get_mock_youtube_data(self, keyword: str, max_results: int) -> List[VideoData]:
         """Mock data for YouTube (when API is not available)"""
         mock_videos = []
@@ -210,7 +405,8 @@ class TrendAnalyzer:
                 url=f"https://youtube.com/watch?v=mock{i}",
                 thumbnail=f"https://img.youtube.com/vi/mock{i}/maxresdefault.jpg",
                 tags=[keyword, "trending", "viral"],
-                platform="youtube"
+                platform="youtube",
+                keyword=keyword
             )
             mock_videos.append(video)
         
@@ -232,90 +428,159 @@ class TrendAnalyzer:
                 url=f"https://tiktok.com/@user/video/{i}",
                 thumbnail=f"https://p16-sign.tiktokcdn-us.com/mock{i}.jpeg",
                 tags=[keyword, "tiktok", "viral", "fyp"],
-                platform="tiktok"
+                platform="tiktok",
+                keyword=keyword
             )
             mock_videos.append(video)
         
         return mock_videos
     
-    def analyze_trending_patterns(self, videos: List[VideoData]) -> Dict[str, Any]:
+    def analyze_trending_patterns(self, videos: Union[List[VideoData], VideoTable]) -> Dict[str, Any]:
         """
         Phân tích patterns trong video trending
         
         Args:
-            videos: Danh sách video
+            videos: Danh sách video hoặc VideoTable
             
         Returns:
             Dict[str, Any]: Kết quả phân tích
         """
-        if not videos:
+        table = self._as_table(videos)
+        if not len(table):
             return {}
         
-        # Convert to DataFrame for analysis
-        df = pd.DataFrame([{
-            'title': v.title,
-            'views': v.views,
-            'likes': v.likes,
-            'comments': v.comments,
-            'duration': v.duration,
-            'platform': v.platform,
-            'tags': v.tags
-        } for v in videos])
-        
-        analysis = {
-            'total_videos': len(videos),
-            'platform_distribution': df['platform'].value_counts().to_dict(),
-            'avg_views': df['views'].mean(),
-            'avg_likes': df['likes'].mean(),
-            'avg_comments': df['comments'].mean(),
-            'avg_duration': df['duration'].mean(),
-            'top_performing_videos': df.nlargest(5, 'views')[['title', 'views', 'likes']].to_dict('records'),
-            'common_tags': self._extract_common_tags(videos),
-            'duration_analysis': self._analyze_duration_patterns(df),
-            'engagement_analysis': self._analyze_engagement_patterns(df)
-        }
-        
-        return analysis
+        # One partial over the whole table: the same code path as analyze_sharded
+        aggregate = TrendAggregate.from_table(table,
+                                              np.arange(len(table)),
+                                              duration_bin_edges(table.column('duration')),
+                                              self.config.get("tag_counting"))
+        return aggregate.to_analysis()
     
-    def _extract_common_tags(self, videos: List[VideoData]) -> Dict[str, int]:
-        """Trích xuất tags phổ biến"""
-        tag_counts = {}
+    def analyze_sharded(self,
+                        videos: Union[List[VideoData], VideoTable],
+                        shard_by: Optional[str] = None,
+                        workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Phân tích patterns song song trên nhiều process
+        
+        Video được chia shard theo platform hoặc keyword, mỗi process tính một
+        tổng hợp gộp được (TrendAggregate) cho shard của nó, rồi các tổng hợp
+        được gộp lại. Kết quả giống analyze_trending_patterns (engagement rate
+        trung bình chỉ lệch ở mức sai số làm tròn float).
+        
+        Args:
+            videos: Danh sách video hoặc VideoTable
+            shard_by: "platform" hoặc "keyword" (mặc định: TREND_CONFIG["analysis_shard_by"])
+            workers: Số process (mặc định: TREND_CONFIG["analysis_workers"] hoặc số core)
+            
+        Returns:
+            Dict[str, Any]: Kết quả phân tích
+        """
+        table = self._as_table(videos)
+        if not len(table):
+            return {}
+        
+        shard_by = shard_by or self.config.get("analysis_shard_by", "platform")
+        if shard_by not in ("platform", "keyword"):
+            raise ValueError(f"Unknown shard key: {shard_by}")
+        
+        keys = np.array([key or "" for key in table.column(shard_by)], dtype=object)
+        codes, _ = pd.factorize(keys)
+        shards = [np.flatnonzero(codes == code) for code in range(codes.max() + 1)]
+        
+        # Bin edges and tag counting settings must be global for the partials to merge
+        bin_edges = duration_bin_edges(table.column('duration'))
+        tag_config = self.config.get("tag_counting")
+        jobs = [(table.take(indices), indices, bin_edges, tag_config) for indices in shards]
         
-        for video in videos:
-            for tag in video.tags:
-                tag_counts[tag] = tag_counts.get(tag, 0) + 1
+        max_workers = workers or self.config.get("analysis_workers") or os.cpu_count() or 1
+        max_workers = min(max_workers, len(jobs))
+        logger.info(f"Analyzing {len(table)} videos in {len(jobs)} {shard_by} shard(s) "
+                    f"with {max_workers} worker(s)")
         
-        # Sort by frequency
-        return dict(sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:20])
+        if max_workers == 1:
+            partials = [aggregate_shard(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                partials = list(executor.map(aggregate_shard, *zip(*jobs)))
+        
+        return reduce(TrendAggregate.merge, partials).to_analysis()
     
-    def _analyze_duration_patterns(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Phân tích patterns về thời lượng video"""
-        return {
-            'short_videos': len(df[df['duration'] <= 30]),
-            'medium_videos': len(df[(df['duration'] > 30) & (df['duration'] <= 120)]),
-            'long_videos': len(df[df['duration'] > 120]),
-            'optimal_duration': df.groupby(pd.cut(df['duration'], bins=5))['views'].mean().idxmax()
-        }
+    def create_stream(self) -> TrendStream:
+        """
+        Tạo TrendStream theo TREND_CONFIG["stream"] cho dashboard trực tiếp
+        
+        Returns:
+            TrendStream: Stream rỗng; đẩy video vào bằng push()/extend()
+        """
+        stream_config = self.config.get("stream") or {}
+        return TrendStream(
+            window_seconds=stream_config.get("window_seconds", 3600),
+            buckets=stream_config.get("buckets", 12),
+            top_tags=stream_config.get("top_tags", 20),
+            sketch_width=stream_config.get("sketch_width", 2048),
+            sketch_depth=stream_config.get("sketch_depth", 4)
+        )
     
-    def _analyze_engagement_patterns(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Phân tích patterns về tương tác"""
-        df['engagement_rate'] = (df['likes'] + df['comments']) / df['views']
-        
-        return {
-            'avg_engagement_rate': df['engagement_rate'].mean(),
-            'high_engagement_videos': len(df[df['engagement_rate'] > 0.05]),
-            'platform_engagement': df.groupby('platform')['engagement_rate'].mean().to_dict()
+    def analyze_history(self,
+                        start: Optional[Union[str, datetime]] = None,
+                        end: Optional[Union[str, datetime]] = None,
+                        platforms: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Phân tích trend trên dữ liệu đã lưu trong warehouse, không gọi API
+        
+        Args:
+            start: Mốc đầu của khoảng thời gian (None = từ đầu)
+            end: Mốc cuối (None = tới hiện tại)
+            platforms: Chỉ phân tích các platform này
+            
+        Returns:
+            Dict[str, Any]: Kết quả như analyze_trending_patterns, trên snapshot
+                mới nhất của mỗi video, kèm tốc độ tăng trưởng views/likes
+        """
+        if self.warehouse is None:
+            raise ValueError("Trend warehouse is disabled in TREND_CONFIG")
+        
+        analysis = self.analyze_trending_patterns(self.warehouse.latest(start, end, platforms))
+        if not analysis:
+            return {}
+        
+        velocity = self.warehouse.velocity(start, end, platforms)
+        analysis['window'] = {
+            'start': str(start) if start is not None else None,
+            'end': str(end) if end is not None else None
         }
+        analysis['velocity'] = {
+            'tracked_videos': len(velocity),
+            'avg_views_per_hour': float(velocity['views_per_hour'].mean()) if len(velocity) else 0.0,
+            'top_growing_videos': velocity.head(5)[['url', 'views_per_hour', 'likes_per_hour']].to_dict('records')
+        }
+        
+        return analysis
+    
+    def _as_table(self, videos: Union[List[VideoData], VideoTable]) -> VideoTable:
+        """Chuyển danh sách VideoData sang VideoTable (giữ nguyên nếu đã là bảng)"""
+        return videos if isinstance(videos, VideoTable) else VideoTable.from_videos(videos)
+    
+    def create_tag_summary(self) -> Optional[Union[SpaceSaving, CountMinHeavyHitters]]:
+        """
+        Tạo bộ đếm tags xấp xỉ, bộ nhớ cố định, theo TREND_CONFIG["tag_counting"]
+        
+        Returns:
+            Optional: SpaceSaving ("space_saving"), CountMinHeavyHitters
+                ("count_min"), hoặc None khi dùng đếm chính xác ("exact")
+        """
+        return create_tag_summary(self.config.get("tag_counting"))
     
     def save_analysis(self, 
-                     videos: List[VideoData], 
+                     videos: Union[List[VideoData], VideoTable], 
                      analysis: Dict[str, Any],
                      output_dir: Path) -> Path:
         """
         Lưu kết quả phân tích
         
         Args:
-            videos: Danh sách video
+            videos: Danh sách video hoặc VideoTable
             analysis: Kết quả phân tích
             output_dir: Thư mục lưu
             
@@ -325,21 +590,7 @@ class TrendAnalyzer:
         output_dir.mkdir(parents=True, exist_ok=True)
         
         # Save videos data
-        videos_data = []
-        for video in videos:
-            videos_data.append({
-                'title': video.title,
-                'description': video.description,
-                'views': video.views,
-                'likes': video.likes,
-                'comments': video.comments,
-                'duration': video.duration,
-                'upload_date': video.upload_date,
-                'url': video.url,
-                'thumbnail': video.thumbnail,
-                'tags': video.tags,
-                'platform': video.platform
-            })
+        videos_data = self._as_table(videos).to_records()
         
         # Save to JSON
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
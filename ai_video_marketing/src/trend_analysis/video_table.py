@@ -0,0 +1,233 @@
+"""
+Video Table - Lưu dữ liệu video trend dạng cột (struct-of-arrays)
+"""
+import numpy as np
+import pandas as pd
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NUMERIC_COLUMNS = ('views', 'likes', 'comments', 'duration')
+TEXT_COLUMNS = ('title', 'description', 'upload_date', 'url', 'thumbnail', 'platform', 'keyword')
+# Same field order as VideoData
+RECORD_FIELDS = ('title', 'description', 'views', 'likes', 'comments', 'duration',
+                 'upload_date', 'url', 'thumbnail', 'tags', 'platform', 'keyword')
+
+class VideoTable:
+    """
+    Bảng video dạng cột, chỉ cho phép thêm vào cuối
+    
+    Mỗi cột số là một mảng int64 liền khối, cột text là mảng object, tags
+    được lưu phẳng kèm mảng offset (giống kiểu list của Arrow). Bộ nhớ tăng
+    theo cấp số nhân nên append có chi phí khấu hao O(1), và to_pandas() dùng
+    thẳng các mảng số (không copy).
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity: Số dòng cấp phát ban đầu
+        """
+        capacity = max(int(capacity), 1)
+        self._size = 0
+        self._numeric = {name: np.zeros(capacity, dtype=np.int64) for name in NUMERIC_COLUMNS}
+        self._text = {name: np.empty(capacity, dtype=object) for name in TEXT_COLUMNS}
+        self._tag_offsets = np.zeros(capacity + 1, dtype=np.int64)
+        self._tags: List[str] = []
+    
+    @classmethod
+    def from_videos(cls, videos: Iterable[Any]) -> 'VideoTable':
+        """Tạo bảng từ danh sách VideoData"""
+        videos = list(videos)
+        table = cls(capacity=len(videos))
+        table.extend(videos)
+        return table
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def capacity(self) -> int:
+        return len(self._tag_offsets) - 1
+    
+    def _reserve(self, extra: int):
+        """Đảm bảo đủ chỗ cho thêm `extra` dòng (tăng gấp đôi khi thiếu)"""
+        needed = self._size + extra
+        if needed <= self.capacity:
+            return
+        
+        capacity = max(needed, self.capacity * 2)
+        for columns in (self._numeric, self._text):
+            for name, values in columns.items():
+                grown = np.zeros(capacity, dtype=values.dtype) if values.dtype != object \
+                    else np.empty(capacity, dtype=object)
+                grown[:self._size] = values[:self._size]
+                columns[name] = grown
+        
+        offsets = np.zeros(capacity + 1, dtype=np.int64)
+        offsets[:self._size + 1] = self._tag_offsets[:self._size + 1]
+        self._tag_offsets = offsets
+    
+    def append(self, video: Any):
+        """Thêm một video (VideoData hoặc object có cùng thuộc tính)"""
+        self._reserve(1)
+        i = self._size
+        
+        for name in NUMERIC_COLUMNS:
+            self._numeric[name][i] = int(getattr(video, name) or 0)
+        for name in TEXT_COLUMNS:
+            self._text[name][i] = getattr(video, name)
+        
+        self._tags.extend(video.tags or [])
+        self._tag_offsets[i + 1] = len(self._tags)
+        self._size += 1
+    
+    def extend(self, videos: Iterable[Any]):
+        """Thêm nhiều video"""
+        for video in videos:
+            self.append(video)
+    
+    def append_columns(self,
+                       columns: Dict[str, Sequence],
+                       tags: Optional[Sequence[Sequence[str]]] = None):
+        """
+        Thêm một lô dòng theo cột (không tạo object cho từng video)
+        
+        Args:
+            columns: {tên cột: dãy giá trị}, mọi cột cùng độ dài; cột thiếu
+                được điền 0 hoặc None
+            tags: Danh sách tags của từng dòng (tùy chọn)
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError("All columns must have the same length")
+        count = lengths.pop()
+        if tags is not None and len(tags) != count:
+            raise ValueError("tags must have one entry per row")
+        
+        self._reserve(count)
+        start, end = self._size, self._size + count
+        
+        for name in NUMERIC_COLUMNS:
+            if name in columns:
+                self._numeric[name][start:end] = np.asarray(columns[name], dtype=np.int64)
+        for name in TEXT_COLUMNS:
+            if name in columns:
+                self._text[name][start:end] = np.asarray(columns[name], dtype=object)
+        
+        lengths = np.zeros(count, dtype=np.int64)
+        if tags is not None:
+            for row_tags in tags:
+                self._tags.extend(row_tags)
+            lengths = np.fromiter((len(row_tags) for row_tags in tags), dtype=np.int64, count=count)
+        self._tag_offsets[start + 1:end + 1] = self._tag_offsets[start] + np.cumsum(lengths)
+        self._size = end
+    
+    def take(self, indices: Sequence[int]) -> 'VideoTable':
+        """Bảng mới chỉ gồm các dòng theo chỉ số cho trước"""
+        indices = np.asarray(indices, dtype=np.int64)
+        columns = {name: self.column(name)[indices] for name in NUMERIC_COLUMNS + TEXT_COLUMNS}
+        
+        table = VideoTable(capacity=len(indices))
+        table.append_columns(columns, tags=[self.tags_of(i) for i in indices])
+        return table
+    
+    def column(self, name: str) -> np.ndarray:
+        """View (không copy) của một cột"""
+        if name in self._numeric:
+            return self._numeric[name][:self._size]
+        if name in self._text:
+            return self._text[name][:self._size]
+        raise KeyError(name)
+    
+    @property
+    def tag_values(self) -> List[str]:
+        """Toàn bộ tags của mọi video, nối liền nhau"""
+        return self._tags
+    
+    @property
+    def tag_offsets(self) -> np.ndarray:
+        """Offset tags: tags của dòng i là tag_values[offsets[i]:offsets[i + 1]]"""
+        return self._tag_offsets[:self._size + 1]
+    
+    def tags_of(self, index: int) -> List[str]:
+        """Tags của một dòng"""
+        return self._tags[self._tag_offsets[index]:self._tag_offsets[index + 1]]
+    
+    def to_pandas(self, include_tags: bool = True) -> pd.DataFrame:
+        """
+        Chuyển sang DataFrame
+        
+        Cột số dùng chung bộ nhớ với bảng (không copy). Cột tags (list cho
+        từng dòng) chỉ được tạo khi include_tags=True.
+        
+        Args:
+            include_tags: Có tạo cột tags hay không
+        
+        Returns:
+            pd.DataFrame: Một dòng cho mỗi video
+        """
+        data = {name: self.column(name) for name in TEXT_COLUMNS + NUMERIC_COLUMNS}
+        df = pd.DataFrame(data, copy=False)
+        df['platform'] = df['platform'].astype('category')
+        
+        if include_tags:
+            offsets = self.tag_offsets
+            df['tags'] = [self._tags[offsets[i]:offsets[i + 1]] for i in range(self._size)]
+        return df
+    
+    @classmethod
+    def from_pandas(cls, df: pd.DataFrame) -> 'VideoTable':
+        """Tạo bảng từ DataFrame có các cột của VideoData"""
+        table = cls(capacity=len(df))
+        columns = {name: df[name].to_numpy() for name in NUMERIC_COLUMNS + TEXT_COLUMNS
+                   if name in df.columns}
+        tags = [list(row) if row is not None else [] for row in df['tags']] \
+            if 'tags' in df.columns else None
+        table.append_columns(columns, tags)
+        return table
+    
+    def to_parquet(self, path: Path) -> Path:
+        """Ghi bảng ra file Parquet (cần pyarrow)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df = self.to_pandas()
+        df['platform'] = df['platform'].astype(str)
+        df.to_parquet(path, index=False)
+        return path
+    
+    @classmethod
+    def read_parquet(cls, path: Path) -> 'VideoTable':
+        """Đọc bảng từ file Parquet (cần pyarrow)"""
+        return cls.from_pandas(pd.read_parquet(path))
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Danh sách dict theo từng video (để ghi JSON)"""
+        records = []
+        for i in range(self._size):
+            values = {name: self._text[name][i] for name in TEXT_COLUMNS}
+            values.update({name: int(self._numeric[name][i]) for name in NUMERIC_COLUMNS})
+            values['tags'] = self.tags_of(i)
+            records.append({name: values[name] for name in RECORD_FIELDS})
+        return records
+    
+    def __getitem__(self, index: int):
+        """Dòng thứ index dưới dạng VideoData"""
+        from .trend_analyzer import VideoData
+        
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        
+        values = {name: self._text[name][index] for name in TEXT_COLUMNS}
+        values.update({name: int(self._numeric[name][index]) for name in NUMERIC_COLUMNS})
+        return VideoData(tags=self.tags_of(index), **values)
+    
+    def __iter__(self) -> Iterator:
+        for i in range(self._size):
+            yield self[i]
@@ -0,0 +1,262 @@
+"""
+Trend Warehouse - Lưu lịch sử video trend dạng Parquet phân vùng theo platform/ngày
+"""
+import uuid
+import logging
+import itertools
+import numpy as np
+import pandas as pd
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .video_table import VideoTable
+from .sketches import SpaceSaving
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, date, datetime, pd.Timestamp]
+
+class TrendWarehouse:
+    """
+    Kho lịch sử trend cục bộ: <root>/platform=<p>/date=<YYYY-MM-DD>/part-*.parquet
+    
+    Mỗi lần ingest ghi thêm một snapshot (views/likes/comments tại thời điểm
+    lấy dữ liệu) cho từng video, không sửa file cũ. Video được nhận diện theo
+    URL: trong một lần ingest mỗi URL chỉ có một dòng, khi đọc có thể lấy
+    snapshot mới nhất của mỗi URL hoặc toàn bộ chuỗi snapshot để tính tốc độ
+    tăng trưởng. Truy vấn theo khoảng thời gian chỉ đọc các phân vùng ngày
+    nằm trong khoảng đó.
+    """
+    
+    SNAPSHOT_COLUMNS = ['url', 'fetched_at', 'views', 'likes', 'comments']
+    
+    def __init__(self, root: Path):
+        """
+        Args:
+            root: Thư mục gốc của kho
+        """
+        self.root = Path(root)
+    
+    @staticmethod
+    def _to_utc(value: Optional[DateLike]) -> Optional[pd.Timestamp]:
+        """Chuẩn hóa mốc thời gian về Timestamp UTC (naive được coi là UTC)"""
+        if value is None:
+            return None
+        timestamp = pd.Timestamp(value)
+        return timestamp.tz_localize('UTC') if timestamp.tzinfo is None else timestamp.tz_convert('UTC')
+    
+    @classmethod
+    def _window(cls,
+                start: Optional[DateLike],
+                end: Optional[DateLike]) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """
+        Khoảng [start, end) theo UTC từ mốc đầu/cuối (cả hai đều bao gồm)
+        
+        Mốc cuối chỉ có ngày ("2026-10-19" hoặc date) bao gồm cả ngày đó,
+        mốc cuối có giờ bao gồm đúng thời điểm đó.
+        """
+        start_utc, end_utc = cls._to_utc(start), cls._to_utc(end)
+        if end_utc is not None:
+            date_only = (isinstance(end, date) and not isinstance(end, datetime)) \
+                or (isinstance(end, str) and len(end.strip()) <= 10)
+            end_utc += pd.Timedelta(days=1) if date_only else pd.Timedelta(1, unit='ns')
+        return start_utc, end_utc
+    
+    @staticmethod
+    def _in_window(fetched_at: pd.Series,
+                   start: Optional[pd.Timestamp],
+                   end: Optional[pd.Timestamp]) -> np.ndarray:
+        """Mask các snapshot có fetched_at trong [start, end)"""
+        mask = np.ones(len(fetched_at), dtype=bool)
+        if start is not None:
+            mask &= (fetched_at >= start).to_numpy()
+        if end is not None:
+            mask &= (fetched_at < end).to_numpy()
+        return mask
+    
+    def ingest(self,
+               videos: Union[List[Any], VideoTable],
+               fetched_at: Optional[DateLike] = None) -> List[Path]:
+        """
+        Ghi một snapshot của các video vào kho
+        
+        Args:
+            videos: Danh sách VideoData hoặc VideoTable
+            fetched_at: Thời điểm lấy dữ liệu (mặc định: bây giờ, UTC)
+        
+        Returns:
+            List[Path]: Các file Parquet đã ghi (một file mỗi platform)
+        """
+        table = videos if isinstance(videos, VideoTable) else VideoTable.from_videos(videos)
+        if not len(table):
+            return []
+        
+        fetched_at = self._to_utc(fetched_at) or pd.Timestamp.now(tz='UTC')
+        df = table.to_pandas()
+        df['platform'] = df['platform'].astype(str)
+        df['fetched_at'] = fetched_at
+        
+        # One row per video per snapshot, the last fetch of a URL wins
+        df = df.drop_duplicates('url', keep='last')
+        
+        day = fetched_at.strftime('%Y-%m-%d')
+        written = []
+        for platform, rows in df.groupby('platform', sort=False):
+            partition = self.root / f"platform={platform}" / f"date={day}"
+            partition.mkdir(parents=True, exist_ok=True)
+            
+            path = partition / f"part-{fetched_at.strftime('%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+            temp_path = path.with_suffix('.tmp')
+            rows.to_parquet(temp_path, index=False)
+            temp_path.replace(path)
+            written.append(path)
+        
+        logger.info(f"Warehouse: stored {len(df)} video snapshots for {day}")
+        return written
+    
+    def platforms(self) -> List[str]:
+        """Các platform đã có dữ liệu"""
+        return sorted(path.name.split('=', 1)[1] for path in self.root.glob('platform=*') if path.is_dir())
+    
+    def _partition_files(self,
+                         start: Optional[pd.Timestamp],
+                         end: Optional[pd.Timestamp],
+                         platforms: Optional[Iterable[str]]) -> List[Path]:
+        """Các file thuộc phân vùng platform/ngày giao với khoảng [start, end)"""
+        first_day = start.strftime('%Y-%m-%d') if start is not None else None
+        last_day = (end - pd.Timedelta(1, unit='ns')).strftime('%Y-%m-%d') if end is not None else None
+        
+        files = []
+        for platform in (platforms or self.platforms()):
+            for partition in sorted((self.root / f"platform={platform}").glob('date=*')):
+                day = partition.name.split('=', 1)[1]
+                if (first_day and day < first_day) or (last_day and day > last_day):
+                    continue
+                files.extend(sorted(partition.glob('*.parquet')))
+        return files
+    
+    def load_snapshots(self,
+                       start: Optional[DateLike] = None,
+                       end: Optional[DateLike] = None,
+                       platforms: Optional[Iterable[str]] = None,
+                       columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Đọc mọi snapshot trong khoảng thời gian
+        
+        Args:
+            start: Mốc đầu (theo thời điểm lấy dữ liệu), None = không giới hạn
+            end: Mốc cuối (bao gồm; chỉ có ngày = hết ngày đó), None = không giới hạn
+            platforms: Chỉ đọc các platform này
+            columns: Chỉ đọc các cột này (luôn kèm url và fetched_at)
+        
+        Returns:
+            pd.DataFrame: Một dòng cho mỗi snapshot, sắp theo fetched_at
+        """
+        start, end = self._window(start, end)
+        if columns is not None:
+            columns = list(dict.fromkeys(['url', 'fetched_at'] + list(columns)))
+        
+        files = self._partition_files(start, end, platforms)
+        if not files:
+            return pd.DataFrame(columns=columns or self.SNAPSHOT_COLUMNS)
+        
+        df = pd.concat([pd.read_parquet(path, columns=columns) for path in files], ignore_index=True)
+        df['fetched_at'] = pd.to_datetime(df['fetched_at'], utc=True)
+        
+        mask = self._in_window(df['fetched_at'], start, end)
+        return df[mask].sort_values('fetched_at', kind='stable').reset_index(drop=True)
+    
+    def latest(self,
+               start: Optional[DateLike] = None,
+               end: Optional[DateLike] = None,
+               platforms: Optional[Iterable[str]] = None) -> VideoTable:
+        """
+        Snapshot mới nhất của mỗi video (theo URL) trong khoảng thời gian
+        
+        Args:
+            start: Mốc đầu
+            end: Mốc cuối
+            platforms: Chỉ lấy các platform này
+        
+        Returns:
+            VideoTable: Mỗi URL một dòng
+        """
+        df = self.load_snapshots(start, end, platforms)
+        if df.empty:
+            return VideoTable()
+        return VideoTable.from_pandas(df.drop_duplicates('url', keep='last'))
+    
+    def velocity(self,
+                 start: Optional[DateLike] = None,
+                 end: Optional[DateLike] = None,
+                 platforms: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Tốc độ tăng views/likes mỗi giờ giữa snapshot đầu và cuối trong khoảng
+        
+        Args:
+            start: Mốc đầu
+            end: Mốc cuối
+            platforms: Chỉ tính các platform này
+        
+        Returns:
+            pd.DataFrame: url, snapshots, hours, views, views_per_hour,
+                likes_per_hour (chỉ các video có ít nhất hai snapshot),
+                sắp theo views_per_hour giảm dần
+        """
+        df = self.load_snapshots(start, end, platforms, columns=['views', 'likes'])
+        if df.empty:
+            return pd.DataFrame(columns=['url', 'snapshots', 'hours', 'views',
+                                         'views_per_hour', 'likes_per_hour'])
+        
+        grouped = df.groupby('url', sort=False)
+        first, last = grouped.first(), grouped.last()
+        hours = (last['fetched_at'] - first['fetched_at']).dt.total_seconds() / 3600
+        
+        result = pd.DataFrame({
+            'snapshots': grouped.size(),
+            'hours': hours,
+            'views': last['views'],
+            'views_per_hour': (last['views'] - first['views']) / hours,
+            'likes_per_hour': (last['likes'] - first['likes']) / hours
+        })
+        result = result[result['hours'] > 0]
+        return result.sort_values('views_per_hour', ascending=False).reset_index()
+    
+    def tag_summary(self,
+                    start: Optional[DateLike] = None,
+                    end: Optional[DateLike] = None,
+                    platforms: Optional[Iterable[str]] = None,
+                    epsilon: float = 0.001) -> SpaceSaving:
+        """
+        Tags phổ biến trong khoảng thời gian với bộ nhớ giới hạn
+        
+        Mỗi phân vùng ngày được tóm tắt riêng bằng Space-Saving (chỉ đọc cột
+        tags) rồi gộp lại, nên không cần giữ toàn bộ tags trong bộ nhớ. Tính
+        theo từng snapshot, không dedupe theo URL.
+        
+        Args:
+            start: Mốc đầu
+            end: Mốc cuối
+            platforms: Chỉ tính các platform này
+            epsilon: Cận sai số theo tỉ lệ tổng số tags
+        
+        Returns:
+            SpaceSaving: Tóm tắt đã gộp, dùng .top(k) để lấy tags
+        """
+        start, end = self._window(start, end)
+        summary = SpaceSaving(epsilon=epsilon)
+        
+        files = self._partition_files(start, end, platforms)
+        for _, partition_files in itertools.groupby(files, key=lambda path: path.parent):
+            partial = SpaceSaving(epsilon=epsilon)
+            for path in partition_files:
+                df = pd.read_parquet(path, columns=['fetched_at', 'tags'])
+                mask = self._in_window(pd.to_datetime(df['fetched_at'], utc=True), start, end)
+                for tags in df['tags'][mask]:
+                    partial.update(tags if tags is not None else [])
+            summary = summary.merge(partial)
+        
+        return summary
@@ -4,5 +4,7 @@ Chỉnh sửa và lắp ghép video thành phẩm
 """
 
 from .video_editor import VideoEditor
+from .smart_crop import SmartCropper
+from .transitions import CrossfadeTimeline
 
-__all__ = ['VideoEditor']
+__all__ = ['VideoEditor', 'SmartCropper', 'CrossfadeTimeline']
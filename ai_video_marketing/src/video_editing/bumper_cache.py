@@ -0,0 +1,85 @@
+"""
+Bumper Cache - Cache intro/outro đã encode trên đĩa
+"""
+import os
+import json
+import hashlib
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Any, Callable
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class BumperCache:
+    """
+    Cache bumper (intro/outro) đã encode, dùng chung giữa các video và các lần chạy
+    
+    Bumper chỉ phụ thuộc vào text, font, độ phân giải, platform và thiết lập
+    encode, nên mỗi tổ hợp chỉ được render một lần. File được ghi ra tên
+    tạm rồi đổi tên, nên nhiều tiến trình có thể dùng chung thư mục cache.
+    """
+    
+    def __init__(self, cache_dir: Path):
+        """
+        Args:
+            cache_dir: Thư mục lưu bumper đã encode
+        """
+        self.cache_dir = Path(cache_dir)
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.stats = {"hits": 0, "misses": 0}
+    
+    def bumper_path(self, fields: Dict[str, Any]) -> Path:
+        """Đường dẫn file bumper ứng với tổ hợp thuộc tính"""
+        key = hashlib.sha256(
+            json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+        ).hexdigest()[:24]
+        return self.cache_dir / f"{fields.get('kind', 'bumper')}_{fields.get('platform', 'any')}_{key}.mp4"
+    
+    def get_or_render(self,
+                      fields: Dict[str, Any],
+                      render: Callable[[Path], None]) -> Path:
+        """
+        Lấy bumper từ cache hoặc render mới nếu chưa có
+        
+        Args:
+            fields: Các thuộc tính quyết định nội dung bumper (text, font,
+                độ phân giải, platform, thiết lập encode...)
+            render: Hàm ghi bumper ra đường dẫn được truyền vào
+        
+        Returns:
+            Path: Đường dẫn bumper đã encode
+        """
+        path = self.bumper_path(fields)
+        
+        with self._lock:
+            key_lock = self._key_locks.setdefault(path.name, threading.Lock())
+        
+        # Only one thread renders a given bumper, the others wait for it
+        with key_lock:
+            if path.exists():
+                with self._lock:
+                    self.stats["hits"] += 1
+                return path
+            
+            with self._lock:
+                self.stats["misses"] += 1
+            
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.mp4")
+            try:
+                render(temp_path)
+                os.replace(temp_path, path)
+            finally:
+                temp_path.unlink(missing_ok=True)
+            
+            logger.info(f"Rendered bumper {path.name}")
+            return path
+    
+    def clear(self):
+        """Xóa toàn bộ bumper đã cache"""
+        for path in self.cache_dir.glob("*.mp4"):
+            path.unlink(missing_ok=True)
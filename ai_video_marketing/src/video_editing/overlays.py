@@ -0,0 +1,137 @@
+"""
+Overlays - Tile RGBA premultiplied cho branding (title, logo)
+"""
+import cv2
+import numpy as np
+import moviepy.editor as mp
+import logging
+from functools import lru_cache
+from pathlib import Path
+from PIL import Image
+from typing import Dict, List, Optional, Tuple, Union
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class OverlayTile:
+    """
+    Tile overlay nhỏ với alpha đã nhân sẵn vào màu (premultiplied)
+    
+    Khi blend: out = premultiplied + frame * (1 - alpha), chỉ hai phép
+    tính uint8 trên đúng vùng bao của tile. Viền trong suốt được cắt bỏ
+    ngay khi tạo tile.
+    """
+    
+    def __init__(self, rgb: np.ndarray, alpha: np.ndarray):
+        """
+        Args:
+            rgb: Ảnh màu uint8 (H, W, 3)
+            alpha: Độ trong suốt (H, W), 0-1
+        """
+        alpha = np.clip(alpha.astype(np.float32), 0, 1)
+        
+        # Source size before trimming, used for layout
+        self.layout_size = (alpha.shape[1], alpha.shape[0])
+        
+        # Trim fully transparent borders so blends only touch visible pixels
+        rows = np.flatnonzero(alpha.max(axis=1) > 0)
+        cols = np.flatnonzero(alpha.max(axis=0) > 0)
+        if len(rows) and len(cols):
+            top, bottom, left, right = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+        else:
+            top, bottom, left, right = 0, 0, 0, 0
+        self.offset = (int(left), int(top))
+        
+        alpha = alpha[top:bottom, left:right]
+        rgb = rgb[top:bottom, left:right, :3].astype(np.float32)
+        
+        self.premultiplied = np.round(rgb * alpha[..., None]).astype(np.uint8)
+        inverse = np.round((1 - alpha) * 255).astype(np.uint8)
+        self.inverse_alpha = cv2.merge([inverse, inverse, inverse])
+        self.size = (self.premultiplied.shape[1], self.premultiplied.shape[0])
+    
+    def blend_into(self, frame: np.ndarray, x: int, y: int):
+        """Blend tile vào frame (tại chỗ) với góc trên trái ở (x, y)"""
+        x, y = x + self.offset[0], y + self.offset[1]
+        frame_h, frame_w = frame.shape[:2]
+        w, h = self.size
+        
+        # Clip the tile to the frame
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        
+        region = frame[y0:y1, x0:x1]
+        tile = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+        cv2.multiply(region, self.inverse_alpha[tile], dst=region, scale=1 / 255)
+        cv2.add(region, self.premultiplied[tile], dst=region)
+
+class BrandingOverlay:
+    """Áp các tile overlay lên frame, chỉ xử lý vùng bao của từng tile"""
+    
+    def __init__(self, placements: List[Tuple[OverlayTile, Tuple[Union[str, int], int]]]):
+        """
+        Args:
+            placements: Danh sách (tile, (x, y)); x có thể là 'center'
+        """
+        self.placements = placements
+        self._positions: Dict[Tuple[int, int], List[Tuple[OverlayTile, int, int]]] = {}
+    
+    def _resolve(self, frame_w: int, frame_h: int) -> List[Tuple[OverlayTile, int, int]]:
+        """Tính vị trí tile theo kích thước frame (cache theo kích thước)"""
+        key = (frame_w, frame_h)
+        if key not in self._positions:
+            resolved = []
+            for tile, (x, y) in self.placements:
+                if x == 'center':
+                    x = (frame_w - tile.layout_size[0]) // 2
+                resolved.append((tile, int(x), int(y)))
+            self._positions[key] = resolved
+        return self._positions[key]
+    
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        """Blend các tile vào frame uint8"""
+        # Decoded frames are read-only views of the reader buffer
+        if not frame.flags.writeable or frame.dtype != np.uint8:
+            frame = frame.astype(np.uint8, copy=True)
+        
+        for tile, x, y in self._resolve(frame.shape[1], frame.shape[0]):
+            tile.blend_into(frame, x, y)
+        return frame
+
+@lru_cache(maxsize=64)
+def render_text_tile(text: str,
+                     fontsize: int = 40,
+                     color: str = 'white',
+                     stroke_color: str = 'black',
+                     stroke_width: float = 2,
+                     font: str = 'Arial-Bold') -> OverlayTile:
+    """Rasterize text một lần thành tile (cache theo text và style)"""
+    text_clip = mp.TextClip(
+        text,
+        fontsize=fontsize,
+        color=color,
+        stroke_color=stroke_color,
+        stroke_width=stroke_width,
+        font=font
+    )
+    tile = OverlayTile(text_clip.get_frame(0), text_clip.mask.get_frame(0))
+    text_clip.close()
+    return tile
+
+@lru_cache(maxsize=8)
+def _load_logo_tile(path: str, mtime: float, height: int) -> OverlayTile:
+    """Đọc và resize logo thành tile (cache theo file và chiều cao)"""
+    logo = Image.open(path).convert('RGBA')
+    width = max(1, round(logo.width * height / logo.height))
+    logo = np.asarray(logo.resize((width, height), Image.Resampling.LANCZOS))
+    return OverlayTile(logo[:, :, :3], logo[:, :, 3] / 255.0)
+
+def load_logo_tile(path: Path, height: int = 60) -> Optional[OverlayTile]:
+    """Lấy tile logo đã cache, None nếu không có file logo"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return _load_logo_tile(str(path.resolve()), path.stat().st_mtime, height)
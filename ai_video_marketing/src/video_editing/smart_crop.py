@@ -0,0 +1,235 @@
+"""
+Smart Crop - Reframe video theo chủ thể cho các tỉ lệ dọc/vuông
+"""
+import cv2
+import numpy as np
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Callable
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CropPlan:
+    """Tâm khung crop (chuẩn hóa 0-1) tại các frame đã dò chủ thể, chia theo shot"""
+    times: np.ndarray          # (N,) thời điểm dò chủ thể
+    centers: np.ndarray        # (N, 2) tâm (x, y) đã làm mượt
+    shot_starts: List[int]     # chỉ số trong times của frame dò đầu tiên mỗi shot
+    shot_times: np.ndarray     # (S,) thời điểm bắt đầu mỗi shot
+    
+    def center_at(self, t: float) -> Tuple[float, float]:
+        """Nội suy tâm crop tại thời điểm t, không nội suy qua điểm cắt shot"""
+        if len(self.times) == 0:
+            return 0.5, 0.5
+        
+        # Samples of the shot containing t
+        shot = max(int(np.searchsorted(self.shot_times, t, side='right')) - 1, 0)
+        start = self.shot_starts[shot]
+        end = self.shot_starts[shot + 1] if shot + 1 < len(self.shot_starts) else len(self.times)
+        
+        times = self.times[start:end]
+        return (float(np.interp(t, times, self.centers[start:end, 0])),
+                float(np.interp(t, times, self.centers[start:end, 1])))
+
+class SmartCropper:
+    """
+    Tính khung crop theo chủ thể cho từng shot
+    
+    Chỉ phân tích các frame đã thu nhỏ, lấy mẫu thưa (mặc định 2 fps).
+    Điểm cắt shot được phát hiện trước bằng histogram (rẻ), rồi chủ thể chỉ
+    được dò trên một hoặc hai frame mỗi shot bằng face detector (nếu OpenCV
+    có kèm Haar cascade) hoặc saliency spectral residual, và tâm khung được
+    làm mượt bằng EMA trong từng shot. Mỗi frame khi export chỉ còn là một
+    phép cắt (view, không copy) theo tâm đã nội suy.
+    """
+    
+    def __init__(self,
+                 sample_fps: float = 2.0,
+                 analysis_width: int = 320,
+                 shot_threshold: float = 0.5,
+                 smoothing: float = 0.6,
+                 detections_per_shot: int = 2):
+        """
+        Args:
+            sample_fps: Số frame lấy histogram mỗi giây (để tìm điểm cắt shot)
+            analysis_width: Chiều rộng frame khi phân tích
+            shot_threshold: Ngưỡng khoảng cách histogram (Bhattacharyya) để tính là cắt shot
+            smoothing: Trọng số của mẫu mới trong EMA (nhỏ = mượt hơn)
+            detections_per_shot: Số frame dò chủ thể trong mỗi shot (1 hoặc 2)
+        """
+        self.sample_fps = sample_fps
+        self.analysis_width = analysis_width
+        self.shot_threshold = shot_threshold
+        self.smoothing = smoothing
+        self.detections_per_shot = max(1, detections_per_shot)
+        self.face_detector = self._load_face_detector()
+    
+    def _load_face_detector(self) -> Optional[Any]:
+        """Nạp Haar cascade nếu bản OpenCV có kèm module objdetect và dữ liệu"""
+        data_dir = getattr(getattr(cv2, 'data', None), 'haarcascades', None)
+        if not data_dir or not hasattr(cv2, 'CascadeClassifier'):
+            return None
+        
+        cascade_path = Path(data_dir) / 'haarcascade_frontalface_default.xml'
+        if not cascade_path.exists():
+            return None
+        
+        detector = cv2.CascadeClassifier(str(cascade_path))
+        return None if detector.empty() else detector
+    
+    def analyze(self, clip) -> CropPlan:
+        """
+        Phân tích clip một lần để lấy kế hoạch crop
+        
+        Nên truyền clip nguồn chưa grade: kết quả chỉ phụ thuộc vào bố cục
+        và thời gian, và đọc frame nguồn không phải chạy chuỗi hiệu ứng.
+        
+        Args:
+            clip: Video clip (moviepy)
+        
+        Returns:
+            CropPlan: Tâm khung crop theo thời gian
+        """
+        # Evenly spaced samples covering the whole clip, last one just before the end
+        end = max((clip.duration or 0) - 1e-3, 0)
+        num_samples = max(2, int(np.ceil(end * self.sample_fps)) + 1)
+        sample_times = np.linspace(0, end, num_samples)
+        
+        # Pass 1: cut detection on histograms only, keeping the small gray frames
+        grays = []
+        cuts = [0]
+        prev_hist = None
+        for i, t in enumerate(sample_times):
+            small = self._downsample(clip.get_frame(t))
+            hist = self._histogram(small)
+            if prev_hist is not None:
+                distance = cv2.compareHist(prev_hist, hist, cv2.HISTCMP_BHATTACHARYYA)
+                if distance > self.shot_threshold:
+                    cuts.append(i)
+            prev_hist = hist
+            grays.append(cv2.cvtColor(small, cv2.COLOR_RGB2GRAY))
+        
+        # Pass 2: subject detection on one or two samples per shot
+        times, raw_centers, shot_starts = [], [], []
+        for start, stop in zip(cuts, cuts[1:] + [num_samples]):
+            shot_starts.append(len(times))
+            for i in self._detection_samples(start, stop):
+                times.append(sample_times[i])
+                raw_centers.append(self._find_subject(grays[i]))
+        
+        centers = self._smooth(np.array(raw_centers, dtype=np.float32), shot_starts)
+        logger.info(f"Smart crop: {num_samples} samples, {len(shot_starts)} shots, "
+                    f"{len(times)} subject detections")
+        
+        return CropPlan(times=np.array(times), centers=centers, shot_starts=shot_starts,
+                        shot_times=sample_times[cuts])
+    
+    def _detection_samples(self, start: int, stop: int) -> List[int]:
+        """Mẫu dùng để dò chủ thể trong shot [start, stop): ở 1/4 và 3/4 shot, hoặc giữa shot"""
+        if self.detections_per_shot == 1 or stop - start < 3:
+            return [(start + stop - 1) // 2]
+        return sorted({start + (stop - start) // 4, start + (3 * (stop - start)) // 4})
+    
+    def _downsample(self, frame: np.ndarray) -> np.ndarray:
+        """Thu nhỏ frame về chiều rộng phân tích"""
+        h, w = frame.shape[:2]
+        scale = self.analysis_width / w
+        if scale >= 1:
+            return frame[:, :, :3].astype(np.uint8, copy=False)
+        
+        size = (self.analysis_width, max(1, int(round(h * scale))))
+        return cv2.resize(frame[:, :, :3].astype(np.uint8, copy=False), size, interpolation=cv2.INTER_AREA)
+    
+    def _histogram(self, frame: np.ndarray) -> np.ndarray:
+        """Histogram H-S chuẩn hóa để so sánh giữa các frame"""
+        hsv = cv2.cvtColor(frame, cv2.COLOR_RGB2HSV)
+        hist = cv2.calcHist([hsv], [0, 1], None, [16, 16], [0, 180, 0, 256])
+        return cv2.normalize(hist, hist).flatten()
+    
+    def _find_subject(self, gray: np.ndarray) -> Tuple[float, float]:
+        """Tìm tâm chủ thể (chuẩn hóa 0-1) trên frame xám: khuôn mặt lớn nhất, sau đó là saliency"""
+        h, w = gray.shape[:2]
+        
+        if self.face_detector is not None:
+            faces = self.face_detector.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=4)
+            if len(faces):
+                x, y, fw, fh = max(faces, key=lambda f: f[2] * f[3])
+                return (x + fw / 2) / w, (y + fh / 2) / h
+        
+        return self._saliency_center(gray)
+    
+    def _saliency_center(self, gray: np.ndarray) -> Tuple[float, float]:
+        """Trọng tâm saliency theo phương pháp spectral residual"""
+        small = cv2.resize(gray, (64, 64), interpolation=cv2.INTER_AREA).astype(np.float32)
+        
+        spectrum = np.fft.fft2(small)
+        log_amplitude = np.log(np.abs(spectrum) + 1e-8)
+        residual = log_amplitude - cv2.blur(log_amplitude, (3, 3))
+        saliency = np.abs(np.fft.ifft2(np.exp(residual + 1j * np.angle(spectrum)))) ** 2
+        saliency = cv2.GaussianBlur(saliency.astype(np.float32), (9, 9), 2.5)
+        
+        # Centroid of the most salient region only
+        weights = np.clip(saliency - saliency.mean(), 0, None)
+        total = weights.sum()
+        if total <= 0:
+            return 0.5, 0.5
+        
+        ys, xs = np.mgrid[0:64, 0:64]
+        return (float((weights * xs).sum() / total + 0.5) / 64,
+                float((weights * ys).sum() / total + 0.5) / 64)
+    
+    def _smooth(self, centers: np.ndarray, shot_starts: List[int]) -> np.ndarray:
+        """Làm mượt tâm bằng EMA hai chiều trong từng shot (reset tại điểm cắt)"""
+        smoothed = centers.copy()
+        bounds = shot_starts + [len(centers)]
+        
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            # Forward then backward pass so the window doesn't lag the subject
+            for order in (range(start + 1, end), range(end - 2, start - 1, -1)):
+                step = 1 if order.step > 0 else -1
+                for i in order:
+                    smoothed[i] = self.smoothing * smoothed[i] + (1 - self.smoothing) * smoothed[i - step]
+        
+        return smoothed
+    
+    @staticmethod
+    def crop_size(frame_size: Tuple[int, int], target_size: Tuple[int, int]) -> Tuple[int, int]:
+        """Kích thước khung crop lớn nhất có cùng tỉ lệ với kích thước đích (chẵn)"""
+        w, h = frame_size
+        target_w, target_h = target_size
+        
+        if w * target_h > h * target_w:
+            crop_w, crop_h = h * target_w / target_h, h
+        else:
+            crop_w, crop_h = w, w * target_h / target_w
+        
+        return int(crop_w) // 2 * 2, int(crop_h) // 2 * 2
+    
+    def make_transform(self,
+                       plan: CropPlan,
+                       frame_size: Tuple[int, int],
+                       target_size: Tuple[int, int]) -> Tuple[Tuple[int, int], Callable]:
+        """
+        Tạo hàm crop frame theo kế hoạch
+        
+        Args:
+            plan: Kế hoạch crop từ analyze()
+            frame_size: Kích thước frame nguồn (width, height)
+            target_size: Kích thước đầu ra (width, height), chỉ dùng tỉ lệ
+        
+        Returns:
+            Tuple: (kích thước frame sau crop, hàm (frame, t) -> frame)
+        """
+        w, h = frame_size
+        crop_w, crop_h = self.crop_size(frame_size, target_size)
+        
+        def transform(frame: np.ndarray, t: float) -> np.ndarray:
+            cx, cy = plan.center_at(t)
+            x0 = int(np.clip(round(cx * w - crop_w / 2), 0, w - crop_w))
+            y0 = int(np.clip(round(cy * h - crop_h / 2), 0, h - crop_h))
+            return frame[y0:y0 + crop_h, x0:x0 + crop_w]
+        
+        return (crop_w, crop_h), transform
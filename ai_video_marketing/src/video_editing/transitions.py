@@ -0,0 +1,227 @@
+"""
+Transitions - Crossfade chỉ tính trên vùng chồng lấn giữa các clip
+"""
+import bisect
+import shutil
+import tempfile
+import logging
+import cv2
+import numpy as np
+import moviepy.editor as mp
+from moviepy.audio.fx.audio_fadein import audio_fadein
+from moviepy.audio.fx.audio_fadeout import audio_fadeout
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from pathlib import Path
+from typing import List, Optional
+
+from ffmpeg_utils import (load_keyframe_index, probe_keyframes, keyframe_before,
+                          keyframe_after, cut_segments, concat_segments, run_ffmpeg)
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class CrossfadeTimeline(mp.VideoClip):
+    """
+    Ghép các clip với crossfade thật giữa hai clip liền kề
+    
+    Clip sau bắt đầu trước khi clip trước kết thúc một khoảng `transition`.
+    Chỉ frame trong vùng chồng lấn đó mới được trộn (một addWeighted),
+    mọi frame khác được lấy thẳng từ clip nguồn, không qua compositing.
+    """
+    
+    def __init__(self,
+                 clips: List[mp.VideoClip],
+                 transition: float = 0.3,
+                 fade_in: float = 0.5,
+                 fade_out: float = 0.5):
+        """
+        Args:
+            clips: Các clip theo thứ tự phát
+            transition: Thời lượng crossfade giữa hai clip (giây)
+            fade_in: Fade từ đen ở đầu timeline
+            fade_out: Fade về đen ở cuối timeline
+        """
+        if not clips:
+            raise ValueError("No clips to join")
+        
+        self.clips = clips
+        self.transition = min(transition, min(clip.duration for clip in clips) / 2)
+        self.fade_in = fade_in
+        self.fade_out = fade_out
+        
+        # Start time of each clip on the timeline
+        self.starts = [0.0]
+        for clip in clips[:-1]:
+            self.starts.append(self.starts[-1] + clip.duration - self.transition)
+        
+        # Output size must be known before VideoClip renders the first frame
+        self.size = tuple(clips[0].size)
+        mp.VideoClip.__init__(self, make_frame=self._make_frame,
+                              duration=self.starts[-1] + clips[-1].duration)
+        self.fps = clips[0].fps
+        self.audio = self._build_audio()
+    
+    def _clip_frame(self, index: int, t: float) -> np.ndarray:
+        """Frame của clip thứ index tại thời điểm t trên timeline"""
+        clip = self.clips[index]
+        frame = clip.get_frame(min(t - self.starts[index], clip.duration - 1e-3))
+        
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame.astype(np.uint8, copy=False), self.size,
+                               interpolation=cv2.INTER_AREA)
+        return frame
+    
+    def _make_frame(self, t: float) -> np.ndarray:
+        """Frame tại t: lấy thẳng từ clip nguồn, chỉ trộn trong vùng chồng lấn"""
+        index = max(bisect.bisect_right(self.starts, t) - 1, 0)
+        frame = self._clip_frame(index, t)
+        
+        # Previous clip is still playing: blend the two frames
+        if index > 0 and t < self.starts[index] + self.transition:
+            alpha = (t - self.starts[index]) / self.transition
+            frame = cv2.addWeighted(self._clip_frame(index - 1, t), 1 - alpha, frame, alpha, 0)
+        
+        # Fade from/to black at the edges of the timeline only
+        if self.fade_in and t < self.fade_in:
+            frame = cv2.convertScaleAbs(frame, alpha=t / self.fade_in)
+        elif self.fade_out and t > self.duration - self.fade_out:
+            frame = cv2.convertScaleAbs(frame, alpha=max(self.duration - t, 0) / self.fade_out)
+        
+        return frame
+    
+    def _build_audio(self) -> Optional[mp.CompositeAudioClip]:
+        """Ghép audio với crossfade cùng khoảng chồng lấn như video"""
+        tracks = []
+        last = len(self.clips) - 1
+        
+        for i, clip in enumerate(self.clips):
+            if clip.audio is None:
+                continue
+            
+            audio = clip.audio
+            if i > 0:
+                audio = audio.fx(audio_fadein, self.transition)
+            if i < last:
+                audio = audio.fx(audio_fadeout, self.transition)
+            tracks.append(audio.set_start(self.starts[i]))
+        
+        if not tracks:
+            return None
+        return mp.CompositeAudioClip(tracks).set_duration(self.duration)
+
+def crossfade_encoded(video_paths: List[Path],
+                      output_path: Path,
+                      transition: float = 0.3,
+                      codec: str = 'libx264',
+                      preset: str = 'medium',
+                      bitrate: Optional[str] = None) -> Path:
+    """
+    Crossfade các video đã encode, chỉ encode lại vùng chuyển cảnh
+    
+    Với mỗi ranh giới, chỉ phần từ keyframe cuối trước vùng chồng lấn của
+    video trước tới keyframe đầu tiên sau vùng chồng lấn của video sau được
+    encode lại (kèm xfade). Các đoạn giữa hai keyframe còn lại được cắt bằng
+    stream copy rồi ghép bằng concat. Audio được acrossfade riêng (chỉ decode
+    audio). Các video phải cùng kích thước/fps; raise ValueError nếu không
+    đủ keyframe để ghép theo cách này.
+    
+    Args:
+        video_paths: Các video theo thứ tự phát
+        output_path: Video đầu ra
+        transition: Thời lượng crossfade (giây)
+        codec: Codec cho các đoạn chuyển cảnh (phải khớp với video nguồn)
+        preset: Preset encode
+        bitrate: Bitrate cho các đoạn chuyển cảnh
+    
+    Returns:
+        Path: Đường dẫn video đầu ra
+    """
+    video_paths = [Path(path) for path in video_paths]
+    infos = [ffmpeg_parse_infos(str(path)) for path in video_paths]
+    
+    formats = {(tuple(info['video_size']), info['video_fps']) for info in infos}
+    if len(formats) != 1:
+        raise ValueError("All videos must share resolution and fps to be joined without re-encoding")
+    fps = infos[0]['video_fps']
+    
+    keyframes = []
+    for path in video_paths:
+        index = load_keyframe_index(path)
+        keyframes.append(index['keyframes'] if index else probe_keyframes(path))
+    
+    work_dir = Path(tempfile.mkdtemp(prefix='.crossfade_', dir=output_path.parent))
+    segments = []
+    copy_start = 0.0
+    
+    try:
+        for i, path in enumerate(video_paths):
+            duration = infos[i]['duration']
+            is_last = i == len(video_paths) - 1
+            
+            # Copied spans run keyframe to keyframe so they can be cut exactly
+            if is_last:
+                copy_end = duration
+            else:
+                copy_end = max(keyframe_before(keyframes[i], duration - transition), copy_start)
+                if copy_end > duration - transition:
+                    raise ValueError(f"{path.name} is too short to crossfade without re-encoding")
+            
+            # Untouched span of this video, copied as-is
+            if copy_end - copy_start > 1 / fps:
+                segment = work_dir / f"{len(segments):03d}_copy.mp4"
+                cut_segments(path, [(copy_start, copy_end, segment, False)],
+                             fps=None if is_last else fps)
+                segments.append(segment)
+            
+            if is_last:
+                break
+            
+            # Re-encode from that keyframe through the overlap to the next video's next keyframe
+            next_path = video_paths[i + 1]
+            next_duration = infos[i + 1]['duration']
+            head_end = keyframe_after(keyframes[i + 1], transition) or next_duration
+            head_end = min(head_end, next_duration)
+            
+            segment = work_dir / f"{len(segments):03d}_xfade.mp4"
+            args = [
+                "-ss", f"{copy_end:.3f}", "-i", str(path),
+                "-t", f"{head_end:.3f}", "-i", str(next_path),
+                "-filter_complex",
+                f"[0:v]settb=AVTB,fps={fps}[a];[1:v]settb=AVTB,fps={fps}[b];"
+                f"[a][b]xfade=transition=fade:duration={transition:.3f}"
+                f":offset={duration - transition - copy_end:.3f},format=yuv420p[v]",
+                "-map", "[v]", "-an", "-c:v", codec, "-preset", preset, "-r", str(fps)
+            ]
+            if bitrate:
+                args += ["-b:v", bitrate]
+            run_ffmpeg(args + [str(segment)])
+            segments.append(segment)
+            
+            copy_start = head_end
+        
+        # Audio is cheap to decode, crossfade it in one pass
+        audio_path = None
+        if all(info.get('audio_found') for info in infos):
+            audio_path = work_dir / "audio.m4a"
+            if len(video_paths) == 1:
+                args = ["-i", str(video_paths[0]), "-vn", "-c:a", "copy"]
+            else:
+                chain = []
+                label = "[0:a]"
+                for i in range(1, len(video_paths)):
+                    output_label = "[a]" if i == len(video_paths) - 1 else f"[a{i}]"
+                    chain.append(f"{label}[{i}:a]acrossfade=d={transition:.3f}{output_label}")
+                    label = output_label
+                args = []
+                for path in video_paths:
+                    args += ["-i", str(path)]
+                args += ["-filter_complex", ";".join(chain), "-map", "[a]", "-c:a", "aac"]
+            run_ffmpeg(args + [str(audio_path)])
+        
+        concat_segments(segments, output_path, audio_path=audio_path)
+    
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    return output_path
@@ -4,15 +4,30 @@ Video Editor - Lắp ghép và chỉnh sửa video thành phẩm
 import moviepy.editor as mp
 from moviepy.video.fx import resize, speedx, fadein, fadeout
 from moviepy.audio.fx import volumex
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 import cv2
 import numpy as np
 from PIL import Image
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import json
 from datetime import datetime
 import os
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from ffmpeg_utils import (load_keyframe_index, probe_keyframes, keyframe_before,
+                          keyframe_after, cut_segments, concat_segments, concat_reencode,
+                          streams_match, run_ffmpeg)
+from .frame_effects import FrameGrader, apply_vignette
+from .smart_crop import SmartCropper
+from .transitions import CrossfadeTimeline, crossfade_encoded
+from .bumper_cache import BumperCache
+from .overlays import BrandingOverlay, render_text_tile, load_logo_tile
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -21,8 +36,18 @@ logger = logging.getLogger(__name__)
 class VideoEditor:
     """Chỉnh sửa và lắp ghép video thành phẩm"""
     
+    # Platform export targets (output size, video bitrate)
+    PLATFORM_EXPORTS = {
+        'youtube': {'size': (1920, 1080), 'bitrate': '5000k'},    # 1080p
+        'tiktok': {'size': (1080, 1920), 'bitrate': '3000k'},     # 9:16 aspect ratio
+        'instagram': {'size': (1080, 1080), 'bitrate': '4000k'}   # 1:1 aspect ratio
+    }
+    
+    OUTRO_TEXT = "Thank you for watching!\nDon't forget to like and subscribe!"
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        self.bumper_cache = BumperCache(Path(config.get('cache_dir', 'data/cache')) / "bumpers")
         
     def create_final_video(self, 
                          video_clips: List[str],
@@ -53,20 +78,15 @@ class VideoEditor:
         if not clips:
             raise ValueError("No valid video clips found")
         
-        # Apply transitions between clips
-        clips_with_transitions = self._add_transitions(clips)
-        
-        # Combine all clips
-        final_video = mp.concatenate_videoclips(clips_with_transitions, method="compose")
+        # Join clips with crossfades (only the overlap frames are blended)
+        joined_video = self._add_transitions(clips)
         
         # Apply final effects
-        final_video = self._apply_final_effects(final_video)
+        final_video = self._apply_final_effects(joined_video)
         
-        # Add intro/outro
-        final_video = self._add_intro_outro(final_video, script)
-        
-        # Optimize for different platforms
-        optimized_videos = self._optimize_for_platforms(final_video, output_path)
+        # Optimize for different platforms (cached intro/outro bumpers are joined per platform)
+        optimized_videos = self._optimize_for_platforms(final_video, output_path, script,
+                                                        analysis_clip=joined_video)
         
         # Clean up
         for clip in clips:
@@ -80,35 +100,75 @@ class VideoEditor:
             "created_at": datetime.now().isoformat()
         }
     
-    def _add_transitions(self, clips: List[mp.VideoFileClip]) -> List[mp.VideoFileClip]:
-        """Thêm transition giữa các clip"""
-        if len(clips) <= 1:
-            return clips
+    def _add_transitions(self, clips: List[mp.VideoFileClip]) -> mp.VideoClip:
+        """Ghép các clip với crossfade, fade in/out ở đầu và cuối timeline (một clip thì giữ nguyên)"""
+        if len(clips) == 1:
+            return clips[0]
+        
+        return CrossfadeTimeline(
+            clips,
+            transition=self.config.get('transition_duration', 0.3),
+            fade_in=0.5,
+            fade_out=0.5
+        )
+    
+    def crossfade_encoded_videos(self,
+                                 video_paths: List[str],
+                                 output_path: Path) -> str:
+        """
+        Ghép các video đã encode với crossfade mà không encode lại toàn bộ
         
-        clips_with_transitions = []
+        Chỉ các GOP chứa vùng chuyển cảnh được encode lại, các đoạn còn lại
+        được stream copy. Nếu video không đủ keyframe (hoặc khác kích thước/
+        fps) thì ghép bằng CrossfadeTimeline và encode lại toàn bộ.
         
-        for i, clip in enumerate(clips):
-            # Add fade in for first clip
-            if i == 0:
-                clip = clip.fadein(0.5)
-            
-            # Add fade out for last clip
-            if i == len(clips) - 1:
-                clip = clip.fadeout(0.5)
-            
-            # Add crossfade for middle clips
-            else:
-                clip = clip.fadeout(0.3)
+        Args:
+            video_paths: Các video cùng kích thước/fps theo thứ tự phát
+            output_path: Video đầu ra
             
-            clips_with_transitions.append(clip)
+        Returns:
+            str: Đường dẫn video đầu ra
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        transition = self.config.get('transition_duration', 0.3)
         
-        return clips_with_transitions
+        try:
+            crossfade_encoded(
+                [Path(path) for path in video_paths],
+                output_path,
+                transition=transition,
+                codec=self.config.get('codec', 'libx264'),
+                preset=self.config.get('preset', 'medium'),
+                bitrate=self.config.get('bitrate')
+            )
+        except ValueError as e:
+            logger.warning(f"Falling back to a full re-encode: {e}")
+            clips = [mp.VideoFileClip(str(path)) for path in video_paths]
+            timeline = CrossfadeTimeline(clips, transition=transition, fade_in=0, fade_out=0)
+            timeline.write_videofile(
+                str(output_path),
+                fps=timeline.fps,
+                codec=self.config.get('codec', 'libx264'),
+                audio_codec=self.config.get('audio_codec', 'aac'),
+                preset=self.config.get('preset', 'medium'),
+                bitrate=self.config.get('bitrate'),
+                logger=None
+            )
+            for clip in clips:
+                clip.close()
+        
+        return str(output_path)
     
     def _apply_final_effects(self, video: mp.VideoFileClip) -> mp.VideoFileClip:
         """Áp dụng hiệu ứng cuối cùng"""
         try:
             # Ensure consistent resolution
             target_resolution = self.config.get('default_resolution', (1920, 1080))
+            
+            if self.config.get('fused_effects', True):
+                # Whole grading chain in a single pass per frame
+                return video.fl_image(FrameGrader(target_resolution))
+            
             video = video.resize(target_resolution)
             
             # Apply color correction
@@ -132,23 +192,7 @@ class VideoEditor:
             # This is a simplified color correction
             # In a real implementation, you'd use more sophisticated color grading
             
-            def color_correct(get_frame, t):
-                frame = get_frame(t)
-                # Convert to float for processing
-                frame = frame.astype(np.float32) / 255.0
-                
-                # Increase contrast slightly
-                frame = np.clip((frame - 0.5) * 1.1 + 0.5, 0, 1)
-                
-                # Increase saturation slightly
-                hsv = cv2.cvtColor(frame, cv2.COLOR_RGB2HSV)
-                hsv[:, :, 1] = hsv[:, :, 1] * 1.1
-                frame = cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
-                
-                # Convert back to uint8
-                return (frame * 255).astype(np.uint8)
-            
-            return video.fl(color_correct)
+            return video.fl_image(self._color_correct_frame)
             
         except Exception as e:
             logger.error(f"Error applying color correction: {e}")
@@ -157,21 +201,7 @@ class VideoEditor:
     def _apply_sharpening(self, video: mp.VideoFileClip) -> mp.VideoFileClip:
         """Áp dụng sharpening"""
         try:
-            def sharpen(get_frame, t):
-                frame = get_frame(t)
-                
-                # Create sharpening kernel
-                kernel = np.array([[-1,-1,-1],
-                                 [-1, 9,-1],
-                                 [-1,-1,-1]])
-                
-                # Apply sharpening
-                sharpened = cv2.filter2D(frame, -1, kernel)
-                
-                # Blend with original (50% sharpened, 50% original)
-                return cv2.addWeighted(frame, 0.5, sharpened, 0.5, 0)
-            
-            return video.fl(sharpen)
+            return video.fl_image(self._sharpen_frame)
             
         except Exception as e:
             logger.error(f"Error applying sharpening: {e}")
@@ -180,79 +210,192 @@ class VideoEditor:
     def _add_vignette(self, video: mp.VideoFileClip) -> mp.VideoFileClip:
         """Thêm vignette effect"""
         try:
-            def add_vignette(get_frame, t):
-                frame = get_frame(t)
-                h, w = frame.shape[:2]
-                
-                # Create vignette mask
-                y, x = np.ogrid[:h, :w]
-                center_x, center_y = w // 2, h // 2
-                
-                # Calculate distance from center
-                mask = np.sqrt((x - center_x)**2 + (y - center_y)**2)
-                mask = mask / mask.max()
-                
-                # Apply vignette (subtle effect)
-                vignette_strength = 0.3
-                vignette = 1 - mask * vignette_strength
-                
-                # Apply to each color channel
-                for i in range(3):
-                    frame[:, :, i] = frame[:, :, i] * vignette
-                
-                return frame.astype(np.uint8)
-            
-            return video.fl(add_vignette)
+            return video.fl_image(self._vignette_frame)
             
         except Exception as e:
             logger.error(f"Error adding vignette: {e}")
             return video
     
-    def _add_intro_outro(self, 
-                        video: mp.VideoFileClip,
-                        script: Dict[str, Any]) -> mp.VideoFileClip:
-        """Thêm intro và outro"""
+    def _color_correct_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Color correction cho một frame"""
+        # This is a simplified color correction
+        # In a real implementation, you'd use more sophisticated color grading
+        
+        # Convert to float for processing
+        frame = frame.astype(np.float32) / 255.0
+        
+        # Increase contrast slightly
+        frame = np.clip((frame - 0.5) * 1.1 + 0.5, 0, 1)
+        
+        # Increase saturation slightly
+        hsv = cv2.cvtColor(frame, cv2.COLOR_RGB2HSV)
+        hsv[:, :, 1] = hsv[:, :, 1] * 1.1
+        frame = cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
+        
+        # Convert back to uint8
+        return (frame * 255).astype(np.uint8)
+    
+    def _sharpen_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Sharpening cho một frame"""
+        # Create sharpening kernel
+        kernel = np.array([[-1,-1,-1],
+                         [-1, 9,-1],
+                         [-1,-1,-1]])
+        
+        # Apply sharpening
+        sharpened = cv2.filter2D(frame, -1, kernel)
+        
+        # Blend with original (50% sharpened, 50% original)
+        return cv2.addWeighted(frame, 0.5, sharpened, 0.5, 0)
+    
+    def _vignette_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Vignette cho một frame"""
+        # Mask is cached per (h, w, strength) and applied in place (subtle effect)
+        return apply_vignette(frame.astype(np.uint8, copy=False), strength=0.3)
+    
+    def benchmark_effects(self,
+                          resolution: Optional[Tuple[int, int]] = None,
+                          num_frames: int = 30) -> Dict[str, float]:
+        """
+        Đo tốc độ (fps) từng hiệu ứng riêng lẻ và kernel gộp
+        
+        Args:
+            resolution: Độ phân giải frame thử (mặc định theo config)
+            num_frames: Số frame đo cho mỗi hiệu ứng
+            
+        Returns:
+            Dict[str, float]: fps của từng hiệu ứng, cả chuỗi cũ và kernel gộp
+        """
+        width, height = resolution or self.config.get('default_resolution', (1920, 1080))
+        
+        # Smooth synthetic content so sharpening/saturation do real work
+        rng = np.random.default_rng(0)
+        seed_frame = rng.integers(0, 256, (max(1, height // 20), max(1, width // 20), 3), dtype=np.uint8)
+        frame = cv2.resize(seed_frame, (width, height), interpolation=cv2.INTER_LINEAR)
+        
+        def measure(effect) -> float:
+            started_at = time.perf_counter()
+            for _ in range(num_frames):
+                effect(frame.copy())
+            return num_frames / (time.perf_counter() - started_at)
+        
+        grader = FrameGrader((width, height))
+        results = {
+            "color_correction": measure(self._color_correct_frame),
+            "sharpening": measure(self._sharpen_frame),
+            "vignette": measure(self._vignette_frame),
+            "chained": measure(
+                lambda f: self._vignette_frame(self._sharpen_frame(self._color_correct_frame(f)))
+            ),
+            "fused": measure(grader)
+        }
+        
+        logger.info("Effect benchmark at %dx%d: %s", width, height,
+                    ", ".join(f"{name} {fps:.1f} fps" for name, fps in results.items()))
+        return results
+    
+    def _get_bumpers(self,
+                     script: Dict[str, Any],
+                     platform: str,
+                     size: Tuple[int, int],
+                     bitrate: str,
+                     audio_channels: int) -> Tuple[Optional[Path], Optional[Path]]:
+        """Lấy intro/outro đã encode cho platform từ cache (None nếu không tạo được)"""
+        fps = self.config.get('fps', 30)
+        bumpers = []
+        
+        for kind, text in (('intro', self._intro_text(script)), ('outro', self.OUTRO_TEXT)):
+            fields = {
+                'kind': kind,
+                'text': text,
+                'font': 'Arial-Bold',
+                'size': list(size),
+                'platform': platform,
+                'fps': fps,
+                'codec': self.config.get('codec', 'libx264'),
+                'preset': self.config.get('preset', 'medium'),
+                'bitrate': bitrate,
+                'audio_codec': self.config.get('audio_codec', 'aac'),
+                'audio_channels': audio_channels
+            }
+            
+            def render(path: Path, kind=kind):
+                self._render_bumper(kind, script, size, fps, bitrate, audio_channels, path)
+            
+            try:
+                bumpers.append(self.bumper_cache.get_or_render(fields, render))
+            except Exception as e:
+                logger.error(f"Error creating {kind} bumper: {e}")
+                bumpers.append(None)
+        
+        return bumpers[0], bumpers[1]
+    
+    def _render_bumper(self,
+                       kind: str,
+                       script: Dict[str, Any],
+                       size: Tuple[int, int],
+                       fps: float,
+                       bitrate: str,
+                       audio_channels: int,
+                       output_path: Path):
+        """Encode bumper với cùng thiết lập như video chính để ghép bằng stream copy"""
+        if kind == 'intro':
+            clip = self._create_intro_clip(script, size)
+        else:
+            clip = self._create_outro_clip(script, size)
+        if clip is None:
+            raise ValueError(f"Could not create {kind} clip")
+        
+        video_path = output_path.with_name(f"{output_path.stem}.video.mp4")
         try:
-            # Create intro clip
-            intro_clip = self._create_intro_clip(script)
-            
-            # Create outro clip
-            outro_clip = self._create_outro_clip(script)
-            
-            # Combine intro + main video + outro
-            if intro_clip and outro_clip:
-                final_video = mp.concatenate_videoclips([intro_clip, video, outro_clip])
-                intro_clip.close()
-                outro_clip.close()
-                return final_video
-            elif intro_clip:
-                final_video = mp.concatenate_videoclips([intro_clip, video])
-                intro_clip.close()
-                return final_video
-            elif outro_clip:
-                final_video = mp.concatenate_videoclips([video, outro_clip])
-                outro_clip.close()
-                return final_video
-            else:
-                return video
-                
-        except Exception as e:
-            logger.error(f"Error adding intro/outro: {e}")
-            return video
+            clip.write_videofile(
+                str(video_path),
+                fps=fps,
+                codec=self.config.get('codec', 'libx264'),
+                preset=self.config.get('preset', 'medium'),
+                bitrate=bitrate,
+                audio=False,
+                threads=self.config.get('encoder_threads'),
+                logger=None
+            )
+            clip.close()
+            
+            if not audio_channels:
+                os.replace(video_path, output_path)
+                return
+            
+            # Silent track matching the main audio layout, so concat stays stream copy
+            layout = 'stereo' if audio_channels == 2 else 'mono'
+            run_ffmpeg([
+                "-i", str(video_path),
+                "-f", "lavfi", "-i", f"anullsrc=r=44100:cl={layout}",
+                "-map", "0:v", "-map", "1:a", "-shortest",
+                "-c:v", "copy",
+                "-c:a", self.config.get('audio_codec', 'aac'),
+                "-b:a", self.config.get('audio_bitrate', '128k'),
+                str(output_path)
+            ])
+        finally:
+            video_path.unlink(missing_ok=True)
     
-    def _create_intro_clip(self, script: Dict[str, Any]) -> Optional[mp.VideoFileClip]:
+    def _intro_text(self, script: Dict[str, Any]) -> str:
+        """Text của intro theo thương hiệu trong kịch bản"""
+        brand_name = script.get('script_info', {}).get('target_product', 'Our Brand')
+        return f"Welcome to {brand_name}"
+    
+    def _create_intro_clip(self,
+                           script: Dict[str, Any],
+                           size: Tuple[int, int] = (1920, 1080)) -> Optional[mp.VideoFileClip]:
         """Tạo intro clip"""
         try:
-            # Get brand info from script
-            brand_name = script.get('script_info', {}).get('target_product', 'Our Brand')
-            
             # Create intro text
-            intro_text = f"Welcome to {brand_name}"
+            intro_text = self._intro_text(script)
+            scale = min(size) / 1080
             
             # Create text clip
             intro_clip = mp.TextClip(
                 intro_text,
-                fontsize=60,
+                fontsize=int(60 * scale),
                 color='white',
                 stroke_color='black',
                 stroke_width=2,
@@ -261,7 +404,7 @@ class VideoEditor:
             
             # Add background
             intro_clip = intro_clip.on_color(
-                size=(1920, 1080),
+                size=tuple(size),
                 color=(0, 0, 0),
                 pos='center'
             )
@@ -275,27 +418,28 @@ class VideoEditor:
             logger.error(f"Error creating intro clip: {e}")
             return None
     
-    def _create_outro_clip(self, script: Dict[str, Any]) -> Optional[mp.VideoFileClip]:
+    def _create_outro_clip(self,
+                           script: Dict[str, Any],
+                           size: Tuple[int, int] = (1920, 1080)) -> Optional[mp.VideoFileClip]:
         """Tạo outro clip"""
         try:
-            # Create outro text
-            outro_text = "Thank you for watching!\nDon't forget to like and subscribe!"
+            scale = min(size) / 1080
             
             # Create text clip
             outro_clip = mp.TextClip(
-                outro_text,
-                fontsize=50,
+                self.OUTRO_TEXT,
+                fontsize=int(50 * scale),
                 color='white',
                 stroke_color='black',
                 stroke_width=2,
                 font='Arial-Bold',
                 method='caption',
-                size=(1800, None)
+                size=(size[0] - int(120 * scale), None)
             ).set_duration(5)
             
             # Add background
             outro_clip = outro_clip.on_color(
-                size=(1920, 1080),
+                size=tuple(size),
                 color=(0, 0, 0),
                 pos='center'
             )
@@ -311,111 +455,299 @@ class VideoEditor:
     
     def _optimize_for_platforms(self, 
                               video: mp.VideoFileClip,
-                              base_output_path: Path) -> Dict[str, str]:
-        """Tối ưu video cho các platform khác nhau"""
+                              base_output_path: Path,
+                              script: Optional[Dict[str, Any]] = None,
+                              analysis_clip: Optional[mp.VideoClip] = None) -> Dict[str, str]:
+        """
+        Tối ưu video cho các platform khác nhau
+        
+        Frame master (đã qua toàn bộ effect) chỉ được tính một lần rồi đẩy
+        song song tới một tiến trình encoder cho mỗi platform, ffmpeg tự
+        scale theo kích thước đích. Audio cũng chỉ encode một lần. Với
+        platform khác tỉ lệ master (dọc/vuông), frame được crop theo chủ thể
+        (SmartCropper) trước khi scale thay vì bị kéo giãn. Intro/outro lấy
+        từ BumperCache (đã encode cùng thiết lập) và được ghép bằng stream copy
+        khi thông số stream khớp với phần thân, nếu không thì encode lại phần ghép.
+        
+        Args:
+            video: Video master
+            base_output_path: Đường dẫn gốc để đặt tên file theo platform
+            script: Kịch bản (để tạo intro/outro), None để bỏ qua bumper
+            analysis_clip: Clip chưa grade, cùng timeline với video, để
+                SmartCropper phân tích mà không chạy chuỗi hiệu ứng (mặc định: video)
+            
+        Returns:
+            Dict[str, str]: Đường dẫn video theo platform
+        """
+        fps = self.config.get('fps', 30)
+        base_output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Encode the master audio once, every encoder stream-copies it
+        audio_path = None
+        if video.audio is not None:
+            audio_path = base_output_path.parent / f"{base_output_path.stem}_master_audio.m4a"
+            video.audio.write_audiofile(
+                str(audio_path),
+                fps=44100,
+                codec=self.config.get('audio_codec', 'aac'),
+                bitrate=self.config.get('audio_bitrate', '128k'),
+                logger=None
+            )
+        
+        audio_channels = video.audio.nchannels if video.audio is not None else 0
+        
         optimized_videos = {}
+        pieces = {}
+        writers = []
+        crop_plan = None
+        cropper = SmartCropper(sample_fps=self.config.get('smart_crop_sample_fps', 2.0))
         
-        # YouTube (1080p)
-        youtube_path = base_output_path.parent / f"{base_output_path.stem}_youtube.mp4"
-        youtube_video = video.resize((1920, 1080))
-        youtube_video.write_videofile(
-            str(youtube_path),
-            fps=30,
-            codec='libx264',
-            audio_codec='aac',
-            bitrate='5000k'
-        )
-        optimized_videos['youtube'] = str(youtube_path)
-        youtube_video.close()
-        
-        # TikTok (9:16 aspect ratio)
-        tiktok_path = base_output_path.parent / f"{base_output_path.stem}_tiktok.mp4"
-        tiktok_video = video.resize((1080, 1920))
-        tiktok_video.write_videofile(
-            str(tiktok_path),
-            fps=30,
-            codec='libx264',
-            audio_codec='aac',
-            bitrate='3000k'
-        )
-        optimized_videos['tiktok'] = str(tiktok_path)
-        tiktok_video.close()
-        
-        # Instagram (1:1 aspect ratio)
-        instagram_path = base_output_path.parent / f"{base_output_path.stem}_instagram.mp4"
-        instagram_video = video.resize((1080, 1080))
-        instagram_video.write_videofile(
-            str(instagram_path),
-            fps=30,
-            codec='libx264',
-            audio_codec='aac',
-            bitrate='4000k'
-        )
-        optimized_videos['instagram'] = str(instagram_path)
-        instagram_video.close()
+        try:
+            for platform, export in self.PLATFORM_EXPORTS.items():
+                output_path = base_output_path.parent / f"{base_output_path.stem}_{platform}.mp4"
+                width, height = export['size']
+                
+                # Reframe instead of stretching when the aspect ratio differs
+                input_size, transform = tuple(video.size), None
+                if (self.config.get('smart_crop', True)
+                        and cropper.crop_size(video.size, export['size']) != input_size):
+                    if crop_plan is None:
+                        crop_plan = cropper.analyze(analysis_clip or video)
+                    input_size, transform = cropper.make_transform(crop_plan, video.size, export['size'])
+                
+                # Body goes to a temp file when bumpers are joined around it
+                intro, outro = (None, None)
+                if script is not None:
+                    intro, outro = self._get_bumpers(
+                        script, platform, export['size'], export['bitrate'], audio_channels
+                    )
+                body_path = output_path
+                if intro or outro:
+                    body_path = output_path.with_name(f".{output_path.stem}.body.mp4")
+                    pieces[platform] = ([p for p in (intro, body_path, outro) if p], body_path, output_path)
+                
+                writer = FFMPEG_VideoWriter(
+                    str(body_path),
+                    input_size,
+                    fps,
+                    codec=self.config.get('codec', 'libx264'),
+                    audiofile=str(audio_path) if audio_path else None,
+                    preset=self.config.get('preset', 'medium'),
+                    bitrate=export['bitrate'],
+                    threads=self.config.get('encoder_threads'),
+                    ffmpeg_params=['-vf', f'scale={width}:{height}']
+                )
+                writers.append((writer, transform))
+                optimized_videos[platform] = str(output_path)
+            
+            self._fan_out_frames(video, writers, fps)
+            
+        finally:
+            for writer, _ in writers:
+                writer.close()
+            if audio_path:
+                audio_path.unlink(missing_ok=True)
+        
+        # Bumpers are encoded with the body's settings, but moviepy and the body
+        # writer may still differ (level, SPS/PPS, audio layout): check before copying
+        for platform, (segment_paths, body_path, output_path) in pieces.items():
+            try:
+                if streams_match(segment_paths):
+                    concat_segments(segment_paths, output_path)
+                else:
+                    logger.warning(f"Bumper streams differ from the {platform} body, re-encoding the join")
+                    export = self.PLATFORM_EXPORTS[platform]
+                    concat_reencode(segment_paths, output_path, export['size'], fps, [
+                        "-c:v", self.config.get('codec', 'libx264'),
+                        "-preset", self.config.get('preset', 'medium'),
+                        "-b:v", export['bitrate'],
+                        "-pix_fmt", "yuv420p",
+                        "-c:a", self.config.get('audio_codec', 'aac'),
+                        "-b:a", self.config.get('audio_bitrate', '128k')
+                    ], with_audio=audio_path is not None)
+            finally:
+                body_path.unlink(missing_ok=True)
         
         return optimized_videos
     
+    def _fan_out_frames(self,
+                        video: mp.VideoClip,
+                        writers: List[Tuple[FFMPEG_VideoWriter, Any]],
+                        fps: float):
+        """Render frame master một lần và gửi tới tất cả encoder song song"""
+        frame_queues = [queue.Queue(maxsize=8) for _ in writers]
+        errors = []
+        
+        def encode(writer: FFMPEG_VideoWriter, transform, frames: queue.Queue):
+            try:
+                while True:
+                    item = frames.get()
+                    if item is None:
+                        break
+                    t, frame = item
+                    if transform is not None:
+                        frame = transform(frame, t)
+                    writer.write_frame(frame)
+            except Exception as e:
+                errors.append(e)
+                # Keep draining so the producer never blocks on a dead encoder
+                while frames.get() is not None:
+                    pass
+        
+        threads = [
+            threading.Thread(target=encode, args=(writer, transform, frames), daemon=True)
+            for (writer, transform), frames in zip(writers, frame_queues)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        try:
+            for t, frame in video.iter_frames(fps=fps, dtype='uint8', with_times=True):
+                if errors:
+                    break
+                for frames in frame_queues:
+                    frames.put((t, frame))
+        finally:
+            for frames in frame_queues:
+                frames.put(None)
+            for thread in threads:
+                thread.join()
+        
+        if errors:
+            raise errors[0]
+    
     def create_short_clips(self, 
                          main_video_path: str,
                          script: Dict[str, Any],
-                         output_dir: Path) -> List[Dict[str, Any]]:
+                         output_dir: Path,
+                         branding: bool = True) -> List[Dict[str, Any]]:
         """
         Tạo các clip ngắn từ video chính
         
+        Các đoạn được cắt tại keyframe bằng stream copy, tất cả trong một lần
+        đọc file nguồn. Khi cần branding, chỉ phần đầu clip (tới keyframe đầu
+        tiên sau short_clip_branding_seconds) được encode lại kèm overlay,
+        phần còn lại và audio giữ nguyên bitstream gốc.
+        
         Args:
             main_video_path: Đường dẫn video chính
             script: Kịch bản
             output_dir: Thư mục lưu clips
+            branding: Thêm title/logo ở đầu mỗi clip
             
         Returns:
             List[Dict[str, Any]]: Thông tin các clip ngắn
         """
         logger.info("Creating short clips from main video...")
         
-        if not Path(main_video_path).exists():
+        main_path = Path(main_video_path)
+        if not main_path.exists():
             raise FileNotFoundError(f"Main video not found: {main_video_path}")
         
-        # Load main video
-        main_video = mp.VideoFileClip(main_video_path)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Container metadata only, no frames are decoded here
+        infos = ffmpeg_parse_infos(str(main_path))
+        duration, fps = infos['duration'], infos.get('video_fps', 30)
+        
+        # Keyframes come from the producer's sidecar index, probing is the fallback
+        keyframe_index = load_keyframe_index(main_path)
+        if keyframe_index:
+            keyframes = keyframe_index['keyframes']
+        else:
+            keyframes = probe_keyframes(main_path) or [0.0]
+        branding_seconds = self.config.get('short_clip_branding_seconds', 3.0)
         
         # Extract key moments based on script
-        key_moments = self._extract_key_moments(script, main_video.duration)
+        key_moments = self._extract_key_moments(script, duration)
         
-        short_clips = []
+        plans = []
+        cuts = []
         
         for i, moment in enumerate(key_moments):
-            # Create short clip
-            start_time = moment['start']
-            end_time = moment['end']
-            
-            short_clip = main_video.subclip(start_time, end_time)
-            
-            # Add branding
-            short_clip = self._add_branding(short_clip, moment['title'])
-            
-            # Save clip
-            clip_path = output_dir / f"short_clip_{i+1:03d}.mp4"
-            short_clip.write_videofile(
-                str(clip_path),
-                fps=30,
-                codec='libx264',
-                audio_codec='aac'
-            )
+            # Snap the start back to a keyframe so the copied stream is decodable
+            start_time = keyframe_before(keyframes, moment['start'])
+            end_time = min(moment['end'], duration)
+            if end_time <= start_time:
+                continue
             
-            short_clips.append({
-                'path': str(clip_path),
+            plan = {
                 'title': moment['title'],
-                'duration': end_time - start_time,
-                'start_time': start_time,
-                'end_time': end_time
-            })
-            
-            short_clip.close()
-        
-        main_video.close()
+                'start': start_time,
+                'end': end_time,
+                'path': output_dir / f"short_clip_{i+1:03d}.mp4"
+            }
+            
+            if branding:
+                # Only the GOP-aligned head gets re-encoded with the overlay
+                head_end = keyframe_after(keyframes, start_time + branding_seconds)
+                plan['head_end'] = head_end if head_end is not None and head_end < end_time else end_time
+                plan['source'] = output_dir / f".short_clip_{i+1:03d}.source.mp4"
+                cuts.append((start_time, end_time, plan['source'], True))
+                
+                if plan['head_end'] < end_time:
+                    plan['tail'] = output_dir / f".short_clip_{i+1:03d}.tail.mp4"
+                    cuts.append((plan['head_end'], end_time, plan['tail'], False))
+            else:
+                cuts.append((start_time, end_time, plan['path'], True))
+            
+            plans.append(plan)
+        
+        # One demux pass for every clip
+        cut_segments(main_path, cuts)
+        
+        if branding and plans:
+            with ThreadPoolExecutor(max_workers=self.config.get('batch_workers', 4)) as executor:
+                list(executor.map(lambda plan: self._brand_short_clip(plan, fps), plans))
+        
+        return [
+            {
+                'path': str(plan['path']),
+                'title': plan['title'],
+                'duration': plan['end'] - plan['start'],
+                'start_time': plan['start'],
+                'end_time': plan['end']
+            }
+            for plan in plans
+        ]
+    
+    def _brand_short_clip(self, plan: Dict[str, Any], fps: float):
+        """Encode lại phần đầu clip với branding rồi ghép với phần đuôi đã stream copy"""
+        source_path = plan['source']
+        head_path = source_path.with_name(source_path.name.replace('.source.', '.head.'))
+        encode_params = {
+            'fps': fps,
+            'codec': self.config.get('codec', 'libx264'),
+            'preset': self.config.get('preset', 'medium'),
+            'bitrate': self.config.get('bitrate'),
+            'logger': None
+        }
         
-        return short_clips
+        try:
+            if 'tail' not in plan:
+                # No keyframe after the overlay window, re-encode the whole clip
+                clip = mp.VideoFileClip(str(source_path))
+                branded = self._add_branding(clip, plan['title'])
+                branded.write_videofile(
+                    str(plan['path']),
+                    audio_codec=self.config.get('audio_codec', 'aac'),
+                    **encode_params
+                )
+                clip.close()
+                return
+            
+            clip = mp.VideoFileClip(str(source_path), audio=False)
+            head = self._add_branding(clip.subclip(0, plan['head_end'] - plan['start']), plan['title'])
+            head.write_videofile(str(head_path), audio=False, **encode_params)
+            clip.close()
+            
+            # Audio is copied untouched from the source cut
+            concat_segments([head_path, plan['tail']], plan['path'], audio_path=source_path)
+            
+        finally:
+            for path in (source_path, head_path, plan.get('tail')):
+                if path:
+                    path.unlink(missing_ok=True)
     
     def _extract_key_moments(self, 
                            script: Dict[str, Any],
@@ -476,33 +808,23 @@ class VideoEditor:
             return 10.0
     
     def _add_branding(self, clip: mp.VideoFileClip, title: str) -> mp.VideoFileClip:
-        """Thêm branding cho clip"""
+        """
+        Thêm branding cho clip
+        
+        Title và logo được rasterize một lần thành tile RGBA premultiplied
+        (logo cache giữa các clip), mỗi frame chỉ blend vùng bao của tile
+        nên chi phí tỉ lệ với diện tích overlay thay vì diện tích frame.
+        """
         try:
-            # Create title overlay
-            title_clip = mp.TextClip(
-                title,
-                fontsize=40,
-                color='white',
-                stroke_color='black',
-                stroke_width=2,
-                font='Arial-Bold'
-            ).set_duration(clip.duration)
-            
-            # Position at top
-            title_clip = title_clip.set_position(('center', 'top')).set_margin(20)
+            # Title at the top center, 20px margin
+            placements = [(render_text_tile(title, fontsize=40), ('center', 20))]
             
-            # Add logo (if available)
-            logo_clip = None
-            logo_path = Path("data/logo.png")
-            if logo_path.exists():
-                logo_clip = mp.ImageClip(str(logo_path)).set_duration(clip.duration)
-                logo_clip = logo_clip.resize(height=60).set_position(('left', 'top')).set_margin(20)
+            # Add logo (if available) at the top left
+            logo_tile = load_logo_tile(Path("data/logo.png"), height=60)
+            if logo_tile:
+                placements.append((logo_tile, (20, 20)))
             
-            # Combine clips
-            if logo_clip:
-                return mp.CompositeVideoClip([clip, title_clip, logo_clip])
-            else:
-                return mp.CompositeVideoClip([clip, title_clip])
+            return clip.fl_image(BrandingOverlay(placements))
                 
         except Exception as e:
             logger.error(f"Error adding branding: {e}")
@@ -511,43 +833,133 @@ class VideoEditor:
     def batch_edit_videos(self, 
                          video_paths: List[str],
                          scripts: List[Dict[str, Any]],
-                         output_dir: Path) -> List[Dict[str, Any]]:
+                         output_dir: Path,
+                         progress_callback: Optional[Callable[[int, int, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
         """
         Chỉnh sửa hàng loạt video
         
+        Mỗi video được chỉnh sửa trong một process riêng của pool. Số worker
+        tính theo số core chia cho số thread encoder mà mỗi video dùng (một
+        encoder cho mỗi platform), và ffmpeg trong worker bị giới hạn đúng số
+        thread đó nên các worker không tranh core của nhau. Bumper dùng chung
+        được render trước trong process cha, worker chỉ đọc từ cache. Lỗi của
+        một video không làm dừng các video khác.
+        
         Args:
             video_paths: Danh sách đường dẫn video
             scripts: Danh sách kịch bản
             output_dir: Thư mục lưu
+            progress_callback: Gọi với (số video xong, tổng số, kết quả) sau mỗi video
             
         Returns:
-            List[Dict[str, Any]]: Thông tin video đã chỉnh sửa
+            List[Dict[str, Any]]: Thông tin video đã chỉnh sửa (theo thứ tự đầu vào)
         """
-        results = []
-        
-        for i, (video_path, script) in enumerate(zip(video_paths, scripts)):
-            logger.info(f"Editing video {i+1}/{len(video_paths)}")
-            
-            try:
-                # Create output path
-                output_path = output_dir / f"edited_video_{i+1:03d}.mp4"
-                
-                # Edit video
-                result = self.create_final_video([video_path], script, output_path)
-                result['original_path'] = video_path
-                result['script_index'] = i
-                
-                results.append(result)
-                
-            except Exception as e:
-                logger.error(f"Error editing video {i+1}: {e}")
-                results.append({
-                    'error': str(e),
-                    'original_path': video_path,
-                    'script_index': i
-                })
+        jobs = [
+            (i, video_path, script, output_dir / f"edited_video_{i+1:03d}.mp4")
+            for i, (video_path, script) in enumerate(zip(video_paths, scripts))
+        ]
+        if not jobs:
+            return []
+        
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Size the pool so that workers x platform encoders x encoder threads ~ cores
+        encoder_threads = self.config.get('encoder_threads') or 2
+        threads_per_job = encoder_threads * len(self.PLATFORM_EXPORTS)
+        max_workers = self.config.get('edit_workers') or max(1, (os.cpu_count() or 1) // threads_per_job)
+        max_workers = min(max_workers, len(jobs))
+        worker_config = dict(self.config, encoder_threads=encoder_threads)
+        
+        self._prewarm_bumpers(jobs)
+        
+        logger.info(f"Editing {len(jobs)} video(s) with {max_workers} worker(s), "
+                    f"{encoder_threads} encoder thread(s) each")
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        started_at = time.perf_counter()
+        failed = 0
+        
+        def record(index: int, result: Dict[str, Any]):
+            nonlocal failed
+            results[index] = result
+            failed += int('error' in result)
+            done = sum(result is not None for result in results)
+            elapsed = time.perf_counter() - started_at
+            eta = elapsed / done * (len(jobs) - done)
+            logger.info(f"Edited {done}/{len(jobs)} ({failed} failed), "
+                        f"elapsed {elapsed:.0f}s, ETA {eta:.0f}s")
+            if progress_callback:
+                progress_callback(done, len(jobs), result)
+        
+        if max_workers == 1:
+            for job in jobs:
+                record(job[0], _edit_video_job(worker_config, *job))
+            return results
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_edit_video_job, worker_config, *job): job
+                for job in jobs
+            }
+            for future in as_completed(futures):
+                index, video_path, _, _ = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Worker process died (e.g. out of memory): only this item fails
+                    logger.error(f"Error editing video {index+1}: {e}")
+                    result = {
+                        'error': str(e),
+                        'original_path': video_path,
+                        'script_index': index
+                    }
+                record(index, result)
         
         return results
+    
+    def _prewarm_bumpers(self, jobs: List[Tuple[int, str, Dict[str, Any], Path]]):
+        """Render trước các bumper dùng chung (mỗi thương hiệu x platform một lần)"""
+        seen = set()
+        
+        for _, video_path, script, _ in jobs:
+            try:
+                has_audio = ffmpeg_parse_infos(str(video_path)).get('audio_found', False)
+            except Exception:
+                continue
+            
+            key = (self._intro_text(script), has_audio)
+            if key in seen:
+                continue
+            seen.add(key)
+            
+            # File-based audio is always decoded as stereo by moviepy
+            for platform, export in self.PLATFORM_EXPORTS.items():
+                self._get_bumpers(script, platform, export['size'], export['bitrate'], 2 if has_audio else 0)
+
+def _edit_video_job(config: Dict[str, Any],
+                    index: int,
+                    video_path: str,
+                    script: Dict[str, Any],
+                    output_path: Path) -> Dict[str, Any]:
+    """Chỉnh sửa một video trong process worker, lỗi được trả về thay vì raise"""
+    global _worker_editor
+    if _worker_editor is None:
+        _worker_editor = VideoEditor(config)
+    
+    logger.info(f"Editing video {index+1}: {video_path}")
+    
+    try:
+        result = _worker_editor.create_final_video([video_path], script, output_path)
+    except Exception as e:
+        logger.error(f"Error editing video {index+1}: {e}")
+        result = {'error': str(e)}
+    
+    result['original_path'] = video_path
+    result['script_index'] = index
+    return result
+
+# One editor per worker process, reused across jobs
+_worker_editor: Optional[VideoEditor] = None
 
 # Example usage
 if __name__ == "__main__":
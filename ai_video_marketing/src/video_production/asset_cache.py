@@ -0,0 +1,123 @@
+"""
+Asset Cache - Bộ nhớ đệm tài nguyên dùng chung giữa các lần render
+"""
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Hashable, Iterable, Optional
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class AssetCache:
+    """Cache tài nguyên render (layer ảnh, PCM nhạc nền, text đã rasterize)"""
+    
+    def __init__(self, max_entries: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            max_entries: Số phần tử tối đa cho từng nhóm (LRU), None là không giới hạn
+        """
+        self._lock = threading.Lock()
+        self._stores: Dict[str, "OrderedDict[Hashable, Future]"] = {
+            name: OrderedDict()
+            for name in ["image_layers", "text_layers", "audio", "segments", "fingerprints", "misc"]
+        }
+        self.max_entries = max_entries or {}
+        self.stats = {name: {"hits": 0, "misses": 0, "evictions": 0} for name in self._stores}
+    
+    def get_or_create(self,
+                      store: str,
+                      key: Hashable,
+                      factory: Callable[[], Any]) -> Any:
+        """
+        Lấy tài nguyên từ cache hoặc tạo mới nếu chưa có
+        
+        Nhiều worker cùng yêu cầu một key thì chỉ worker đầu tiên chạy
+        factory, các worker còn lại chờ kết quả đó.
+        
+        Args:
+            store: Tên nhóm tài nguyên
+            key: Khóa của tài nguyên
+            factory: Hàm tạo tài nguyên khi cache miss
+        
+        Returns:
+            Any: Tài nguyên đã cache
+        """
+        with self._lock:
+            entries = self._stores[store]
+            future = entries.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                entries[key] = future
+                self.stats[store]["misses"] += 1
+                self._evict(store)
+            else:
+                entries.move_to_end(key)
+                self.stats[store]["hits"] += 1
+        
+        if owner:
+            try:
+                future.set_result(factory())
+            except Exception as e:
+                # Don't cache failures, the next caller retries
+                with self._lock:
+                    self._stores[store].pop(key, None)
+                future.set_exception(e)
+        
+        return future.result()
+    
+    def _evict(self, store: str):
+        """Loại bỏ phần tử ít dùng nhất khi vượt giới hạn (gọi khi đang giữ lock)"""
+        limit = self.max_entries.get(store)
+        entries = self._stores[store]
+        
+        if not limit:
+            return
+        
+        # Entries still being built are skipped so their waiters aren't orphaned
+        for key in list(entries):
+            if len(entries) <= limit:
+                break
+            if entries[key].done():
+                del entries[key]
+                self.stats[store]["evictions"] += 1
+    
+    def export(self, store: str, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """
+        Lấy các tài nguyên đã tạo xong theo khóa, để gửi sang process khác
+        
+        Khóa chưa có, đang tạo dở hoặc tạo lỗi được bỏ qua.
+        """
+        with self._lock:
+            entries = self._stores[store]
+            futures = {key: entries[key] for key in keys if key in entries}
+        
+        return {
+            key: future.result()
+            for key, future in futures.items()
+            if future.done() and future.exception() is None
+        }
+    
+    def preload(self, store: str, entries: Dict[Hashable, Any]):
+        """Nạp sẵn tài nguyên đã tạo ở nơi khác (ví dụ process cha)"""
+        with self._lock:
+            for key, value in entries.items():
+                future = Future()
+                future.set_result(value)
+                self._stores[store][key] = future
+            self._evict(store)
+    
+    def clear(self, store: str = None):
+        """Xóa cache (một nhóm hoặc toàn bộ)"""
+        with self._lock:
+            names = [store] if store else list(self._stores)
+            for name in names:
+                self._stores[name].clear()
+    
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Lấy thống kê hit/miss của cache"""
+        with self._lock:
+            return {name: dict(counts) for name, counts in self.stats.items()}
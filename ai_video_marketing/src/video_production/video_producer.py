@@ -8,6 +8,8 @@ from PIL import Image, ImageDraw, ImageFont
 import moviepy.editor as mp
 from moviepy.video.fx import resize, speedx
 from moviepy.audio.fx import volumex
+from moviepy.audio.io.ffmpeg_audiowriter import FFMPEG_AudioWriter
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 import os
 import logging
 from pathlib import Path
@@ -16,22 +18,38 @@ import json
 from datetime import datetime
 import textwrap
 import random
+import copy
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ffmpeg_utils import concat_segments
+from .asset_cache import AssetCache
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BACKGROUND_MUSIC_PATH = Path("data/background_music.mp3")
+
 class VideoProducer:
     """Sản xuất video với AI và các công cụ local"""
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.asset_cache = AssetCache(max_entries={
+            "image_layers": config.get('image_layer_cache_size', 32),
+            "text_layers": config.get('text_layer_cache_size', 256),
+            "fingerprints": 256
+        })
+        self._render_timings: Dict[str, Dict[str, float]] = {}
         
     def create_video_from_script(self, 
                                script: Dict[str, Any],
                                model_images: List[Image.Image],
-                               output_path: Path) -> Dict[str, Any]:
+                               output_path: Path,
+                               proof: bool = False) -> Dict[str, Any]:
         """
         Tạo video từ kịch bản và ảnh người mẫu
         
@@ -39,111 +57,343 @@ class VideoProducer:
             script: Kịch bản video
             model_images: Ảnh người mẫu
             output_path: Đường dẫn lưu video
+            proof: Render bản nháp độ phân giải thấp để duyệt nhanh
             
         Returns:
             Dict[str, Any]: Thông tin video đã tạo
         """
-        logger.info("Creating video from script...")
+        mode = "proof" if proof else "full"
+        render_settings = self._render_settings(proof)
+        started_at = time.perf_counter()
+        
+        logger.info(f"Creating video from script ({mode} render)...")
         
-        # Extract script sections
-        script_sections = script.get('detailed_script', {})
+        # Extract script sections in playback order
+        sections = self._collect_sections(script.get('detailed_script', {}))
         
-        # Create video clips for each section
-        video_clips = []
+        # Render (or reuse) one encoded segment per section
+        segments = []
         total_duration = 0
+        rendered_count = 0
         
-        # Hook section
-        if 'hook' in script_sections:
-            hook_clip = self._create_section_clip(
-                script_sections['hook'],
+        for index, (section_type, section) in enumerate(sections):
+            segment = self._render_section_segment(
+                section,
                 model_images,
-                section_type='hook'
+                section_type,
+                slot=index,
+                is_first=index == 0,
+                is_last=index == len(sections) - 1,
+                render_settings=render_settings
+            )
+            if segment:
+                segments.append(segment)
+                total_duration += segment['duration']
+                rendered_count += int(segment['rendered'])
+        
+        if not segments:
+            raise ValueError("No video clips created")
+        
+        # Mix background music in NumPy and encode it once
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        audio_file = self._write_audio_track(total_duration, output_path)
+        
+        # Stitch the segments and mux the audio track without re-encoding
+        try:
+            concat_segments(
+                [segment['path'] for segment in segments],
+                output_path,
+                audio_path=Path(audio_file) if audio_file else None
             )
-            if hook_clip:
-                video_clips.append(hook_clip)
-                total_duration += hook_clip.duration
+        finally:
+            if audio_file:
+                Path(audio_file).unlink(missing_ok=True)
+        
+        keyframe_index = self._write_keyframe_index(output_path, segments, render_settings)
+        
+        # Keep proof and full render times of the same script side by side
+        render_time = time.perf_counter() - started_at
+        render_times = self._render_timings.setdefault(self._script_key(script), {})
+        render_times[mode] = render_time
+        
+        video_info = {
+            "output_path": str(output_path),
+            "duration": total_duration,
+            "resolution": tuple(render_settings['resolution']),
+            "fps": render_settings['fps'],
+            "render_mode": mode,
+            "render_time": render_time,
+            "render_times": dict(render_times),
+            "sections_count": len(segments),
+            "sections_rendered": rendered_count,
+            "sections_reused": len(segments) - rendered_count,
+            "keyframe_index": str(keyframe_index),
+            "created_at": datetime.now().isoformat()
+        }
+        
+        logger.info(f"Video created successfully: {output_path} "
+                    f"({rendered_count}/{len(segments)} sections re-rendered)")
+        logger.info("Render times: " + ", ".join(
+            f"{name} {seconds:.1f}s" for name, seconds in sorted(render_times.items())
+        ))
+        return video_info
+    
+    def _script_key(self, script: Dict[str, Any]) -> str:
+        """Khóa của kịch bản để ghép thời gian render proof/full"""
+        return hashlib.sha256(
+            json.dumps(script.get('detailed_script', {}), sort_keys=True, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()
+    
+    def _collect_sections(self, script_sections: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Lấy danh sách (loại section, section) theo thứ tự phát"""
+        sections = []
+        
+        # Hook section
+        if 'hook' in script_sections:
+            sections.append(('hook', script_sections['hook']))
         
         # Introduction section
         if 'introduction' in script_sections:
-            intro_clip = self._create_section_clip(
-                script_sections['introduction'],
-                model_images,
-                section_type='introduction'
-            )
-            if intro_clip:
-                video_clips.append(intro_clip)
-                total_duration += intro_clip.duration
+            sections.append(('introduction', script_sections['introduction']))
         
         # Main content sections
         if 'main_content' in script_sections:
-            main_sections = script_sections['main_content'].get('sections', [])
-            for section in main_sections:
-                main_clip = self._create_section_clip(
-                    section,
-                    model_images,
-                    section_type='main'
-                )
-                if main_clip:
-                    video_clips.append(main_clip)
-                    total_duration += main_clip.duration
+            for section in script_sections['main_content'].get('sections', []):
+                sections.append(('main', section))
         
         # Call to action section
         if 'call_to_action' in script_sections:
-            cta_clip = self._create_section_clip(
-                script_sections['call_to_action'],
-                model_images,
-                section_type='cta'
-            )
-            if cta_clip:
-                video_clips.append(cta_clip)
-                total_duration += cta_clip.duration
+            sections.append(('cta', script_sections['call_to_action']))
         
-        if not video_clips:
-            raise ValueError("No video clips created")
+        return sections
+    
+    def _render_settings(self, proof: bool = False) -> Dict[str, Any]:
+        """Các thiết lập render ảnh hưởng tới nội dung segment"""
+        full_resolution = self.config.get('default_resolution', (1920, 1080))
         
-        # Combine all clips
-        final_video = mp.concatenate_videoclips(video_clips, method="compose")
+        if proof:
+            resolution = self.config.get('proof_resolution', (640, 360))
+            settings = {
+                "resolution": list(resolution),
+                "fps": self.config.get('proof_fps', 15),
+                "codec": self.config.get('codec', 'libx264'),
+                "bitrate": self.config.get('proof_bitrate', '800k'),
+                "preset": "ultrafast"
+            }
+        else:
+            resolution = full_resolution
+            settings = {
+                "resolution": list(resolution),
+                "fps": self.config.get('fps', 30),
+                "codec": self.config.get('codec', 'libx264'),
+                "bitrate": self.config.get('bitrate'),
+                "preset": self.config.get('preset', 'medium')
+            }
         
-        # Add background music
-        final_video = self._add_background_music(final_video)
+        # Pixel sizes (fonts, margins) are authored for the full resolution
+        settings["scale"] = resolution[0] / full_resolution[0]
         
-        # Apply final effects
-        final_video = self._apply_final_effects(final_video)
+        # Fixed GOP (in frames) so keyframe positions are known without probing
+        settings["keyframe_interval"] = max(1, int(round(
+            settings["fps"] * self.config.get('keyframe_interval', 2.0)
+        )))
+        return settings
+    
+    def _section_cache_key(self,
+                           section: Dict[str, Any],
+                           section_type: str,
+                           model_image: Image.Image,
+                           is_first: bool,
+                           is_last: bool,
+                           render_settings: Dict[str, Any]) -> str:
+        """Tạo khóa cache cho segment của một section"""
+        payload = {
+            "section_type": section_type,
+            "dialogue": section.get('dialogue', ''),
+            "visual_notes": section.get('visual_notes', ''),
+            "timing": section.get('timing', '0-10s'),
+            "tone": section.get('tone', 'neutral'),
+            "image": self._image_fingerprint(model_image),
+            "fade_in": is_first,
+            "fade_out": is_last,
+            "render": render_settings
+        }
         
-        # Export video
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        final_video.write_videofile(
-            str(output_path),
-            fps=self.config.get('fps', 30),
-            codec=self.config.get('codec', 'libx264'),
-            audio_codec=self.config.get('audio_codec', 'aac'),
-            temp_audiofile='temp-audio.m4a',
-            remove_temp=True
-        )
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+    
+    def _image_fingerprint(self, image: Image.Image) -> str:
+        """Hash nội dung ảnh (cache theo object để không hash lại)"""
+        def compute():
+            digest = hashlib.md5(image.tobytes())
+            digest.update(f"{image.mode}:{image.size}".encode())
+            # Keep the image alive so its id() stays unique in the key
+            return image, digest.hexdigest()
         
-        # Clean up
-        for clip in video_clips:
-            clip.close()
-        final_video.close()
+        return self.asset_cache.get_or_create("fingerprints", id(image), compute)[1]
+    
+    def _render_section_segment(self,
+                                section: Dict[str, Any],
+                                model_images: List[Image.Image],
+                                section_type: str,
+                                slot: int,
+                                is_first: bool,
+                                is_last: bool,
+                                render_settings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Render một section thành segment đã encode, dùng lại nếu đã có
         
-        video_info = {
-            "output_path": str(output_path),
-            "duration": total_duration,
-            "resolution": self.config.get('default_resolution', (1920, 1080)),
-            "fps": self.config.get('fps', 30),
-            "sections_count": len(video_clips),
-            "created_at": datetime.now().isoformat()
+        Segment được cache trên đĩa theo nội dung section, ảnh được chọn và
+        thiết lập render, nên khi chỉ sửa một section thì các section khác
+        được ghép lại bằng stream copy.
+        
+        Args:
+            section: Nội dung section
+            model_images: Ảnh người mẫu
+            section_type: Loại section
+            slot: Vị trí section trong video
+            is_first: Section đầu tiên (fade in)
+            is_last: Section cuối cùng (fade out)
+            render_settings: Thiết lập render (full hoặc proof)
+            
+        Returns:
+            Optional[Dict[str, Any]]: Đường dẫn, thời lượng và trạng thái render
+        """
+        try:
+            model_image = self._select_model_image(model_images, section_type, slot)
+            key = self._section_cache_key(
+                section, section_type, model_image, is_first, is_last, render_settings
+            )
+            
+            cache_dir = Path(self.config.get('cache_dir', 'data/cache')) / "sections"
+            segment_path = cache_dir / f"{key}.mp4"
+            duration = self._parse_timing(section.get('timing', '0-10s'))
+            rendered = []
+            
+            def render():
+                if segment_path.exists():
+                    return segment_path
+                
+                clip = self._create_section_clip(
+                    section, model_images, section_type,
+                    model_image=model_image, render_settings=render_settings
+                )
+                if clip is None:
+                    raise ValueError(f"Could not create {section_type} section clip")
+                
+                clip = self._apply_final_effects(
+                    clip, fade_in=is_first, fade_out=is_last,
+                    resolution=tuple(render_settings['resolution'])
+                )
+                
+                # Write to a temp file first so a crashed render never poisons the cache
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                temp_path = cache_dir / f"{key}.{os.getpid()}.tmp.mp4"
+                clip.write_videofile(
+                    str(temp_path),
+                    fps=render_settings['fps'],
+                    codec=render_settings['codec'],
+                    bitrate=render_settings['bitrate'],
+                    preset=render_settings['preset'],
+                    audio=False,
+                    ffmpeg_params=[
+                        '-g', str(render_settings['keyframe_interval']),
+                        '-keyint_min', str(render_settings['keyframe_interval']),
+                        '-sc_threshold', '0'
+                    ]
+                )
+                clip.close()
+                os.replace(temp_path, segment_path)
+                rendered.append(key)
+                return segment_path
+            
+            self.asset_cache.get_or_create("segments", key, render)
+            
+            return {
+                "path": segment_path,
+                "section_type": section_type,
+                "duration": duration,
+                "rendered": bool(rendered)
+            }
+            
+        except Exception as e:
+            logger.error(f"Error rendering section segment: {e}")
+            return None
+    
+    def _write_keyframe_index(self,
+                              output_path: Path,
+                              segments: List[Dict[str, Any]],
+                              render_settings: Dict[str, Any]) -> Path:
+        """
+        Ghi file sidecar <video>.keyframes.json chứa mốc section và keyframe
+        
+        Mỗi segment bắt đầu bằng một keyframe và có GOP cố định, nên mọi
+        keyframe đều tính được từ thời lượng thực của các segment. Các bước
+        sau (cắt clip ngắn, trim) đọc file này để cắt bằng stream copy mà
+        không cần decode hay probe video.
+        
+        Args:
+            output_path: Video đã ghép
+            segments: Các segment theo thứ tự phát
+            render_settings: Thiết lập render đã dùng
+            
+        Returns:
+            Path: Đường dẫn file sidecar
+        """
+        fps = render_settings['fps']
+        gop_seconds = render_settings['keyframe_interval'] / fps
+        
+        sections = []
+        keyframes = []
+        start = 0.0
+        
+        for segment in segments:
+            # Actual encoded length (not the scripted timing), snapped to whole frames
+            duration = round(ffmpeg_parse_infos(str(segment['path']))['duration'] * fps) / fps
+            end = start + duration
+            sections.append({
+                "type": segment['section_type'],
+                "start": round(start, 3),
+                "end": round(end, 3)
+            })
+            keyframes.extend(
+                round(start + i * gop_seconds, 3)
+                for i in range(int(np.ceil(duration / gop_seconds - 1e-6)))
+            )
+            start = end
+        
+        index = {
+            "video": output_path.name,
+            "fps": fps,
+            "keyframe_interval": render_settings['keyframe_interval'],
+            "duration": round(start, 3),
+            "sections": sections,
+            "keyframes": keyframes
         }
         
-        logger.info(f"Video created successfully: {output_path}")
-        return video_info
+        index_path = output_path.with_suffix('.keyframes.json')
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        
+        return index_path
+    
+    def clear_section_cache(self):
+        """Xóa cache segment của các section"""
+        cache_dir = Path(self.config.get('cache_dir', 'data/cache')) / "sections"
+        for segment_path in cache_dir.glob("*.mp4"):
+            segment_path.unlink(missing_ok=True)
+        self.asset_cache.clear("segments")
     
     def _create_section_clip(self, 
                            section: Dict[str, Any],
                            model_images: List[Image.Image],
-                           section_type: str) -> Optional[mp.VideoFileClip]:
+                           section_type: str,
+                           model_image: Optional[Image.Image] = None,
+                           render_settings: Optional[Dict[str, Any]] = None) -> Optional[mp.VideoFileClip]:
         """Tạo clip cho một section"""
         try:
+            render_settings = render_settings or self._render_settings()
+            
             dialogue = section.get('dialogue', '')
             visual_notes = section.get('visual_notes', '')
             timing = section.get('timing', '0-10s')
@@ -153,15 +403,19 @@ class VideoProducer:
             duration = self._parse_timing(timing)
             
             # Select appropriate model image
-            model_image = self._select_model_image(model_images, section_type)
+            if model_image is None:
+                model_image = self._select_model_image(model_images, section_type)
             
             # Create visual content
             visual_clip = self._create_visual_content(
-                model_image, dialogue, visual_notes, duration, tone
+                model_image, dialogue, visual_notes, duration, tone,
+                target_resolution=tuple(render_settings['resolution'])
             )
             
             # Add text overlay
-            text_clip = self._create_text_overlay(dialogue, duration, tone)
+            text_clip = self._create_text_overlay(
+                dialogue, duration, tone, scale=render_settings['scale']
+            )
             
             # Combine visual and text
             if text_clip:
@@ -192,11 +446,14 @@ class VideoProducer:
     
     def _select_model_image(self, 
                           model_images: List[Image.Image],
-                          section_type: str) -> Image.Image:
+                          section_type: str,
+                          slot: int = 0) -> Image.Image:
         """Chọn ảnh người mẫu phù hợp cho section"""
         if not model_images:
-            # Create a placeholder image
-            return self._create_placeholder_image()
+            # Create a placeholder image (shared by every render)
+            return self.asset_cache.get_or_create(
+                "misc", "placeholder_image", self._create_placeholder_image
+            )
         
         # Select image based on section type
         if section_type == 'hook':
@@ -204,8 +461,10 @@ class VideoProducer:
         elif section_type == 'cta':
             return model_images[-1]  # Use last image for CTA
         else:
-            # Randomly select for other sections
-            return random.choice(model_images)
+            # Seeded pick per section slot, so identical scripts get identical frames
+            seed_source = f"{self.config.get('image_selection_seed', 0)}:{section_type}:{slot}"
+            seed = int(hashlib.sha256(seed_source.encode()).hexdigest()[:16], 16)
+            return random.Random(seed).choice(model_images)
     
     def _create_placeholder_image(self) -> Image.Image:
         """Tạo ảnh placeholder"""
@@ -235,23 +494,14 @@ class VideoProducer:
                              dialogue: str,
                              visual_notes: str,
                              duration: float,
-                             tone: str) -> mp.VideoFileClip:
+                             tone: str,
+                             target_resolution: Optional[Tuple[int, int]] = None) -> mp.VideoFileClip:
         """Tạo nội dung visual cho clip"""
         
-        # Resize model image to video resolution
-        target_resolution = self.config.get('default_resolution', (1920, 1080))
-        model_image = model_image.resize(target_resolution, Image.Resampling.LANCZOS)
-        
-        # Apply visual effects based on tone
-        if tone in ['exciting', 'urgent']:
-            # Add dynamic effects
-            model_image = self._apply_dynamic_effects(model_image)
-        elif tone in ['calm', 'peaceful']:
-            # Add calming effects
-            model_image = self._apply_calming_effects(model_image)
+        target_resolution = target_resolution or self.config.get('default_resolution', (1920, 1080))
         
-        # Convert PIL image to numpy array
-        img_array = np.array(model_image)
+        # Resized and effected layers are shared across sections and videos
+        img_array = self._get_image_layer(model_image, tone, target_resolution)
         
         # Create video clip from image
         clip = mp.ImageClip(img_array, duration=duration)
@@ -261,6 +511,44 @@ class VideoProducer:
         
         return clip
     
+    def _get_image_layer(self,
+                         model_image: Image.Image,
+                         tone: str,
+                         target_resolution: Tuple[int, int]) -> np.ndarray:
+        """Lấy layer ảnh đã resize và áp hiệu ứng (có cache)"""
+        # Keyed by content, so equal images from different objects/variants share a layer
+        key = self._image_layer_key(model_image, tone, target_resolution)
+        effect = key[1]
+        
+        def build_layer() -> np.ndarray:
+            # Resize model image to video resolution
+            image = model_image.resize(target_resolution, Image.Resampling.LANCZOS)
+            
+            # Apply visual effects based on tone
+            if effect == 'dynamic':
+                image = self._apply_dynamic_effects(image)
+            elif effect == 'calming':
+                image = self._apply_calming_effects(image)
+            
+            layer = np.array(image)
+            layer.setflags(write=False)
+            return layer
+        
+        return self.asset_cache.get_or_create("image_layers", key, build_layer)
+    
+    def _image_layer_key(self,
+                         model_image: Image.Image,
+                         tone: str,
+                         target_resolution: Tuple[int, int]) -> Tuple[str, Optional[str], Tuple[int, int]]:
+        """Khóa cache của layer ảnh: (hash nội dung ảnh, hiệu ứng, độ phân giải)"""
+        if tone in ['exciting', 'urgent']:
+            effect = 'dynamic'
+        elif tone in ['calm', 'peaceful']:
+            effect = 'calming'
+        else:
+            effect = None
+        return self._image_fingerprint(model_image), effect, tuple(target_resolution)
+    
     def _apply_dynamic_effects(self, image: Image.Image) -> Image.Image:
         """Áp dụng hiệu ứng động"""
         # Convert to numpy array
@@ -288,47 +576,23 @@ class VideoProducer:
     def _create_text_overlay(self, 
                            dialogue: str,
                            duration: float,
-                           tone: str) -> Optional[mp.TextClip]:
+                           tone: str,
+                           scale: float = 1.0) -> Optional[mp.ImageClip]:
         """Tạo text overlay cho clip"""
         if not dialogue.strip():
             return None
         
         try:
-            # Configure text style based on tone
-            font_size = 50
-            color = 'white'
-            stroke_color = 'black'
-            stroke_width = 2
-            
-            if tone in ['exciting', 'urgent']:
-                font_size = 60
-                color = 'yellow'
-                stroke_color = 'red'
-                stroke_width = 3
-            elif tone in ['calm', 'peaceful']:
-                font_size = 45
-                color = 'lightblue'
-                stroke_color = 'darkblue'
-                stroke_width = 1
-            
-            # Wrap text for better readability
-            max_chars_per_line = 40
-            wrapped_text = textwrap.fill(dialogue, width=max_chars_per_line)
+            # Rasterize text once, identical captions reuse the same layer
+            rgb, alpha = self._get_text_layer(self._text_style(dialogue, tone, scale))
             
             # Create text clip
-            text_clip = mp.TextClip(
-                wrapped_text,
-                fontsize=font_size,
-                color=color,
-                stroke_color=stroke_color,
-                stroke_width=stroke_width,
-                font='Arial-Bold',
-                method='caption',
-                size=(1800, None)  # Leave some margin
+            text_clip = mp.ImageClip(rgb).set_mask(
+                mp.ImageClip(alpha, ismask=True)
             ).set_duration(duration)
             
             # Position text at bottom
-            text_clip = text_clip.set_position(('center', 'bottom')).set_margin(50)
+            text_clip = text_clip.set_position(('center', 'bottom')).set_margin(round(50 * scale))
             
             return text_clip
             
@@ -336,51 +600,165 @@ class VideoProducer:
             logger.error(f"Error creating text overlay: {e}")
             return None
     
-    def _add_background_music(self, video_clip: mp.VideoFileClip) -> mp.VideoFileClip:
-        """Thêm nhạc nền"""
+    def _text_style(self, dialogue: str, tone: str, scale: float = 1.0) -> Tuple:
+        """Thuộc tính text đã rasterize (cũng là khóa cache của text layer)"""
+        # Configure text style based on tone
+        font_size = 50
+        color = 'white'
+        stroke_color = 'black'
+        stroke_width = 2
+        
+        if tone in ['exciting', 'urgent']:
+            font_size = 60
+            color = 'yellow'
+            stroke_color = 'red'
+            stroke_width = 3
+        elif tone in ['calm', 'peaceful']:
+            font_size = 45
+            color = 'lightblue'
+            stroke_color = 'darkblue'
+            stroke_width = 1
+        
+        # Wrap text for better readability
+        max_chars_per_line = 40
+        wrapped_text = textwrap.fill(dialogue, width=max_chars_per_line)
+        
+        return (
+            wrapped_text,
+            max(1, round(font_size * scale)),
+            color,
+            stroke_color,
+            stroke_width * scale,
+            round(1800 * scale)  # Leave some margin
+        )
+    
+    def _get_text_layer(self, text_style: Tuple) -> Tuple[np.ndarray, np.ndarray]:
+        """Lấy text đã rasterize (RGB, alpha) từ cache"""
+        return self.asset_cache.get_or_create(
+            "text_layers", text_style, lambda: self._rasterize_text(*text_style)
+        )
+    
+    def _rasterize_text(self,
+                        text: str,
+                        font_size: int,
+                        color: str,
+                        stroke_color: str,
+                        stroke_width: float,
+                        width: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Render text thành ảnh RGB và alpha mask"""
+        text_clip = mp.TextClip(
+            text,
+            fontsize=font_size,
+            color=color,
+            stroke_color=stroke_color,
+            stroke_width=stroke_width,
+            font='Arial-Bold',
+            method='caption',
+            size=(width, None)
+        )
+        
+        rgb = text_clip.get_frame(0)
+        alpha = text_clip.mask.get_frame(0)
+        text_clip.close()
+        
+        rgb.setflags(write=False)
+        alpha.setflags(write=False)
+        return rgb, alpha
+    
+    def _load_background_music(self, music_path: Path) -> Tuple[np.ndarray, int]:
+        """Decode nhạc nền thành PCM một lần và cache lại"""
+        def decode():
+            music = mp.AudioFileClip(str(music_path))
+            fps = music.fps
+            pcm = music.to_soundarray(fps=fps)
+            music.close()
+            pcm.setflags(write=False)
+            return pcm, fps
+        
+        key = (str(music_path.resolve()), music_path.stat().st_mtime)
+        return self.asset_cache.get_or_create("audio", key, decode)
+    
+    def _build_audio_track(self,
+                           duration: float,
+                           video_audio: Optional[mp.AudioClip] = None) -> Optional[Tuple[np.ndarray, int]]:
+        """Tạo track nhạc nền (lặp, cắt, gain, fade) bằng NumPy"""
+        # Look for background music file
+        music_path = BACKGROUND_MUSIC_PATH
+        
+        if not music_path.exists():
+            logger.warning("Background music file not found, skipping music")
+            return None
+        
+        pcm, fps = self._load_background_music(music_path)
+        n_samples = int(round(duration * fps))
+        
+        # Loop and trim the decoded PCM with array slicing
+        track = np.resize(pcm, (n_samples, pcm.shape[1])).astype(np.float32, copy=False)
+        
+        # Lower volume and fade in/out with a single envelope
+        envelope = np.full(n_samples, self.config.get('music_volume', 0.3), dtype=np.float32)
+        fade_samples = min(int(self.config.get('music_fade', 0.5) * fps), n_samples // 2)
+        if fade_samples > 0:
+            ramp = np.linspace(0.0, 1.0, fade_samples, dtype=np.float32)
+            envelope[:fade_samples] *= ramp
+            envelope[-fade_samples:] *= ramp[::-1]
+        track *= envelope[:, None]
+        
+        # Combine with video audio (if any)
+        if video_audio:
+            original = video_audio.to_soundarray(fps=fps)
+            overlap = min(len(original), n_samples)
+            track[:overlap] += original[:overlap]
+            np.clip(track, -1.0, 1.0, out=track)
+        
+        return track, fps
+    
+    def _write_audio_track(self,
+                           duration: float,
+                           output_path: Path,
+                           video_audio: Optional[mp.AudioClip] = None) -> Optional[str]:
+        """Encode track audio thành file để mux trực tiếp với video"""
         try:
-            # Look for background music file
-            music_path = Path("data/background_music.mp3")
+            audio = self._build_audio_track(duration, video_audio)
+            if audio is None:
+                return None
+            
+            track, fps = audio
+            audio_path = output_path.with_suffix('.music.m4a')
+            
+            writer = FFMPEG_AudioWriter(
+                str(audio_path),
+                fps,
+                nbytes=2,
+                nchannels=track.shape[1],
+                codec=self.config.get('audio_codec', 'aac'),
+                bitrate=self.config.get('audio_bitrate')
+            )
+            writer.write_frames((track * 32767).astype(np.int16))
+            writer.close()
+            
+            return str(audio_path)
             
-            if music_path.exists():
-                # Load background music
-                music = mp.AudioFileClip(str(music_path))
-                
-                # Adjust music duration to match video
-                if music.duration > video_clip.duration:
-                    music = music.subclip(0, video_clip.duration)
-                else:
-                    # Loop music if it's shorter than video
-                    loops_needed = int(video_clip.duration / music.duration) + 1
-                    music = mp.concatenate_audioclips([music] * loops_needed)
-                    music = music.subclip(0, video_clip.duration)
-                
-                # Lower volume of background music
-                music = music.fx(volumex, 0.3)
-                
-                # Combine with video audio (if any)
-                if video_clip.audio:
-                    final_audio = mp.CompositeAudioClip([video_clip.audio, music])
-                else:
-                    final_audio = music
-                
-                return video_clip.set_audio(final_audio)
-            else:
-                logger.warning("Background music file not found, skipping music")
-                return video_clip
-                
         except Exception as e:
             logger.error(f"Error adding background music: {e}")
-            return video_clip
+            return None
     
-    def _apply_final_effects(self, video_clip: mp.VideoFileClip) -> mp.VideoFileClip:
+    def _apply_final_effects(self,
+                             video_clip: mp.VideoFileClip,
+                             fade_in: bool = True,
+                             fade_out: bool = True,
+                             resolution: Optional[Tuple[int, int]] = None) -> mp.VideoFileClip:
         """Áp dụng hiệu ứng cuối cùng"""
         try:
             # Apply color correction
-            video_clip = video_clip.fx(resize, newsize=self.config.get('default_resolution', (1920, 1080)))
+            resolution = resolution or self.config.get('default_resolution', (1920, 1080))
+            video_clip = video_clip.resize(resolution)
             
             # Add subtle fade in/out
-            video_clip = video_clip.fadein(0.5).fadeout(0.5)
+            if fade_in:
+                video_clip = video_clip.fadein(0.5)
+            if fade_out:
+                video_clip = video_clip.fadeout(0.5)
             
             return video_clip
             
@@ -392,7 +770,8 @@ class VideoProducer:
                                  script: Dict[str, Any],
                                  model_images: List[Image.Image],
                                  variations: List[Dict[str, Any]],
-                                 output_dir: Path) -> List[Dict[str, Any]]:
+                                 output_dir: Path,
+                                 proof: bool = False) -> List[Dict[str, Any]]:
         """
         Tạo nhiều biến thể video
         
@@ -401,28 +780,26 @@ class VideoProducer:
             model_images: Ảnh người mẫu
             variations: Danh sách biến thể
             output_dir: Thư mục lưu
+            proof: Chỉ render bản nháp để duyệt
             
         Returns:
             List[Dict[str, Any]]: Thông tin các video đã tạo
         """
-        results = []
+        jobs = []
         
         for i, variation in enumerate(variations):
-            logger.info(f"Creating video variation {i+1}/{len(variations)}")
-            
             # Modify script for this variation
             modified_script = self._modify_script_for_variation(script, variation)
             
             # Create output path
             output_path = output_dir / f"video_variation_{i+1:03d}.mp4"
             
-            # Create video
-            video_info = self.create_video_from_script(
-                modified_script, model_images, output_path
-            )
-            
+            jobs.append((modified_script, output_path))
+        
+        results = self._render_batch(jobs, model_images, label="video variation", proof=proof)
+        
+        for video_info, variation in zip(results, variations):
             video_info['variation'] = variation
-            results.append(video_info)
         
         return results
     
@@ -430,7 +807,8 @@ class VideoProducer:
                                    script: Dict[str, Any],
                                    variation: Dict[str, Any]) -> Dict[str, Any]:
         """Chỉnh sửa kịch bản cho biến thể"""
-        modified_script = script.copy()
+        # Deep copy so variations rendered side by side don't share sections
+        modified_script = copy.deepcopy(script)
         
         # Modify based on variation parameters
         if 'tone' in variation:
@@ -456,7 +834,8 @@ class VideoProducer:
     def batch_produce_videos(self, 
                            scripts: List[Dict[str, Any]],
                            model_images: List[Image.Image],
-                           output_dir: Path) -> List[Dict[str, Any]]:
+                           output_dir: Path,
+                           proof: bool = False) -> List[Dict[str, Any]]:
         """
         Sản xuất hàng loạt video
         
@@ -464,27 +843,201 @@ class VideoProducer:
             scripts: Danh sách kịch bản
             model_images: Ảnh người mẫu
             output_dir: Thư mục lưu
+            proof: Chỉ render bản nháp để duyệt
             
         Returns:
             List[Dict[str, Any]]: Thông tin các video đã tạo
         """
-        results = []
+        jobs = [
+            (script, output_dir / f"video_{i+1:03d}.mp4")
+            for i, script in enumerate(scripts)
+        ]
+        
+        results = self._render_batch(jobs, model_images, label="video", proof=proof)
+        
+        for i, video_info in enumerate(results):
+            video_info['script_index'] = i
+        
+        return results
+    
+    def _render_batch(self,
+                      jobs: List[Tuple[Dict[str, Any], Path]],
+                      model_images: List[Image.Image],
+                      label: str = "video",
+                      proof: bool = False) -> List[Dict[str, Any]]:
+        """
+        Render nhiều video song song trên nhiều process
         
-        for i, script in enumerate(scripts):
-            logger.info(f"Producing video {i+1}/{len(scripts)}")
+        Dựng frame bằng moviepy/NumPy chủ yếu chạy Python giữ GIL, nên mỗi
+        job chạy trong một process riêng (giống batch_edit_videos). Asset mà
+        nhiều job cùng cần (layer ảnh, PCM nhạc nền, text đã rasterize) được
+        dựng trước một lần trong process cha và gửi cho mỗi worker qua
+        initializer, nên không bị dựng lại ở từng process. Segment section
+        được chia sẻ giữa các process qua cache trên đĩa (ghi file tạm rồi
+        rename). Lỗi của một video không làm dừng các video khác.
+        
+        Args:
+            jobs: Danh sách (kịch bản, đường dẫn output)
+            model_images: Ảnh người mẫu
+            label: Tên hiển thị trong log
+            proof: Render bản nháp độ phân giải thấp
             
-            # Create output path
-            output_path = output_dir / f"video_{i+1:03d}.mp4"
+        Returns:
+            List[Dict[str, Any]]: Thông tin video theo đúng thứ tự jobs; video
+                lỗi có khóa 'error' thay vì thông tin video
+        """
+        if not jobs:
+            return []
+        
+        max_workers = min(len(jobs), self.config.get('batch_workers', os.cpu_count() or 1))
+        logger.info(f"Rendering {len(jobs)} {label}(s) with {max_workers} worker(s)")
+        
+        if max_workers == 1:
+            results = [
+                _render_job(self, model_images, i, len(jobs), label, script, output_path, proof)
+                for i, (script, output_path) in enumerate(jobs)
+            ]
+            logger.info(f"Asset cache stats: {self.asset_cache.get_stats()}")
+            return results
+        
+        shared_assets = self._prewarm_assets(jobs, model_images, proof)
+        
+        # Model images and shared assets are sent once per worker, not once per job
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_render_worker,
+                                 initargs=(self.config, model_images, shared_assets)) as executor:
+            futures = {
+                executor.submit(_produce_video_job, i, len(jobs), label, script, output_path, proof): i
+                for i, (script, output_path) in enumerate(jobs)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    # Worker process died (e.g. out of memory): only this item fails
+                    logger.error(f"Error producing {label} {index+1}: {e}")
+                    results[index] = {'error': str(e), 'output_path': str(jobs[index][1])}
+        
+        # Workers only know their own render times, collect them here
+        mode = "proof" if proof else "full"
+        for (script, _), video_info in zip(jobs, results):
+            if 'error' in video_info:
+                continue
+            render_times = self._render_timings.setdefault(self._script_key(script), {})
+            render_times[mode] = video_info['render_time']
+            video_info['render_times'] = dict(render_times)
+        
+        return results
+    
+    def _prewarm_assets(self,
+                        jobs: List[Tuple[Dict[str, Any], Path]],
+                        model_images: List[Image.Image],
+                        proof: bool = False) -> Dict[str, Dict[Any, Any]]:
+        """
+        Dựng trước các asset mà từ hai job trở lên cần tới
+        
+        Section đã có segment trên đĩa được bỏ qua vì sẽ không render lại.
+        Lỗi khi dựng chỉ được log, job cần asset đó sẽ tự dựng lại và báo lỗi.
+        
+        Returns:
+            Dict[str, Dict[Any, Any]]: {nhóm asset: {khóa: giá trị}} cho AssetCache.preload
+        """
+        render_settings = self._render_settings(proof)
+        resolution = tuple(render_settings['resolution'])
+        cache_dir = Path(self.config.get('cache_dir', 'data/cache')) / "sections"
+        
+        uses: Dict[Tuple[str, Any], int] = {}
+        builders: Dict[Tuple[str, Any], Any] = {}
+        for script, _ in jobs:
+            needed = {}
+            sections = self._collect_sections(script.get('detailed_script', {}))
+            for index, (section_type, section) in enumerate(sections):
+                model_image = self._select_model_image(model_images, section_type, index)
+                key = self._section_cache_key(
+                    section, section_type, model_image,
+                    index == 0, index == len(sections) - 1, render_settings
+                )
+                if (cache_dir / f"{key}.mp4").exists():
+                    continue
+                
+                tone = section.get('tone', 'neutral')
+                needed[("image_layers", self._image_layer_key(model_image, tone, resolution))] = (
+                    lambda model_image=model_image, tone=tone: self._get_image_layer(model_image, tone, resolution)
+                )
+                dialogue = section.get('dialogue', '')
+                if dialogue.strip():
+                    text_style = self._text_style(dialogue, tone, render_settings['scale'])
+                    needed[("text_layers", text_style)] = lambda text_style=text_style: self._get_text_layer(text_style)
             
-            # Create video
-            video_info = self.create_video_from_script(
-                script, model_images, output_path
-            )
+            if needed and BACKGROUND_MUSIC_PATH.exists():
+                music_key = (str(BACKGROUND_MUSIC_PATH.resolve()), BACKGROUND_MUSIC_PATH.stat().st_mtime)
+                needed[("audio", music_key)] = lambda: self._load_background_music(BACKGROUND_MUSIC_PATH)
             
-            video_info['script_index'] = i
-            results.append(video_info)
+            for asset in needed:
+                uses[asset] = uses.get(asset, 0) + 1
+            builders.update(needed)
         
-        return results
+        shared = [asset for asset, count in uses.items() if count > 1]
+        for asset in shared:
+            try:
+                builders[asset]()
+            except Exception as e:
+                logger.warning(f"Could not prebuild shared {asset[0]} asset: {e}")
+        
+        shared_assets = {}
+        for store in ("image_layers", "text_layers", "audio"):
+            keys = [key for name, key in shared if name == store]
+            if keys:
+                shared_assets[store] = self.asset_cache.export(store, keys)
+        
+        logger.info("Prebuilt shared assets: " + (", ".join(
+            f"{len(entries)} {store}" for store, entries in shared_assets.items()
+        ) or "none"))
+        return shared_assets
+
+def _render_job(producer: VideoProducer,
+                model_images: List[Image.Image],
+                index: int,
+                total: int,
+                label: str,
+                script: Dict[str, Any],
+                output_path: Path,
+                proof: bool) -> Dict[str, Any]:
+    """Render một video, lỗi được trả về thay vì raise"""
+    logger.info(f"Producing {label} {index+1}/{total}")
+    try:
+        return producer.create_video_from_script(script, model_images, output_path, proof=proof)
+    except Exception as e:
+        logger.error(f"Error producing {label} {index+1}: {e}")
+        return {'error': str(e), 'output_path': str(output_path)}
+
+def _init_render_worker(config: Dict[str, Any],
+                        model_images: List[Image.Image],
+                        shared_assets: Dict[str, Dict[Any, Any]]):
+    """Tạo VideoProducer cho process worker (một lần mỗi process) và nạp asset dùng chung"""
+    global _worker_producer, _worker_model_images
+    _worker_producer = VideoProducer(config)
+    _worker_model_images = model_images
+    for store, entries in shared_assets.items():
+        _worker_producer.asset_cache.preload(store, entries)
+
+def _produce_video_job(index: int,
+                       total: int,
+                       label: str,
+                       script: Dict[str, Any],
+                       output_path: Path,
+                       proof: bool) -> Dict[str, Any]:
+    """Render một video trong process worker"""
+    video_info = _render_job(_worker_producer, _worker_model_images,
+                             index, total, label, script, output_path, proof)
+    logger.info(f"Asset cache stats (pid {os.getpid()}): {_worker_producer.asset_cache.get_stats()}")
+    return video_info
+
+# One producer (and asset cache) per worker process, reused across jobs
+_worker_producer: Optional[VideoProducer] = None
+_worker_model_images: List[Image.Image] = []
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,8 @@
+"""
+Cấu hình pytest: thêm src vào sys.path giống các script ở thư mục gốc
+"""
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
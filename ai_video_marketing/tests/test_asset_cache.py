@@ -0,0 +1,48 @@
+"""
+Test AssetCache: dựng một lần, LRU, và chuyển asset giữa các process
+"""
+import pickle
+import pytest
+
+# The video_production package imports VideoProducer (torch, moviepy)
+pytest.importorskip("torch")
+
+from video_production.asset_cache import AssetCache
+
+def test_factory_runs_once_per_key():
+    cache = AssetCache()
+    calls = []
+    for _ in range(3):
+        assert cache.get_or_create("audio", "music", lambda: calls.append(1) or "pcm") == "pcm"
+    assert len(calls) == 1
+    assert cache.get_stats()["audio"] == {"hits": 2, "misses": 1, "evictions": 0}
+
+def test_failures_are_not_cached():
+    cache = AssetCache()
+    
+    def fail():
+        raise ValueError("decode failed")
+    
+    with pytest.raises(ValueError):
+        cache.get_or_create("audio", "music", fail)
+    assert cache.get_or_create("audio", "music", lambda: "pcm") == "pcm"
+
+def test_export_and_preload_share_built_assets():
+    parent = AssetCache()
+    parent.get_or_create("text_layers", ("caption", 50), lambda: "layer")
+    with pytest.raises(ValueError):
+        parent.get_or_create("text_layers", "broken", lambda: int("x"))
+    
+    # Only finished entries for the requested keys, and picklable for the pool initializer
+    shared = pickle.loads(pickle.dumps(parent.export("text_layers", [("caption", 50), "broken", "missing"])))
+    assert shared == {("caption", 50): "layer"}
+    
+    worker = AssetCache()
+    worker.preload("text_layers", shared)
+    assert worker.get_or_create("text_layers", ("caption", 50), lambda: pytest.fail("rebuilt")) == "layer"
+
+def test_preload_respects_lru_limit():
+    cache = AssetCache(max_entries={"image_layers": 2})
+    cache.preload("image_layers", {i: i for i in range(4)})
+    assert cache.get_or_create("image_layers", 3, lambda: "rebuilt") == 3
+    assert cache.get_or_create("image_layers", 0, lambda: "rebuilt") == "rebuilt"
@@ -0,0 +1,85 @@
+"""
+Test cắt/ghép bằng stream copy trên một clip tổng hợp (cần ffmpeg qua moviepy)
+"""
+import subprocess
+import pytest
+
+moviepy_config = pytest.importorskip("moviepy.config")
+
+from ffmpeg_utils import (cut_segments, concat_reencode, probe_keyframes, probe_stream_starts,
+                          keyframe_before, streams_match, run_ffmpeg)
+
+FPS = 30
+GOP_SECONDS = 2
+
+def _frame_count(path):
+    """Số packet video của file (không decode)"""
+    cmd = [moviepy_config.get_setting("FFMPEG_BINARY"), "-hide_banner", "-loglevel", "error",
+           "-i", str(path), "-map", "0:v:0", "-c", "copy", "-f", "framemd5", "-"]
+    output = subprocess.run(cmd, stdout=subprocess.PIPE, check=True).stdout.decode()
+    return sum(1 for line in output.splitlines() if line and not line.startswith('#'))
+
+@pytest.fixture(scope="module")
+def source_clip(tmp_path_factory):
+    """Clip 8 giây, GOP 2 giây đóng, có B-frame và track AAC"""
+    path = tmp_path_factory.mktemp("ffmpeg") / "source.mp4"
+    try:
+        run_ffmpeg([
+            "-f", "lavfi", "-i", f"testsrc2=size=320x240:rate={FPS}:duration=8",
+            "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=48000:duration=8",
+            "-c:v", "libx264", "-g", str(FPS * GOP_SECONDS), "-keyint_min", str(FPS * GOP_SECONDS),
+            "-sc_threshold", "0", "-bf", "2", "-flags", "+cgop",
+            "-c:a", "aac", "-shortest", str(path)
+        ])
+    except (IOError, OSError) as e:
+        pytest.skip(f"ffmpeg with libx264/aac is not available: {e}")
+    return path
+
+def test_probe_keyframes_follow_gop(source_clip):
+    keyframes = probe_keyframes(source_clip)
+    assert keyframes[:4] == pytest.approx([0.0, 2.0, 4.0, 6.0], abs=1e-3)
+    assert keyframe_before(keyframes, 5.0) == pytest.approx(4.0, abs=1e-3)
+
+def test_cut_keeps_exact_frame_count(source_clip, tmp_path):
+    output = tmp_path / "cut.mp4"
+    cut_segments(source_clip, [(4.0, 6.0, output, False)], fps=FPS)
+    assert _frame_count(output) == 2 * FPS
+    assert set(probe_stream_starts(output)) == {'video'}
+
+def test_cut_aligns_audio_with_first_frame(source_clip, tmp_path):
+    output = tmp_path / "cut.mp4"
+    cut_segments(source_clip, [(4.0, 6.0, output, True)], fps=FPS)
+    
+    starts = probe_stream_starts(output)
+    assert set(starts) == {'video', 'audio'}
+    # Within one video frame (an AAC frame is ~21 ms), not the 0.25 s seek margin
+    assert abs(starts['video'] - starts['audio']) < 1 / FPS
+    assert _frame_count(output) == 2 * FPS
+    assert not list(tmp_path.glob(".cut.*"))
+
+def _encode(path, channel_layout="stereo", duration=1):
+    run_ffmpeg([
+        "-f", "lavfi", "-i", f"testsrc2=size=320x240:rate={FPS}:duration={duration}",
+        "-f", "lavfi", "-i", f"anullsrc=r=44100:cl={channel_layout}",
+        "-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", str(path)
+    ])
+    return path
+
+def test_streams_match_detects_audio_layout(source_clip, tmp_path):
+    stereo = _encode(tmp_path / "stereo.mp4")
+    stereo_again = _encode(tmp_path / "stereo_again.mp4", duration=2)
+    mono = _encode(tmp_path / "mono.mp4", channel_layout="mono")
+    
+    assert streams_match([stereo, stereo_again])
+    assert not streams_match([stereo, mono])
+    # Same layout, different SPS (profile/level/GOP settings) and sample rate
+    assert not streams_match([stereo, source_clip])
+
+def test_concat_reencode_joins_mismatched_segments(source_clip, tmp_path):
+    stereo = _encode(tmp_path / "stereo.mp4")
+    mono = _encode(tmp_path / "mono.mp4", channel_layout="mono")
+    output = concat_reencode([stereo, mono], tmp_path / "joined.mp4", (320, 240), FPS,
+                             ["-c:v", "libx264", "-c:a", "aac"])
+    
+    assert _frame_count(output) == 2 * FPS
+    assert set(probe_stream_starts(output)) == {'video', 'audio'}
@@ -0,0 +1,58 @@
+"""
+Test FrameGrader so với chuỗi hiệu ứng cũ của VideoEditor
+"""
+import cv2
+import numpy as np
+import pytest
+
+from video_editing.frame_effects import FrameGrader, apply_vignette, get_vignette_mask
+from video_editing.video_editor import VideoEditor
+
+@pytest.fixture
+def editor(tmp_path):
+    return VideoEditor({'cache_dir': str(tmp_path)})
+
+def _frame(size=(128, 72), seed=0):
+    """Frame mượt, độ bão hòa vừa phải (chuỗi cũ không bị quấn vòng)"""
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(60, 200, (size[1] // 2, size[0] // 2, 3), dtype=np.uint8)
+    return cv2.resize(cv2.GaussianBlur(noise, (5, 5), 0), size, interpolation=cv2.INTER_LINEAR)
+
+def _old_chain(editor, frame):
+    return editor._vignette_frame(editor._sharpen_frame(editor._color_correct_frame(frame)))
+
+def test_grader_matches_old_chain_within_a_few_levels(editor):
+    frame = _frame()
+    graded = FrameGrader()(frame)
+    
+    difference = np.abs(graded.astype(np.int16) - _old_chain(editor, frame).astype(np.int16))
+    assert graded.dtype == np.uint8 and graded.shape == frame.shape
+    assert difference.max() <= 10 and difference.mean() < 2
+
+def test_grader_clips_where_old_chain_wrapped(editor):
+    frame = np.zeros((72, 128, 3), dtype=np.uint8)
+    frame[..., 0] = 250
+    frame[..., 1:] = 5
+    
+    # Old chain: S * 1.1 > 1 goes negative and wraps around in uint8
+    assert editor._color_correct_frame(frame)[0, 0, 1] > 200
+    graded = FrameGrader(sharpen_amount=0, vignette_strength=0)(frame)
+    assert graded[0, 0].tolist() == [255, 0, 0]
+
+def test_grader_resizes_and_returns_fresh_frames():
+    grader = FrameGrader(target_resolution=(64, 36))
+    first = grader(_frame(seed=1))
+    second = grader(_frame(seed=2))
+    
+    assert first.shape == (36, 64, 3)
+    assert not np.shares_memory(first, second)
+    assert not np.array_equal(first, second)
+
+def test_vignette_mask_is_cached_and_read_only():
+    mask = get_vignette_mask(72, 128, 0.3)
+    assert get_vignette_mask(72, 128, 0.3) is mask
+    assert not mask.flags.writeable
+    
+    frame = np.full((72, 128, 3), 200, dtype=np.uint8)
+    vignetted = apply_vignette(frame)
+    assert vignetted[36, 64, 0] == 200 and vignetted[0, 0, 0] < 200
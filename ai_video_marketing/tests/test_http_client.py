@@ -0,0 +1,57 @@
+"""
+Test giới hạn tốc độ của AsyncHTTPClient qua nhiều event loop
+"""
+import time
+import asyncio
+import requests
+
+from trend_analysis.http_client import AsyncHTTPClient, TokenBucket
+
+def _response(status=200):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b"{}"
+    return response
+
+def test_token_bucket_keeps_tokens_across_loops():
+    bucket = TokenBucket(rate=10, capacity=2)
+    started = time.monotonic()
+    asyncio.run(bucket.acquire(2))
+    assert time.monotonic() - started < 0.05
+    
+    # A new loop must not start with a full bucket again
+    started = time.monotonic()
+    asyncio.run(bucket.acquire(1))
+    assert time.monotonic() - started >= 0.08
+
+def test_rate_limit_applies_to_the_client_not_each_call():
+    client = AsyncHTTPClient(max_concurrency=4, rate_limits={"youtube": {"rate": 20, "burst": 4}})
+    sent = []
+    
+    def get(url, **kwargs):
+        sent.append(time.monotonic())
+        return _response()
+    
+    client.session.get = get
+    
+    async def burst(n):
+        await asyncio.gather(*(client.request("youtube", "http://stub/search") for _ in range(n)))
+    
+    try:
+        # Back-to-back asyncio.run calls, like the sync search_trending_keywords
+        for _ in range(3):
+            asyncio.run(burst(4))
+    finally:
+        client.close()
+    
+    # 4 burst tokens, then 8 more at 20/s: at least ~0.4 s in total
+    assert len(sent) == 12
+    assert sent[-1] - sent[0] >= 0.35
+
+def test_unlimited_platform_has_no_bucket():
+    client = AsyncHTTPClient(rate_limits={"youtube": {"rate": 5}})
+    try:
+        assert client._bucket("tiktok") is None
+        assert client._bucket("youtube").capacity == 5
+    finally:
+        client.close()
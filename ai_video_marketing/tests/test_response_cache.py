@@ -0,0 +1,98 @@
+"""
+Test ResponseCache: khóa, TTL theo endpoint, revalidate 304 qua AsyncHTTPClient
+"""
+import asyncio
+import requests
+import pytest
+
+from trend_analysis import response_cache
+from trend_analysis.response_cache import ResponseCache
+from trend_analysis.http_client import AsyncHTTPClient
+
+SEARCH_URL = "http://stub/youtube/v3/search"
+
+class _Clock:
+    """time.time() giả, tua được"""
+    
+    def __init__(self):
+        self.now = 1_000_000.0
+    
+    def __call__(self):
+        return self.now
+
+@pytest.fixture(params=["sqlite", "file"])
+def cache(request, tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    path = tmp_path / ("cache.sqlite" if request.param == "sqlite" else "cache")
+    cache = ResponseCache(path, backend=request.param, ttl=60, endpoint_ttl={"search": 600})
+    cache.clock = clock
+    return cache
+
+def test_key_ignores_credentials_and_param_order():
+    key = ResponseCache.make_key(SEARCH_URL, {"q": "cooking", "part": "snippet", "key": "secret"})
+    assert key == ResponseCache.make_key(SEARCH_URL + "/", {"part": "snippet", "q": "cooking", "key": "other"})
+    assert key != ResponseCache.make_key(SEARCH_URL, {"q": "tips", "part": "snippet"})
+
+def test_entries_expire_after_endpoint_ttl(cache):
+    assert cache.lookup(SEARCH_URL, {"q": "cooking"}) is None
+    cache.store(SEARCH_URL, {"q": "cooking"}, {"items": [1]}, etag='"v1"')
+    
+    cache.clock.now += 599
+    entry = cache.lookup(SEARCH_URL, {"q": "cooking"})
+    assert entry["fresh"] and entry["body"] == {"items": [1]}
+    
+    cache.clock.now += 2
+    entry = cache.lookup(SEARCH_URL, {"q": "cooking"})
+    assert not entry["fresh"]
+    assert cache.conditional_headers(entry) == {"If-None-Match": '"v1"'}
+    
+    # Other endpoints use the default TTL
+    cache.store("http://stub/youtube/v3/videos", {"id": "a"}, {"items": []})
+    cache.clock.now += 61
+    assert not cache.lookup("http://stub/youtube/v3/videos", {"id": "a"})["fresh"]
+
+def test_purge_drops_only_old_entries(cache):
+    cache.store(SEARCH_URL, {"q": "old"}, {})
+    cache.clock.now += 700
+    cache.store(SEARCH_URL, {"q": "new"}, {})
+    if isinstance(cache.backend, response_cache._FileBackend):
+        pytest.skip("file backend purges by file mtime, not the patched clock")
+    cache.purge()
+    assert cache.lookup(SEARCH_URL, {"q": "old"}) is None
+    assert cache.lookup(SEARCH_URL, {"q": "new"}) is not None
+
+def _response(status, body=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    return response
+
+def test_stale_entry_is_revalidated_with_304(cache):
+    client = AsyncHTTPClient(cache=cache)
+    requests_sent = []
+    
+    def get(url, params=None, headers=None, timeout=None):
+        requests_sent.append(headers or {})
+        if (headers or {}).get("If-None-Match") == '"v1"':
+            return _response(304)
+        return _response(200, b'{"items": [1]}', {"ETag": '"v1"'})
+    
+    client.session.get = get
+    try:
+        fetch = lambda: asyncio.run(client.get_json("youtube", SEARCH_URL, {"q": "cooking"}))
+        assert fetch() == {"items": [1]}
+        assert fetch() == {"items": [1]}  # fresh hit, no request
+        assert len(requests_sent) == 1
+        
+        cache.clock.now += 601
+        assert fetch() == {"items": [1]}  # 304: old body, TTL extended
+        assert requests_sent[-1] == {"If-None-Match": '"v1"'}
+        assert cache.stats["revalidated"] == 1
+        
+        cache.clock.now += 300
+        assert fetch() == {"items": [1]}
+        assert len(requests_sent) == 2
+    finally:
+        client.close()
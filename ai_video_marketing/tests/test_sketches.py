@@ -0,0 +1,74 @@
+"""
+Test sketch đếm tags: cận sai số Space-Saving sau khi gộp và count-min gộp được
+"""
+import random
+from collections import Counter
+
+import pytest
+
+from trend_analysis.sketches import CountMinHeavyHitters, CountMinSketch, SpaceSaving
+
+def _stream(size=20000, tags=2000, seed=0):
+    """Tags phân phối Zipf (vài tag rất phổ biến, đuôi dài)"""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, tags + 1)]
+    return rng.choices([f"tag{i}" for i in range(tags)], weights=weights, k=size)
+
+def _shards(items, count):
+    return [items[i::count] for i in range(count)]
+
+@pytest.mark.parametrize("shards", [1, 4])
+def test_space_saving_merge_keeps_error_bound(shards):
+    items = _stream()
+    exact = Counter(items)
+    
+    summary = SpaceSaving(capacity=100)
+    for shard in _shards(items, shards):
+        partial = SpaceSaving(capacity=100)
+        partial.update(shard)
+        summary = summary.merge(partial)
+    
+    bound = len(items) / summary.capacity
+    assert summary.total == len(items)
+    for item, count in exact.items():
+        assert summary.guaranteed(item) <= count <= summary.estimate(item) <= count + bound
+        if count > bound:
+            assert item in dict(summary.top(summary.capacity))
+    
+    # The heaviest tags come out in the exact order
+    assert [item for item, _ in summary.top(3)] == [item for item, _ in exact.most_common(3)]
+
+def test_space_saving_dict_round_trip():
+    summary = SpaceSaving(capacity=50)
+    summary.update(_stream(2000))
+    restored = SpaceSaving.from_dict(summary.to_dict())
+    
+    assert restored.top(50) == summary.top(50)
+    restored.update(["tag0"])
+    assert restored.estimate("tag0") == summary.estimate("tag0") + 1
+
+def test_count_min_merge_equals_single_sketch():
+    items = _stream(5000)
+    single = CountMinSketch(width=256, depth=4)
+    left, right = CountMinSketch(width=256, depth=4), CountMinSketch(width=256, depth=4)
+    for i, item in enumerate(items):
+        single.add(item)
+        (left if i % 2 else right).add(item)
+    
+    merged = left.merge(right)
+    assert (merged.table == single.table).all() and merged.total == single.total
+    with pytest.raises(ValueError):
+        left.merge(CountMinSketch(width=128, depth=4))
+
+def test_count_min_heavy_hitters_never_underestimate():
+    items = _stream()
+    exact = Counter(items)
+    
+    halves = [CountMinHeavyHitters(epsilon=0.01, k=5) for _ in range(2)]
+    for half, shard in zip(halves, _shards(items, 2)):
+        half.update(shard)
+    merged = halves[0].merge(halves[1])
+    
+    for item, count in exact.items():
+        assert count <= merged.estimate(item)
+    assert [item for item, _ in merged.top()] == [item for item, _ in exact.most_common(5)]
@@ -0,0 +1,72 @@
+"""
+Test SmartCropper: điểm cắt shot từ histogram, dò chủ thể vài frame mỗi shot
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("moviepy")
+
+from video_editing.smart_crop import SmartCropper
+
+class _TwoShotClip:
+    """Clip giả: shot 1 nền xanh, chủ thể bên trái; shot 2 nền đỏ, chủ thể bên phải"""
+    
+    duration = 10.0
+    cut = 4.0
+    
+    def __init__(self):
+        self.reads = 0
+    
+    def get_frame(self, t):
+        self.reads += 1
+        frame = np.zeros((360, 640, 3), dtype=np.uint8)
+        if t < self.cut:
+            frame[:] = (20, 40, 160)
+            frame[150:210, 80:140] = 255
+        else:
+            frame[:] = (160, 30, 20)
+            frame[150:210, 520:580] = 255
+        return frame
+
+def _brightest_center(gray):
+    """Detector giả: tâm vùng sáng nhất (chủ thể của clip giả)"""
+    ys, xs = np.nonzero(gray == gray.max())
+    return (xs.mean() + 0.5) / gray.shape[1], (ys.mean() + 0.5) / gray.shape[0]
+
+@pytest.fixture
+def cropper(monkeypatch):
+    cropper = SmartCropper(sample_fps=2.0)
+    monkeypatch.setattr(cropper, "_find_subject", _brightest_center)
+    return cropper
+
+def test_detects_subject_once_or_twice_per_shot(cropper, monkeypatch):
+    detections = []
+    monkeypatch.setattr(cropper, "_find_subject", lambda gray: detections.append(gray) or _brightest_center(gray))
+    
+    clip = _TwoShotClip()
+    plan = cropper.analyze(clip)
+    
+    assert clip.reads == 21  # one read per histogram sample, none for detection
+    assert len(plan.shot_starts) == 2
+    assert plan.shot_times.tolist() == pytest.approx([0.0, 4.0], abs=0.5)
+    assert len(detections) == len(plan.times) <= 2 * len(plan.shot_starts)
+
+def test_center_follows_subject_without_crossing_the_cut(cropper):
+    plan = cropper.analyze(_TwoShotClip())
+    assert plan.times[plan.shot_starts[1]] > plan.shot_times[1]
+    
+    for t in (0.0, 2.0, 3.9):
+        assert plan.center_at(t)[0] < 0.3
+    # First sample after the cut, before the first detection of the new shot
+    for t in (plan.shot_times[1], plan.times[plan.shot_starts[1]] - 0.1, 9.9):
+        assert plan.center_at(t)[0] > 0.7
+
+def test_transform_crops_a_vertical_window(cropper):
+    plan = cropper.analyze(_TwoShotClip())
+    size, transform = cropper.make_transform(plan, (640, 360), (1080, 1920))
+    
+    assert size == cropper.crop_size((640, 360), (1080, 1920))
+    frame = _TwoShotClip().get_frame(1.0)
+    cropped = transform(frame, 1.0)
+    assert cropped.shape[:2] == (size[1], size[0])
+    assert (cropped == 255).any()
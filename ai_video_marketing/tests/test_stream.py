@@ -0,0 +1,58 @@
+"""
+Test TrendStream: tổng cửa sổ trượt khớp với tính lại từ các video còn trong cửa sổ
+"""
+import random
+import pytest
+
+from trend_analysis.stream import TrendStream
+from trend_analysis.trend_analyzer import VideoData
+
+def _video(views, likes, comments=0, platform="tiktok", tags=()):
+    return VideoData(title="", description="", views=views, likes=likes, comments=comments,
+                     duration=45, upload_date="", url="", thumbnail="", tags=list(tags),
+                     platform=platform)
+
+def test_expired_outlier_leaves_no_rate_residue():
+    stream = TrendStream(window_seconds=60, buckets=6)
+    # Huge rate (1e6) that would swamp later small rates if subtracted back out
+    stream.push(_video(views=1, likes=10**6, platform="youtube"), timestamp=0)
+    for t in range(1, 30):
+        stream.push(_video(views=1000, likes=t, platform="tiktok"), timestamp=t)
+    
+    for t in range(61, 70):
+        stream.push(_video(views=1000, likes=3, platform="tiktok"), timestamp=t)
+    
+    live = [t / 1000 for t in range(10, 30)] + [0.003] * 9
+    snapshot = stream.snapshot(now=69)
+    engagement = snapshot['engagement_analysis']
+    assert snapshot['platform_distribution'] == {"tiktok": len(live)}
+    assert engagement['avg_engagement_rate'] == pytest.approx(sum(live) / len(live), rel=1e-12, abs=0)
+    assert set(engagement['platform_engagement']) == {"tiktok"}
+
+def test_long_running_stream_matches_recomputation():
+    rng = random.Random(0)
+    stream = TrendStream(window_seconds=100, buckets=10)
+    history = []
+    for step in range(5000):
+        t = step * 0.7
+        platform = rng.choice(["tiktok", "youtube", "instagram"] if step < 2500 else ["tiktok"])
+        video = _video(views=rng.randint(0, 50), likes=rng.randint(0, 10**4), platform=platform,
+                       tags=rng.sample(["a", "b", "c", "d"], 2))
+        stream.push(video, timestamp=t)
+        history.append((t, video))
+    
+    now = history[-1][0]
+    oldest = (int(now // stream.bucket_seconds) - stream.num_buckets + 1) * stream.bucket_seconds
+    live = [video for t, video in history if t >= oldest]
+    rates = [(v.likes + v.comments) / v.views for v in live if v.views]
+    
+    snapshot = stream.snapshot(now=now)
+    assert snapshot['total_videos'] == len(live)
+    assert snapshot['engagement_analysis']['avg_engagement_rate'] == pytest.approx(sum(rates) / len(rates), rel=1e-12, abs=0)
+    assert set(snapshot['engagement_analysis']['platform_engagement']) == {"tiktok"}
+    assert snapshot['platform_distribution'] == {"tiktok": len(live)}
+
+def test_empty_window_resets_to_nothing():
+    stream = TrendStream(window_seconds=10, buckets=2)
+    stream.push(_video(views=3, likes=1, tags=["a"]), timestamp=0)
+    assert stream.snapshot(now=100) == {}
@@ -0,0 +1,77 @@
+"""
+Test crossfade: chỉ trộn vùng chồng lấn, một clip giữ nguyên, ghép video đã encode
+"""
+import numpy as np
+import pytest
+
+mp = pytest.importorskip("moviepy.editor")
+
+from ffmpeg_utils import run_ffmpeg
+from video_editing.transitions import CrossfadeTimeline, crossfade_encoded
+from video_editing.video_editor import VideoEditor
+
+FPS = 10
+
+def _color_clip(color, duration=2.0):
+    return mp.ColorClip(size=(32, 16), color=color, duration=duration).set_fps(FPS)
+
+def test_timeline_blends_only_the_overlap():
+    red, blue = _color_clip((200, 0, 0)), _color_clip((0, 0, 200))
+    timeline = CrossfadeTimeline([red, blue], transition=0.5, fade_in=0, fade_out=0)
+    
+    assert timeline.duration == pytest.approx(3.5)
+    assert timeline.starts == pytest.approx([0.0, 1.5])
+    assert timeline.size == (32, 16) and timeline.fps == FPS
+    
+    assert np.array_equal(timeline.get_frame(1.0), red.get_frame(1.0))
+    assert np.array_equal(timeline.get_frame(2.5), blue.get_frame(1.0))
+    middle = timeline.get_frame(1.75)[0, 0]
+    assert middle[0] == pytest.approx(100, abs=1) and middle[2] == pytest.approx(100, abs=1)
+
+def test_timeline_fades_only_at_the_edges():
+    timeline = CrossfadeTimeline([_color_clip((200, 200, 200))] * 2, transition=0.5,
+                                 fade_in=0.5, fade_out=0.5)
+    
+    assert timeline.get_frame(0)[0, 0, 0] == 0
+    assert timeline.get_frame(0.25)[0, 0, 0] == pytest.approx(100, abs=1)
+    assert timeline.get_frame(1.75)[0, 0, 0] == 200
+    assert timeline.get_frame(timeline.duration)[0, 0, 0] == 0
+
+def test_transition_is_capped_by_the_shortest_clip():
+    timeline = CrossfadeTimeline([_color_clip((0, 0, 0), 0.4), _color_clip((0, 0, 0))],
+                                 transition=1.0, fade_in=0, fade_out=0)
+    assert timeline.transition == pytest.approx(0.2)
+    assert timeline.duration == pytest.approx(2.2)
+
+def test_single_clip_is_left_unchanged(tmp_path):
+    clip = _color_clip((10, 20, 30))
+    assert VideoEditor({'cache_dir': str(tmp_path)})._add_transitions([clip]) is clip
+    with pytest.raises(ValueError):
+        CrossfadeTimeline([])
+
+def _encode(path, color):
+    """Clip 3 giây, GOP 1 giây, có track AAC"""
+    run_ffmpeg([
+        "-f", "lavfi", "-i", f"color=c={color}:size=64x48:rate=25:duration=3",
+        "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=48000:duration=3",
+        "-c:v", "libx264", "-g", "25", "-keyint_min", "25", "-sc_threshold", "0",
+        "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", str(path)
+    ])
+    return path
+
+def test_crossfade_encoded_shortens_by_the_overlap(tmp_path):
+    try:
+        paths = [_encode(tmp_path / "red.mp4", "red"), _encode(tmp_path / "blue.mp4", "blue")]
+    except (IOError, OSError) as e:
+        pytest.skip(f"ffmpeg with libx264/aac is not available: {e}")
+    
+    output = crossfade_encoded(paths, tmp_path / "joined.mp4", transition=0.5)
+    clip = mp.VideoFileClip(str(output))
+    try:
+        assert clip.duration == pytest.approx(5.5, abs=0.1)
+        assert clip.audio is not None
+        start, end = clip.get_frame(1.0)[24, 32], clip.get_frame(4.5)[24, 32]
+        assert start[0] > 200 and start[2] < 50
+        assert end[2] > 200 and end[0] < 50
+    finally:
+        clip.close()
@@ -0,0 +1,72 @@
+"""
+Test điểm tương tác vector hóa: múi giờ, điểm từng video và thứ tự xếp hạng
+"""
+import numpy as np
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from trend_analysis.trend_analyzer import TrendAnalyzer, VideoData
+from configs.config import TREND_CONFIG
+
+@pytest.fixture
+def analyzer():
+    analyzer = TrendAnalyzer(dict(TREND_CONFIG, warehouse={"enabled": False},
+                                  response_cache={"enabled": False}))
+    yield analyzer
+    analyzer.client.close()
+
+def _video(views=1000, likes=100, comments=10, upload_date=None):
+    return VideoData(
+        title="video", description="", views=views, likes=likes, comments=comments, duration=60,
+        upload_date=upload_date or datetime.now().isoformat(), url="", thumbnail="", tags=[],
+        platform="youtube"
+    )
+
+DATES = [
+    "2026-10-01T12:00:00Z",
+    "2026-10-01T12:00:00.123Z",
+    "2026-10-01T12:00:00+07:00",
+    "2026-10-01T12:00:00-0530",
+    "2026-10-01T12:00:00.123456+00:00",
+    "2026-10-01T12:00:00",
+    "2026-10-01T12:00:00.5",
+    "2026-10-01",
+    "2026-10-01 12:00",
+]
+
+def test_has_utc_offset_matches_fromisoformat(analyzer):
+    expected = [datetime.fromisoformat(date.replace('Z', '+00:00')).tzinfo is not None for date in DATES]
+    assert analyzer._has_utc_offset(np.array(DATES)).tolist() == expected
+    assert analyzer._has_utc_offset(np.array(DATES, dtype=object)).tolist() == expected
+
+def test_has_utc_offset_handles_missing_values(analyzer):
+    dates = np.array(["2026-10-01T12:00:00Z", None, ""], dtype=object)
+    assert analyzer._has_utc_offset(dates).tolist() == [True, False, False]
+    assert analyzer._has_utc_offset(np.array([], dtype=str)).tolist() == []
+
+def test_vectorized_scores_match_per_video_scores(analyzer):
+    now = datetime.now()
+    videos = [
+        _video(upload_date=(now - timedelta(days=3)).isoformat()),
+        _video(upload_date=(datetime.now(timezone.utc) - timedelta(days=10)).isoformat()),
+        _video(upload_date=(now - timedelta(days=40)).strftime("%Y-%m-%dT%H:%M:%SZ")),
+        _video(views=5000, likes=7, upload_date=(now - timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%S+0700")),
+        _video(views=0, likes=0, comments=0),
+    ]
+    expected = [analyzer._calculate_engagement_score(video) for video in videos]
+    assert analyzer.calculate_engagement_scores(videos) == pytest.approx(expected)
+
+def test_rank_by_engagement_keeps_input_order_for_ties(analyzer):
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        views = rng.choice([1000, 2000, 4000], size=40)
+        videos = [_video(views=int(v), likes=0, comments=int(c))
+                  for v, c in zip(views, rng.choice([10, 20], size=40))]
+        scores = analyzer.calculate_engagement_scores(videos)
+        expected = np.argsort(-scores, kind='stable')
+        
+        assert analyzer.rank_by_engagement(videos).tolist() == expected.tolist()
+        for top_k in (1, 5, 17, 40, 60):
+            assert analyzer.rank_by_engagement(videos, top_k).tolist() == expected[:top_k].tolist()
+    
+    assert analyzer.rank_by_engagement(videos, 0).tolist() == []
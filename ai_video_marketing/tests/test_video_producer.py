@@ -0,0 +1,139 @@
+"""
+Test VideoProducer: nhạc nền trộn bằng NumPy, render lại chỉ section đã sửa và render hàng loạt
+"""
+import copy
+import json
+import numpy as np
+import pytest
+
+# VideoProducer needs torch (device selection) and moviepy/ffmpeg
+pytest.importorskip("torch")
+
+from PIL import Image
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from ffmpeg_utils import run_ffmpeg
+from video_production import video_producer
+from video_production.video_producer import VideoProducer
+
+SCRIPT = {
+    'detailed_script': {
+        'hook': {'dialogue': '', 'timing': '0-2s', 'tone': 'exciting'},
+        'main_content': {'sections': [
+            {'dialogue': '', 'timing': '2-4s', 'tone': 'neutral'},
+            {'dialogue': '', 'timing': '4-6s', 'tone': 'calm'}
+        ]},
+        'call_to_action': {'dialogue': '', 'timing': '6-8s', 'tone': 'urgent'}
+    }
+}
+
+def _retoned(tone):
+    """SCRIPT với mọi section nội dung chính đổi sang tone khác"""
+    script = copy.deepcopy(SCRIPT)
+    for section in script['detailed_script']['main_content']['sections']:
+        section['tone'] = tone
+    return script
+
+@pytest.fixture
+def producer(tmp_path):
+    return VideoProducer({
+        'cache_dir': str(tmp_path / "cache"),
+        'default_resolution': (128, 72),
+        'proof_resolution': (64, 36),
+        'fps': 10,
+        'proof_fps': 10,
+        'preset': 'ultrafast',
+        'keyframe_interval': 1.0,
+        'music_volume': 0.5,
+        'music_fade': 0.5
+    })
+
+@pytest.fixture
+def music(tmp_path, monkeypatch):
+    """Sine 1 giây làm nhạc nền (ngắn hơn video để phải lặp)"""
+    path = tmp_path / "music.wav"
+    try:
+        run_ffmpeg(["-f", "lavfi", "-i", "sine=frequency=440:sample_rate=8000:duration=1",
+                    "-ac", "2", "-c:a", "pcm_s16le", str(path)])
+    except (IOError, OSError) as e:
+        pytest.skip(f"ffmpeg is not available: {e}")
+    monkeypatch.setattr(video_producer, "BACKGROUND_MUSIC_PATH", path)
+    return path
+
+def test_music_is_decoded_once_and_looped(producer, music):
+    track, fps = producer._build_audio_track(3.0)
+    producer._build_audio_track(5.0)
+    pcm, _ = producer._load_background_music(music)
+    
+    assert producer.asset_cache.get_stats()["audio"]["misses"] == 1
+    assert not pcm.flags.writeable
+    assert track.shape == (3 * fps, pcm.shape[1]) and track.dtype == np.float32
+    
+    # Faded edges, looped music at the configured volume in between
+    fade = int(0.5 * fps)
+    assert np.abs(track[0]).max() == 0
+    middle = slice(len(pcm) + fade, len(pcm) + 2 * fade)
+    np.testing.assert_allclose(track[middle], 0.5 * pcm[fade:2 * fade], atol=1e-6)
+
+def test_audio_track_is_encoded_for_muxing(producer, music, tmp_path):
+    audio_path = producer._write_audio_track(2.0, tmp_path / "video.mp4")
+    assert audio_path.endswith(".music.m4a")
+    assert ffmpeg_parse_infos(audio_path)['duration'] == pytest.approx(2.0, abs=0.1)
+
+def test_missing_music_is_skipped(producer, tmp_path, monkeypatch):
+    monkeypatch.setattr(video_producer, "BACKGROUND_MUSIC_PATH", tmp_path / "missing.mp3")
+    assert producer._write_audio_track(2.0, tmp_path / "video.mp4") is None
+
+def test_only_the_edited_section_is_rendered_again(producer, tmp_path):
+    images = [Image.new('RGB', (160, 90), color) for color in ('red', 'green', 'blue')]
+    
+    first = producer.create_video_from_script(SCRIPT, images, tmp_path / "first.mp4", proof=True)
+    assert (first['sections_rendered'], first['sections_reused']) == (4, 0)
+    
+    edited = copy.deepcopy(SCRIPT)
+    edited['detailed_script']['main_content']['sections'][1]['timing'] = '4-7s'
+    second = producer.create_video_from_script(edited, images, tmp_path / "second.mp4", proof=True)
+    assert (second['sections_rendered'], second['sections_reused']) == (1, 3)
+    assert second['duration'] == 9
+    infos = ffmpeg_parse_infos(second['output_path'])
+    assert infos['duration'] == pytest.approx(9, abs=0.2)
+    assert list(infos['video_size']) == [64, 36]
+    
+    # Full render does not reuse proof segments
+    full = producer.create_video_from_script(edited, images, tmp_path / "full.mp4")
+    assert full['sections_rendered'] == 4 and full['resolution'] == (128, 72)
+    
+    with open(second['keyframe_index'], encoding='utf-8') as f:
+        index = json.load(f)
+    assert [section['type'] for section in index['sections']] == ['hook', 'main', 'main', 'cta']
+    assert index['keyframes'][:3] == [0.0, 1.0, 2.0]
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_isolates_failures_and_keeps_order(producer, tmp_path, workers):
+    producer.config['batch_workers'] = workers
+    images = [Image.new('RGB', (160, 90), 'red')]
+    scripts = [SCRIPT, {'detailed_script': {}}, _retoned('calm')]
+    
+    results = producer.batch_produce_videos(scripts, images, tmp_path / "batch", proof=True)
+    
+    assert [result['script_index'] for result in results] == [0, 1, 2]
+    assert "No video clips created" in results[1]['error']
+    assert results[1]['output_path'].endswith("video_002.mp4")
+    for result in (results[0], results[2]):
+        assert 'error' not in result
+        assert result['output_path'].endswith(f"video_{result['script_index'] + 1:03d}.mp4")
+        assert result['render_times']['proof'] == result['render_time']
+
+def test_prewarm_builds_only_assets_shared_by_jobs(producer, tmp_path):
+    images = [Image.new('RGB', (160, 90), 'red')]
+    jobs = [(SCRIPT, tmp_path / "a.mp4"), (_retoned('calm'), tmp_path / "b.mp4")]
+    
+    shared = producer._prewarm_assets(jobs, images, proof=True)
+    
+    # Same image in both scripts; the neutral layer is only used by the first one
+    effects = sorted(key[1] for key in shared['image_layers'])
+    assert effects == ['calming', 'dynamic']
+    
+    # Sections already on disk are not prebuilt again
+    producer.create_video_from_script(SCRIPT, images, tmp_path / "a.mp4", proof=True)
+    assert producer._prewarm_assets(jobs, images, proof=True) == {}
@@ -0,0 +1,59 @@
+"""
+Test VideoTable: tăng dung lượng, take và chuyển đổi qua lại pandas/Parquet/records
+"""
+from dataclasses import asdict
+
+import pytest
+
+from trend_analysis.trend_analyzer import VideoData
+from trend_analysis.video_table import VideoTable
+
+def _videos(count=5):
+    return [
+        VideoData(
+            title=f"video {i}", description=f"desc {i}", views=1000 * (i + 1), likes=10 * i,
+            comments=i, duration=30 * i, upload_date=f"2026-10-{i + 1:02d}T12:00:00Z",
+            url=f"https://example.com/{i}", thumbnail=f"https://example.com/{i}.jpg",
+            tags=[f"tag{j}" for j in range(i % 3)], platform="youtube" if i % 2 else "tiktok",
+            keyword="cooking"
+        )
+        for i in range(count)
+    ]
+
+def test_append_grows_past_capacity():
+    videos = _videos(5)
+    table = VideoTable(capacity=1)
+    table.extend(videos)
+    
+    assert len(table) == 5 and table.capacity >= 5
+    assert list(table) == videos
+    assert table[-1] == videos[-1]
+    with pytest.raises(IndexError):
+        table[5]
+
+def test_take_keeps_rows_and_tags():
+    videos = _videos(5)
+    table = VideoTable.from_videos(videos).take([4, 0, 2])
+    
+    assert list(table) == [videos[4], videos[0], videos[2]]
+    assert table.tags_of(0) == videos[4].tags
+    assert table.tags_of(1) == []
+
+def test_pandas_round_trip():
+    videos = _videos(5)
+    df = VideoTable.from_videos(videos).to_pandas()
+    
+    assert df['views'].tolist() == [video.views for video in videos]
+    assert df['tags'].tolist() == [video.tags for video in videos]
+    assert list(VideoTable.from_pandas(df)) == videos
+
+def test_parquet_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    videos = _videos(5)
+    path = VideoTable.from_videos(videos).to_parquet(tmp_path / "videos.parquet")
+    
+    assert list(VideoTable.read_parquet(path)) == videos
+
+def test_records_match_video_data():
+    videos = _videos(3)
+    assert VideoTable.from_videos(videos).to_records() == [asdict(video) for video in videos]
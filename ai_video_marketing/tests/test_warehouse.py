@@ -0,0 +1,53 @@
+"""
+Test TrendWarehouse: biên khoảng thời gian, snapshot mới nhất và tóm tắt tags
+"""
+import pandas as pd
+import pytest
+from datetime import date
+
+from trend_analysis.trend_analyzer import VideoData
+from trend_analysis.warehouse import TrendWarehouse
+
+pytest.importorskip("pyarrow")
+
+def _video(url, views, tags, platform="youtube"):
+    return VideoData(title=url, description="", views=views, likes=views // 10, comments=0,
+                     duration=60, upload_date="2026-10-01T00:00:00Z", url=url, thumbnail="",
+                     tags=tags, platform=platform)
+
+@pytest.fixture
+def warehouse(tmp_path):
+    warehouse = TrendWarehouse(tmp_path / "warehouse")
+    warehouse.ingest([_video("a", 100, ["x"]), _video("b", 50, ["y"], "tiktok")], "2026-10-18T23:30:00Z")
+    warehouse.ingest([_video("a", 200, ["x", "y"])], "2026-10-19T00:00:00Z")
+    warehouse.ingest([_video("a", 300, ["x"])], "2026-10-19T12:00:00Z")
+    warehouse.ingest([_video("a", 400, ["z"])], "2026-10-19T23:59:59Z")
+    warehouse.ingest([_video("a", 500, ["z"])], "2026-10-20T00:00:00Z")
+    return warehouse
+
+def _fetched(df):
+    return [timestamp.strftime('%d %H:%M:%S') for timestamp in df['fetched_at']]
+
+def test_date_only_end_includes_whole_day(warehouse):
+    df = warehouse.load_snapshots("2026-10-19", "2026-10-19")
+    assert _fetched(df) == ['19 00:00:00', '19 12:00:00', '19 23:59:59']
+    assert _fetched(warehouse.load_snapshots(date(2026, 10, 19), date(2026, 10, 19))) == _fetched(df)
+
+def test_datetime_end_is_inclusive(warehouse):
+    df = warehouse.load_snapshots("2026-10-19T00:00:00", "2026-10-19T12:00:00")
+    assert _fetched(df) == ['19 00:00:00', '19 12:00:00']
+    
+    df = warehouse.load_snapshots(end=pd.Timestamp("2026-10-19T14:00:00+02:00"))
+    assert _fetched(df) == ['18 23:30:00', '18 23:30:00', '19 00:00:00', '19 12:00:00']
+
+def test_latest_and_platform_filter(warehouse):
+    latest = warehouse.latest(end="2026-10-19", platforms=["youtube"])
+    assert [(video.url, video.views) for video in latest] == [("a", 400)]
+    assert warehouse.platforms() == ["tiktok", "youtube"]
+
+def test_tag_summary_respects_window(warehouse):
+    summary = warehouse.tag_summary("2026-10-19", "2026-10-19")
+    assert summary.total == 4
+    assert summary.top(3) == [("x", 2), ("y", 1), ("z", 1)]
+    
+    assert dict(warehouse.tag_summary().top()) == {"x": 3, "y": 2, "z": 2}
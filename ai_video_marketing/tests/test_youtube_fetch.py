@@ -0,0 +1,42 @@
+"""
+Test lấy dữ liệu YouTube qua StubPlatformServer: phân trang search và lô 50 id
+"""
+import pytest
+
+from trend_analysis.trend_analyzer import TrendAnalyzer
+from trend_analysis.stub_server import StubPlatformServer
+from configs.config import TREND_CONFIG
+
+@pytest.fixture
+def server():
+    with StubPlatformServer(latency=0.0, results_per_keyword=300) as server:
+        yield server
+
+def _analyzer(server):
+    return TrendAnalyzer(dict(TREND_CONFIG, youtube_api_key="test-key", platforms=["youtube"],
+                              api_base_urls=server.base_urls, rate_limits={},
+                              warehouse={"enabled": False}, response_cache={"enabled": False}))
+
+def test_search_follows_pages_and_batches_details(server):
+    analyzer = _analyzer(server)
+    try:
+        videos = analyzer.search_trending_keywords(["cooking"], max_results=120)
+    finally:
+        analyzer.client.close()
+    
+    # 50 + 50 + 20 search results, details in 3 requests of at most 50 ids
+    assert len(videos) == 120
+    assert len({video.url for video in videos}) == 120
+    assert server.stats["requests"] == 6
+    assert all(video.views > 0 and video.duration > 0 for video in videos)
+
+def test_search_stops_when_results_run_out(server):
+    server.results_per_keyword = 30
+    analyzer = _analyzer(server)
+    try:
+        videos = analyzer.search_trending_keywords(["cooking"], max_results=100)
+    finally:
+        analyzer.client.close()
+    
+    assert len(videos) == 30
+    assert server.stats["requests"] == 2